@@ -0,0 +1,121 @@
+"""
+Сравнение пропускной способности MinioClient.download_file_chunk:
+старая схема (отдельный GET на каждый chunk) против потокового чтения
+через одно соединение. S3 эмулируется в памяти с задержкой на запрос.
+
+Запуск из корня репозитория:
+    python benchmarks/download_chunk.py --size 4194304 --latency 0.002
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import sys
+import time
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from infrastructure.file_manager.minio_client import MinioClient  # noqa: E402
+
+
+class FakeResponse:
+    def __init__(self, payload: bytes):
+        self._buffer = io.BytesIO(payload)
+
+    @property
+    def data(self) -> bytes:
+        return self._buffer.getvalue()
+
+    def read(self, amt=None) -> bytes:
+        return self._buffer.read(amt)
+
+    def close(self) -> None:
+        self._buffer.close()
+
+    def release_conn(self) -> None:
+        pass
+
+
+class FakeMinio:
+    def __init__(self, payload: bytes, latency: float):
+        self.payload = payload
+        self.latency = latency
+        self.requests = 0
+
+    def get_object(self, bucket_name, object_name, offset=0, length=0, **kwargs):
+        self.requests += 1
+        time.sleep(self.latency)
+        end = offset + length if length else len(self.payload)
+        return FakeResponse(self.payload[offset:end])
+
+
+async def legacy_download_file_chunk(
+    client: MinioClient, bucket_name, object_name, chunk_size
+):
+    response = None
+    offset = 0
+    try:
+        while True:
+            response = await client.download_file_raw(
+                bucket_name=bucket_name,
+                object_name=object_name,
+                length=chunk_size,
+                offset=offset,
+            )
+            offset += chunk_size
+            yield response.data
+            if len(response.data) < chunk_size:
+                break
+    finally:
+        if response:
+            response.close()
+            response.release_conn()
+
+
+async def measure(stream) -> tuple[int, float]:
+    started = time.perf_counter()
+    total = 0
+    async for chunk in stream:
+        total += len(chunk)
+    return total, time.perf_counter() - started
+
+
+async def main(size: int, latency: float, legacy_chunk: int) -> None:
+    payload = os.urandom(size)
+    client = MinioClient(
+        protocol="http",
+        host="localhost",
+        port=9000,
+        access_key="benchmark",
+        secret_key="benchmark",
+        region="us-east-1",
+        loop=asyncio.get_running_loop(),
+    )
+
+    client.client = FakeMinio(payload, latency)
+    total, elapsed = await measure(
+        legacy_download_file_chunk(client, "bench", "object", legacy_chunk)
+    )
+    report("legacy", total, elapsed, client.client.requests)
+
+    client.client = FakeMinio(payload, latency)
+    total, elapsed = await measure(client.download_file_chunk("bench", "object"))
+    report("streaming", total, elapsed, client.client.requests)
+
+
+def report(name: str, total: int, elapsed: float, requests: int) -> None:
+    print(  # noqa: T201
+        f"{name:>10}: {total / elapsed / 2**20:10.1f} MiB/s, {elapsed:8.3f} s, {requests} GET"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=4 * 2**20)
+    parser.add_argument("--latency", type=float, default=0.002)
+    parser.add_argument("--legacy-chunk", type=int, default=1024)
+    args = parser.parse_args()
+    asyncio.run(main(args.size, args.latency, args.legacy_chunk))
@@ -0,0 +1,336 @@
+"""
+Реестры файлов и blob в памяти процесса вместо Postgres и хранилище объектов
+вместо S3 для бенчмарков: повторяют контракт FileReadRegistry,
+FileWriteRegistry, BlobRegistry и BaseFileManager в объеме, нужном сценариям
+create, get, list и download
+"""
+
+import asyncio
+import hashlib
+import itertools
+import logging
+import uuid
+from collections.abc import AsyncGenerator, AsyncIterator
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Iterator, Optional
+from uuid import UUID
+
+from domain.file.schema import CreateFile, FileReturnData, ListFiles
+from infrastructure.base_entities.base_file_manager import (
+    BaseFileManager,
+    FileReaderProtocol,
+)
+from infrastructure.database.models import Blob, File
+from infrastructure.exceptions.minio_exceptions import FileAlreadyExist
+from infrastructure.file_manager.bucket_registry import BucketRegistry
+from infrastructure.file_manager.schema import ObjectStat, UploadedObject
+from infrastructure.handlers.cursor_handler import decode_cursor, encode_cursor
+
+
+class MemoryFileStore:
+    def __init__(self):
+        self.files: dict[UUID, dict] = {}
+
+
+class MemoryFileReadRegistry:
+    replicas = None
+
+    def __init__(self, store: MemoryFileStore):
+        self.store = store
+
+    async def get(self, file_uuid: UUID) -> Optional[FileReturnData]:
+        data = self.store.files.get(UUID(str(file_uuid)))
+        return data and FileReturnData.model_validate(data)
+
+    async def get_list(self, cmd: ListFiles) -> dict:
+        def key(row: dict) -> tuple:
+            return row[cmd.sort], row["uuid"]
+
+        reverse = cmd.direction == "desc"
+        rows = sorted(self.store.files.values(), key=key, reverse=reverse)
+        if cmd.cursor:
+            _, _, value, last_uuid = decode_cursor(cmd.cursor)
+            if cmd.sort in ("created_at", "updated_at"):
+                value = datetime.fromisoformat(value)
+            last = (value, UUID(last_uuid))
+            rows = [
+                row for row in rows if (key(row) < last if reverse else key(row) > last)
+            ]
+        rows = rows[: cmd.limit + 1]
+        next_cursor = None
+        if len(rows) > cmd.limit:
+            rows = rows[: cmd.limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(
+                [cmd.sort, cmd.direction, last[cmd.sort], last["uuid"]]
+            )
+        return {"items": [dict(row) for row in rows], "next_cursor": next_cursor}
+
+
+class MemoryFileWriteRegistry:
+    def __init__(self, store: MemoryFileStore):
+        self.store = store
+
+    async def create(
+        self, cmd: CreateFile, file_uuid: Optional[UUID] = None
+    ) -> Optional[File]:
+        now = datetime.now()
+        values = {
+            **cmd.model_dump(),
+            "uuid": file_uuid or uuid.uuid4(),
+            "created_at": now,
+            "updated_at": now,
+        }
+        if values["uuid"] in self.store.files:
+            raise FileAlreadyExist
+        self.store.files[values["uuid"]] = values
+        return File(**values)
+
+
+class MemoryBlobRegistry:
+    def __init__(self):
+        self.blobs: dict[tuple[str, str], Blob] = {}
+
+    async def acquire(self, bucket: str, sha256: str) -> Optional[Blob]:
+        blob = self.blobs.get((bucket, sha256))
+        if blob is not None:
+            blob.refcount += 1
+        return blob
+
+    async def register(
+        self,
+        bucket: str,
+        sha256: str,
+        path: str,
+        size: int,
+        etag: Optional[str] = None,
+    ) -> Blob:
+        blob = self.blobs.get((bucket, sha256))
+        if blob is not None:
+            blob.refcount += 1
+            return blob
+        blob = self.blobs[(bucket, sha256)] = Blob(
+            bucket=bucket, sha256=sha256, path=path, size=size, etag=etag, refcount=1
+        )
+        return blob
+
+    async def release(
+        self, bucket: str, paths: list[str], purge: Callable[[list[str]], Awaitable]
+    ) -> list[str]:
+        unused = []
+        for key, blob in list(self.blobs.items()):
+            if key[0] == bucket and blob.path in paths:
+                blob.refcount -= paths.count(blob.path)
+                if blob.refcount <= 0:
+                    unused.append(blob.path)
+                    del self.blobs[key]
+        if unused:
+            await purge(unused)
+        return unused
+
+
+class MemoryFileManager(BaseFileManager):
+    """
+    Хранилище объектов в памяти процесса вместо S3 (бенчмарки, проверки):
+    каждый запрос к хранилищу задерживается на latency секунд,
+    каждый отданный фрагмент скачивания - на chunk_latency секунд
+    """
+
+    def __init__(
+        self,
+        latency: float = 0,
+        chunk_latency: float = 0,
+        chunk_size: int = 64 * 1024,
+        logger: logging.Logger = logging,
+    ):
+        self.latency = latency
+        self.chunk_latency = chunk_latency
+        self.chunk_size = chunk_size
+        self.logger = logger
+        self.buckets = BucketRegistry(logger=logger)
+        self.objects: dict[str, dict[str, tuple[bytes, ObjectStat]]] = {}
+        self.uploads: dict[str, dict[int, bytes]] = {}
+        self.counters = {"requests": 0, "bytes_in": 0, "bytes_out": 0}
+        self._upload_ids = itertools.count(1)
+
+    async def _request(self) -> None:
+        self.counters["requests"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def _put(
+        self, bucket_name: str, object_name: str, data: bytes, content_type: str
+    ) -> UploadedObject:
+        etag = hashlib.md5(data).hexdigest()
+        self.objects.setdefault(bucket_name, {})[object_name] = (
+            data,
+            ObjectStat(
+                bucket_name=bucket_name,
+                object_name=object_name,
+                size=len(data),
+                etag=etag,
+                last_modified=datetime.now(timezone.utc).replace(microsecond=0),
+                content_type=content_type,
+            ),
+        )
+        self.counters["bytes_in"] += len(data)
+        return UploadedObject(object_name=object_name, etag=etag, size=len(data))
+
+    async def list_buckets(self) -> list[str]:
+        await self._request()
+        return list(self.objects)
+
+    async def bucket_exists(self, bucket_name: str) -> bool:
+        await self._request()
+        return bucket_name in self.objects
+
+    async def make_bucket(self, bucket_name: str) -> None:
+        await self._request()
+        self.objects.setdefault(bucket_name, {})
+
+    async def upload_file(
+        self,
+        bucket_name: str,
+        object_name: str,
+        mimetype: str,
+        data: FileReaderProtocol,
+        **kwargs,
+    ) -> UploadedObject:
+        object_name = self.format_masks(object_name, mimetype)
+        await self.ensure_bucket(bucket_name)
+        await self._request()
+        return self._put(
+            bucket_name,
+            object_name,
+            data.read(),
+            kwargs.get("content_type", mimetype),
+        )
+
+    async def upload_stream(
+        self,
+        bucket_name: str,
+        object_name: str,
+        mimetype: str,
+        stream: AsyncIterator[bytes],
+        **kwargs,
+    ) -> UploadedObject:
+        await self.ensure_bucket(bucket_name)
+        await self._request()
+        data = b"".join([chunk async for chunk in stream])
+        return self._put(
+            bucket_name, object_name, data, kwargs.get("content_type", mimetype)
+        )
+
+    async def download_file(
+        self, bucket_name: str, object_name: str, **kwargs
+    ) -> bytes:
+        await self._request()
+        data, _ = self.objects[bucket_name][object_name]
+        self.counters["bytes_out"] += len(data)
+        return data
+
+    async def download_file_chunk(
+        self,
+        bucket_name: str,
+        object_name: str,
+        offset: int = 0,
+        length: Optional[int] = None,
+        **kwargs,
+    ) -> AsyncGenerator:
+        if length == 0:
+            return
+        await self._request()
+        data, _ = self.objects[bucket_name][object_name]
+        end = offset + length if length else len(data)
+        view = memoryview(data)
+        for start in range(offset, end, self.chunk_size):
+            if self.chunk_latency:
+                await asyncio.sleep(self.chunk_latency)
+            chunk = bytes(view[start : min(start + self.chunk_size, end)])
+            self.counters["bytes_out"] += len(chunk)
+            yield chunk
+
+    async def delete_object(self, bucket_name: str, object_name: str, **kwargs) -> None:
+        await self._request()
+        self.objects.get(bucket_name, {}).pop(object_name, None)
+
+    async def delete_objects(
+        self, bucket_name: str, object_names: list[str]
+    ) -> list[str]:
+        for batch in self.batches(object_names):
+            await self._request()
+            for object_name in batch:
+                self.objects.get(bucket_name, {}).pop(object_name, None)
+        return []
+
+    async def get_list_objects(self, bucket_name: str, **kwargs) -> Iterator:
+        await self._request()
+        prefix = kwargs.get("prefix") or ""
+        return iter(
+            [
+                stat
+                for name, (_, stat) in self.objects.get(bucket_name, {}).items()
+                if name.startswith(prefix)
+            ]
+        )
+
+    async def check_file_exist(
+        self, bucket_name: str, object_name: str, **kwargs
+    ) -> bool:
+        return await self.stat_file(bucket_name, object_name) is not None
+
+    async def stat_file(
+        self, bucket_name: str, object_name: str, **kwargs
+    ) -> Optional[ObjectStat]:
+        await self._request()
+        stored = self.objects.get(bucket_name, {}).get(object_name)
+        return stored and stored[1]
+
+    async def presigned_url(
+        self, method: str, bucket_name: str, object_name: str, expires: int
+    ) -> str:
+        return f"memory://{bucket_name}/{object_name}?method={method}&expires={expires}"
+
+    async def create_multipart_upload(
+        self, bucket_name: str, object_name: str, headers: dict
+    ) -> str:
+        await self._request()
+        upload_id = str(next(self._upload_ids))
+        self.uploads[upload_id] = {}
+        return upload_id
+
+    async def upload_part(
+        self,
+        bucket_name: str,
+        object_name: str,
+        upload_id: str,
+        part_number: int,
+        data: bytes,
+    ) -> str:
+        await self._request()
+        self.uploads[upload_id][part_number] = bytes(data)
+        return hashlib.md5(data).hexdigest()
+
+    async def complete_multipart_upload(
+        self,
+        bucket_name: str,
+        object_name: str,
+        upload_id: str,
+        parts: list[tuple[int, str]],
+    ) -> Optional[str]:
+        await self._request()
+        stored = self.uploads.pop(upload_id)
+        data = b"".join(stored[number] for number, _ in sorted(parts))
+        return self._put(bucket_name, object_name, data, "").etag
+
+    async def abort_multipart_upload(
+        self, bucket_name: str, object_name: str, upload_id: str
+    ) -> None:
+        await self._request()
+        self.uploads.pop(upload_id, None)
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "objects": sum(len(objects) for objects in self.objects.values()),
+        }
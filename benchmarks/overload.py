@@ -0,0 +1,106 @@
+"""
+Поведение пула I/O при перегрузке: общий пул потоков с неограниченной
+очередью против IOExecutor (ограниченная очередь с приоритетами и
+бюджетом ожидания). Вызовы S3 имитируются блокирующим sleep:
+metadata - короткие, bulk - длинные; запросы поступают с постоянной
+частотой выше пропускной способности пула.
+
+Запуск из корня репозитория:
+    python benchmarks/overload.py --workers 8 --rate 1500 --duration 5
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from infrastructure.exceptions.minio_exceptions import (  # noqa: E402
+    StorageOverloaded,
+)
+from infrastructure.handlers.io_executor import (  # noqa: E402
+    BULK,
+    METADATA,
+    PRIORITY_NAMES,
+    IOExecutor,
+)
+
+
+async def unbounded(pool: ThreadPoolExecutor, func, priority: int) -> None:
+    await asyncio.get_running_loop().run_in_executor(pool, func)
+
+
+async def admitted(executor: IOExecutor, func, priority: int) -> None:
+    await executor.run(func=func, priority=priority)
+
+
+async def run(name: str, call, args: argparse.Namespace) -> None:
+    latencies = {METADATA: [], BULK: []}
+    rejected = {METADATA: 0, BULK: 0}
+    durations = {METADATA: args.metadata_ms / 1000, BULK: args.bulk_ms / 1000}
+
+    async def one(priority: int) -> None:
+        started = time.perf_counter()
+        try:
+            await call(lambda: time.sleep(durations[priority]), priority)
+        except StorageOverloaded:
+            rejected[priority] += 1
+            return
+        latencies[priority].append(time.perf_counter() - started)
+
+    tasks = []
+    started = time.perf_counter()
+    while (elapsed := time.perf_counter() - started) < args.duration:
+        while len(tasks) < elapsed * args.rate:
+            priority = BULK if random.random() < args.bulk_share else METADATA
+            tasks.append(asyncio.create_task(one(priority)))
+        await asyncio.sleep(0.005)
+    await asyncio.gather(*tasks)
+    for priority, values in latencies.items():
+        values.sort()
+        p99 = values[min(len(values) - 1, int(len(values) * 0.99))] if values else 0
+        print(  # noqa: T201
+            f"{name:>10} {PRIORITY_NAMES[priority]:>8}: "
+            f"выполнено {len(values):>6}, отклонено {rejected[priority]:>6}, "
+            f"p50 {statistics.median(values or [0]) * 1000:8.1f} ms, "
+            f"p99 {p99 * 1000:8.1f} ms"
+        )
+
+
+async def main(args: argparse.Namespace) -> None:
+    pool = ThreadPoolExecutor(max_workers=args.workers)
+    await run("unbounded", lambda func, priority: unbounded(pool, func, priority), args)
+    pool.shutdown()
+    executor = IOExecutor(
+        name="benchmark",
+        max_workers=args.workers,
+        max_queue=args.max_queue,
+        wait_budget=args.wait_budget,
+    )
+    await run(
+        "admission",
+        lambda func, priority: admitted(executor, func, priority),
+        args,
+    )
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=1500)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--metadata-ms", type=float, default=5)
+    parser.add_argument("--bulk-ms", type=float, default=50)
+    parser.add_argument("--bulk-share", type=float, default=0.2)
+    parser.add_argument("--max-queue", type=int, default=200)
+    parser.add_argument("--wait-budget", type=float, default=0.5)
+    main_args = parser.parse_args()
+    asyncio.run(main(main_args))
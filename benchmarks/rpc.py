@@ -0,0 +1,117 @@
+"""
+Стоимость запроса метаданных файла: HTTP (GET /file/one) против RPC
+поверх Redis Streams (file.get). Сервис запускается отдельным процессом
+uvicorn с settings.yml из текущего каталога, нужны Postgres, Redis и S3.
+
+Запуск из корня репозитория:
+    python benchmarks/rpc.py --requests 5000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import base64
+import os
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+from redis.asyncio import Redis
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.append(SRC)
+
+from application.config import settings  # noqa: E402
+from infrastructure.mq.redis_rpc import RedisStreamRPC  # noqa: E402
+
+
+async def measure(call, requests: int, concurrency: int) -> tuple[float, list[float]]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return time.perf_counter() - started, latencies
+
+
+def report(name: str, elapsed: float, latencies: list[float]) -> None:
+    latencies.sort()
+    print(  # noqa: T201
+        f"{name:>5}: {len(latencies) / elapsed:8.0f} req/s, "
+        f"p50 {statistics.median(latencies) * 1000:6.2f} ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.2f} ms"
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient) -> None:
+    for _ in range(100):
+        try:
+            await client.get("/file/all", params={"limit": 1})
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("Сервис не запустился")
+
+
+async def main(port: int, requests: int, concurrency: int) -> None:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "application.app:media_service"]
+        + ["--port", str(port), "--log-level", "warning"],
+        env={**os.environ, "PYTHONPATH": SRC},
+    )
+    rpc = RedisStreamRPC(Redis(**settings.REDIS, decode_responses=True))
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}",
+            limits=httpx.Limits(max_connections=concurrency),
+        ) as client:
+            await wait_ready(client)
+            file = await rpc.call(
+                "file.create",
+                file={
+                    "name": "benchmark.txt",
+                    "path": "benchmark.txt",
+                    "bucket": "benchmark",
+                    "mimetype": "text/plain",
+                    "references": None,
+                    "reference_uuid": None,
+                    "tags": {},
+                    "jdata": {},
+                },
+                content=base64.b64encode(uuid.uuid4().bytes).decode(),
+            )
+
+            async def http_get():
+                response = await client.get(
+                    "/file/one", params={"file_uuid": file["uuid"]}
+                )
+                response.raise_for_status()
+
+            async def rpc_get():
+                await rpc.call("file.get", uuid=file["uuid"])
+
+            for name, call in (("http", http_get), ("rpc", rpc_get)):
+                await measure(call, concurrency, concurrency)
+                report(name, *await measure(call, requests, concurrency))
+            await rpc.call("file.delete", uuid=file["uuid"])
+    finally:
+        await rpc.close()
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8013)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.port, args.requests, args.concurrency))
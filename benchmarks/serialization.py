@@ -0,0 +1,101 @@
+"""
+Стоимость сериализации страницы файлов: прежний путь (ORM-объекты ->
+as_dict -> FileReturnData -> валидация и сериализация response_model ->
+jsonable_encoder -> json.dumps) против быстрого (строки Core -> словарь
+один раз -> orjson). Строки создаются в памяти, БД не нужна.
+
+Запуск из корня репозитория:
+    python benchmarks/serialization.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import Callable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy.engine.result import result_tuple
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from domain.file.schema import FilePage, FileReturnData  # noqa: E402
+from infrastructure.database.models import File  # noqa: E402
+from infrastructure.server.responses import ORJSONResponse  # noqa: E402
+
+COLUMNS = [column.name for column in File.__table__.columns]
+
+
+def values(index: int) -> dict:
+    now = datetime.now()
+    return {
+        "uuid": uuid.uuid4(),
+        "created_at": now,
+        "updated_at": now,
+        "name": f"file-{index}.jpg",
+        "references": "user",
+        "reference_uuid": uuid.uuid4(),
+        "bucket": "benchmark",
+        "path": f"user/{index}/file-{index}.jpg",
+        "mimetype": "image/jpg",
+        "size": 1024 + index,
+        "etag": f"{index:032x}",
+        "checksum": f"{index:064x}",
+        "jdata": {"width": 640, "height": 480},
+        "tags": {"source": "benchmark"},
+    }
+
+
+def legacy(rows: list[File]) -> bytes:
+    page = FilePage(
+        items=[FileReturnData.model_validate(row.as_dict()) for row in rows],
+        next_cursor=None,
+    )
+    adapter = TypeAdapter(FilePage)
+    content = adapter.dump_python(adapter.validate_python(page), mode="json")
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def fast(rows: list) -> bytes:
+    page = {"items": [dict(row._mapping) for row in rows], "next_cursor": None}
+    return ORJSONResponse(page).body
+
+
+def measure(func: Callable, rows: list, repeat: int) -> tuple[float, int]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = func(rows)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), len(body)
+
+
+def main(sizes: list[int], repeat: int) -> None:
+    make_row = result_tuple(COLUMNS)
+    for size in sizes:
+        data = [values(index) for index in range(size)]
+        orm_rows = [File(**item) for item in data]
+        core_rows = [make_row([item[name] for name in COLUMNS]) for item in data]
+        assert set(dict(core_rows[0]._mapping)) == set(FileReturnData.model_fields)
+        legacy_time, legacy_size = measure(legacy, orm_rows, repeat)
+        fast_time, fast_size = measure(fast, core_rows, repeat)
+        print(  # noqa: T201
+            f"{size:>7} строк: прежний {legacy_time * 1000:9.1f} ms "
+            f"({legacy_size} байт), быстрый {fast_time * 1000:8.1f} ms "
+            f"({fast_size} байт), ускорение x{legacy_time / fast_time:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.sizes, args.repeat)
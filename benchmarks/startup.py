@@ -0,0 +1,69 @@
+"""
+Время запуска сервиса и стоимость первых запросов с прогревом пулов
+и без него. Используются настоящие Postgres, Redis и S3 из settings.yml,
+запросы выполняются в процессе через ASGI-транспорт httpx.
+
+Запуск из корня репозитория:
+    python benchmarks/startup.py --requests 16 --path /file/all
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from application.app import media_service as app  # noqa: E402
+from application.config import settings  # noqa: E402
+
+
+async def burst(client: httpx.AsyncClient, path: str, requests: int) -> list[float]:
+    async def one() -> float:
+        started = time.perf_counter()
+        response = await client.get(path)
+        response.raise_for_status()
+        return time.perf_counter() - started
+
+    return await asyncio.gather(*(one() for _ in range(requests)))
+
+
+async def run(name: str, db: int, s3: int, path: str, requests: int) -> None:
+    settings.set("LIFESPAN.db_connections", db)
+    settings.set("LIFESPAN.s3_connections", s3)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://benchmark"
+        ) as client:
+            first = await burst(client, path, requests)
+            second = await burst(client, path, requests)
+    report(name, app.state.startup_seconds, first, second)
+
+
+def report(name: str, startup: float, first: list[float], second: list[float]):
+    print(  # noqa: T201
+        f"{name:>10}: startup {startup * 1000:8.1f} ms, "
+        f"first p50 {statistics.median(first) * 1000:7.1f} ms "
+        f"max {max(first) * 1000:7.1f} ms, "
+        f"warm p50 {statistics.median(second) * 1000:7.1f} ms "
+        f"max {max(second) * 1000:7.1f} ms"
+    )
+
+
+async def main(path: str, requests: int) -> None:
+    await run("cold", 0, 1, path, requests)
+    await run("warm", requests, requests, path, requests)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--path", default="/file/all")
+    parser.add_argument("--requests", type=int, default=16)
+    args = parser.parse_args()
+    asyncio.run(main(args.path, args.requests))
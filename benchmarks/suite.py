@@ -0,0 +1,242 @@
+"""
+Нагрузочный набор сценариев create, get, list и download без внешних
+сервисов: приложение из application/app.py, S3 и реестры заменены
+объектами в памяти через OnlyContainer.override. Для каждого размера
+содержимого и уровня конкурентности измеряются запросы в секунду и
+задержка p50/p99; результаты пишутся в JSON для сравнения запусков.
+
+Запуск из корня репозитория:
+    python benchmarks/suite.py --sizes 1024 1048576 --concurrency 1 32 \
+        --latency 0.005 --output results.json
+    python benchmarks/suite.py --compare results.json --threshold 0.15
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import uuid
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+import httpx
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from fakes import (  # noqa: E402
+    MemoryBlobRegistry,
+    MemoryFileManager,
+    MemoryFileReadRegistry,
+    MemoryFileStore,
+    MemoryFileWriteRegistry,
+)
+
+from application.app import media_service as app  # noqa: E402
+from application.container import Container  # noqa: E402
+
+SCENARIOS = ["create", "get", "list", "download"]
+
+Request = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+def metadata(index: int) -> str:
+    return json.dumps(
+        {
+            "name": f"file-{index}.bin",
+            "path": f"benchmark/{index}",
+            "tags": {"source": "benchmark"},
+            "jdata": {},
+            "references": "benchmark",
+            "reference_uuid": str(uuid.uuid4()),
+            "bucket": "benchmark",
+            "mimetype": "application/octet-stream",
+        }
+    )
+
+
+def percentile(timings: list[float], value: float) -> float:
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * value))]
+
+
+async def measure(
+    client: httpx.AsyncClient, request: Request, requests: int, concurrency: int
+) -> dict:
+    timings: list[float] = []
+    errors = 0
+    indexes = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for index in indexes:
+            started = time.perf_counter()
+            response = await request(client, index)
+            timings.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(statistics.median(timings) * 1000, 3),
+        "p99_ms": round(percentile(timings, 0.99) * 1000, 3),
+    }
+
+
+def scenarios(size: int, created: list[str]) -> dict[str, Request]:
+    body = os.urandom(size)
+
+    async def create(client: httpx.AsyncClient, index: int) -> httpx.Response:
+        response = await client.post(
+            "/file/create",
+            files={"data": ("file.bin", uuid.uuid4().bytes + body)},
+            data={"incoming_data": metadata(index)},
+        )
+        if response.status_code == 200:
+            created.append(response.json()["uuid"])
+        return response
+
+    async def get(client: httpx.AsyncClient, index: int) -> httpx.Response:
+        file_uuid = created[index % len(created)]
+        return await client.get("/file/one", params={"file_uuid": file_uuid})
+
+    async def get_list(client: httpx.AsyncClient, index: int) -> httpx.Response:
+        return await client.get("/file/all", params={"limit": 100})
+
+    async def download(client: httpx.AsyncClient, index: int) -> httpx.Response:
+        file_uuid = created[index % len(created)]
+        return await client.get(f"/file/{file_uuid}/content")
+
+    return {"create": create, "get": get, "list": get_list, "download": download}
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    results = []
+    for size in args.sizes:
+        for concurrency in args.concurrency:
+            store = MemoryFileStore()
+            storage = MemoryFileManager(
+                latency=args.latency, chunk_latency=args.chunk_latency
+            )
+            created: list[str] = []
+            with ExitStack() as stack:
+                for provider, fake in (
+                    (Container.file_read_registry, MemoryFileReadRegistry(store)),
+                    (Container.file_write_registry, MemoryFileWriteRegistry(store)),
+                    (Container.blob_registry, MemoryBlobRegistry()),
+                    (Container.file_hosting_client, storage),
+                ):
+                    stack.enter_context(provider.override(fake))
+                async with httpx.AsyncClient(
+                    transport=httpx.ASGITransport(app=app),
+                    base_url="http://benchmark",
+                    timeout=None,
+                ) as client:
+                    requests = scenarios(size, created)
+                    if "create" not in args.scenarios:
+                        await measure(
+                            client, requests["create"], args.requests, concurrency
+                        )
+                    for name, request in requests.items():
+                        if name not in args.scenarios:
+                            continue
+                        result = {
+                            "scenario": name,
+                            "size": size,
+                            "concurrency": concurrency,
+                            **await measure(
+                                client, request, args.requests, concurrency
+                            ),
+                        }
+                        results.append(result)
+                        report(result)
+    return results
+
+
+def report(result: dict) -> None:
+    print(  # noqa: T201
+        f"{result['scenario']:>9} size {result['size']:>8} "
+        f"c {result['concurrency']:>3}: {result['rps']:>9.1f} req/s, "
+        f"p50 {result['p50_ms']:8.2f} ms, p99 {result['p99_ms']:8.2f} ms, "
+        f"errors {result['errors']}"
+    )
+
+
+def compare(results: list[dict], baseline_path: str, threshold: float) -> int:
+    """
+    Сравнение с предыдущим запуском: регрессия - падение req/s или рост p99
+    больше чем на threshold (доля)
+    """
+    with open(baseline_path) as baseline_file:
+        baseline = {
+            (item["scenario"], item["size"], item["concurrency"]): item
+            for item in json.load(baseline_file)["results"]
+        }
+    regressions = 0
+    for result in results:
+        previous = baseline.get(
+            (result["scenario"], result["size"], result["concurrency"])
+        )
+        if previous is None:
+            continue
+        rps = result["rps"] / previous["rps"] - 1
+        p99 = result["p99_ms"] / previous["p99_ms"] - 1
+        regressed = rps < -threshold or p99 > threshold
+        regressions += regressed
+        print(  # noqa: T201
+            f"{'REGRESSION' if regressed else 'ok':>10} {result['scenario']:>9} "
+            f"size {result['size']:>8} c {result['concurrency']:>3}: "
+            f"req/s {rps:+.1%}, p99 {p99:+.1%}"
+        )
+    return regressions
+
+
+def main(args: argparse.Namespace) -> int:
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(
+                {
+                    "meta": {
+                        "timestamp": datetime.now(timezone.utc).isoformat(),
+                        "python": platform.python_version(),
+                        "platform": platform.platform(),
+                        "requests": args.requests,
+                        "latency": args.latency,
+                        "chunk_latency": args.chunk_latency,
+                    },
+                    "results": results,
+                },
+                output_file,
+                indent=2,
+            )
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1024, 64 * 1024, 1024 * 1024]
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--chunk-latency", type=float, default=0.0)
+    parser.add_argument("--output")
+    parser.add_argument("--compare")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    sys.exit(main(parser.parse_args()))
@@ -1,11 +1,20 @@
 from application.config import settings
 from application.container import Container
+from infrastructure.server.middleware import MetricsMiddleware
 from infrastructure.server.server import Server
 from presentation.file import FileRouter
+from presentation.file_rpc import FileRPC
+from presentation.internal import InternalRouter
+from presentation.metrics import MetricsRouter
 
 media_service = Server(
     name=settings.NAME,
-    routers=[FileRouter.api_router],
-    start_callbacks=[],
-    stop_callbacks=[Container.redis().close],
+    routers=[
+        FileRouter.api_router,
+        InternalRouter.api_router,
+        MetricsRouter.api_router,
+    ],
+    start_callbacks=[Container.startup, FileRPC.start],
+    stop_callbacks=[Container.shutdown],
+    middlewares=[MetricsMiddleware],
 ).app
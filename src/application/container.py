@@ -1,10 +1,39 @@
+import asyncio
+import logging
+
 from redis.asyncio import Redis
 
 from application.config import settings
-from domain.file.registry import FileReadRegistry, FileWriteRegistry
+from domain.file.registry import BlobRegistry, FileReadRegistry, FileWriteRegistry
 from infrastructure.base_entities.singleton import OnlyContainer, Singleton
+from infrastructure.cache.presigned_cache import PresignedUrlCache
+from infrastructure.cache.two_tier_cache import TwoTierCache
 from infrastructure.database.alchemy_gateway import SessionManager
+from infrastructure.database.mat_view_refresher import MatViewRefresher
+from infrastructure.database.outbox_relay import OutboxRelay
+from infrastructure.database.replicas import ReplicaRouter
+from infrastructure.file_manager.aio_s3_client import AioS3Client
 from infrastructure.file_manager.minio_client import MinioClient
+from infrastructure.file_manager.multipart import MultipartUploader
+from infrastructure.handlers.batch_loader import BatchLoader
+from infrastructure.handlers.io_executor import IOExecutor
+from infrastructure.handlers.singleflight import SingleFlight
+from infrastructure.handlers.transfers import TransferTracker
+from infrastructure.mq.kafka_producer import KafkaProducer
+from infrastructure.mq.memory_producer import MemoryProducer
+from infrastructure.mq.redis_rpc import RedisStreamRPC
+
+POSTGRES_OPTIONS = dict(
+    dialect=settings.POSTGRES.dialect,
+    login=settings.POSTGRES.login,
+    password=settings.POSTGRES.password,
+    database=settings.POSTGRES.database,
+    echo=settings.POSTGRES.echo,
+    pool_size=settings.POSTGRES.pool_min_size,
+    max_overflow=settings.POSTGRES.pool_max_size - settings.POSTGRES.pool_min_size,
+    pool_timeout=settings.POSTGRES.pool_timeout,
+    pgbouncer=settings.POSTGRES.pgbouncer,
+)
 
 
 class Container(Singleton):
@@ -15,18 +44,105 @@ class Container(Singleton):
         decode_responses=True,
     )
 
+    rpc = OnlyContainer(
+        RedisStreamRPC,
+        redis=redis,
+        prefix=settings.RPC.prefix,
+        group=settings.RPC.group,
+        timeout=settings.RPC.timeout,
+        batch_size=settings.RPC.batch_size,
+        block=settings.RPC.block,
+        maxlen=settings.RPC.maxlen,
+        claim_idle=settings.RPC.claim_idle,
+        reply_ttl=settings.RPC.reply_ttl,
+    )
+
+    file_cache = OnlyContainer(
+        TwoTierCache,
+        redis=redis,
+        prefix=settings.CACHE.prefix,
+        channel=settings.CACHE.channel,
+        local_maxsize=settings.CACHE.local_maxsize,
+        local_ttl=settings.CACHE.local_ttl,
+        redis_ttl=settings.CACHE.redis_ttl,
+        tombstone_ttl=settings.CACHE.tombstone_ttl,
+    )
+
+    presigned_cache = OnlyContainer(
+        PresignedUrlCache,
+        redis=redis,
+        prefix=settings.PRESIGN.prefix,
+        margin=settings.PRESIGN.margin,
+    )
+
     alchemy_manager = OnlyContainer(
         SessionManager,
-        dialect=settings.POSTGRES.dialect,
         host=settings.POSTGRES.host,
-        login=settings.POSTGRES.login,
-        password=settings.POSTGRES.password,
         port=settings.POSTGRES.port,
-        database=settings.POSTGRES.database,
-        echo=settings.POSTGRES.echo,
+        **POSTGRES_OPTIONS,
+    )
+
+    db_router = OnlyContainer(
+        ReplicaRouter,
+        primary=alchemy_manager,
+        replicas=[
+            {**POSTGRES_OPTIONS, **replica} for replica in settings.POSTGRES.replicas
+        ],
+        check_interval=settings.POSTGRES.replica_check_interval,
+        max_lag=settings.POSTGRES.replica_max_lag,
+        sticky_seconds=settings.POSTGRES.sticky_seconds,
+    )
+
+    mat_view_refresher = OnlyContainer(
+        MatViewRefresher,
+        session_manager=alchemy_manager,
+        views=["file_stats"],
+        interval=settings.POSTGRES.mat_view_time * 60,
+    )
+
+    kafka_producer = OnlyContainer(
+        KafkaProducer,
+        host=settings.KAFKA.host,
+        port=settings.KAFKA.port,
+        compression_type=settings.OUTBOX.compression,
+        linger_ms=settings.OUTBOX.linger_ms,
+        max_batch_size=settings.OUTBOX.max_batch_size,
+    )
+
+    memory_producer = OnlyContainer(MemoryProducer)
+
+    event_producer = (
+        memory_producer if settings.OUTBOX.broker == "memory" else kafka_producer
+    )
+
+    outbox_relay = OnlyContainer(
+        OutboxRelay,
+        session_manager=alchemy_manager,
+        producer=event_producer,
+        batch_size=settings.OUTBOX.batch_size,
+        interval=settings.OUTBOX.interval,
+        retention=settings.OUTBOX.retention,
+        send_timeout=settings.OUTBOX.send_timeout,
+    )
+
+    multipart_uploader = OnlyContainer(
+        MultipartUploader,
+        part_size=settings.S3.MULTIPART.part_size,
+        concurrency=settings.S3.MULTIPART.concurrency,
+        upload_memory=settings.S3.MULTIPART.upload_memory,
+        process_memory=settings.S3.MULTIPART.process_memory,
+        retry_count=settings.S3.MULTIPART.retry_count,
     )
 
-    file_hosting_client = OnlyContainer(
+    s3_executor = OnlyContainer(
+        IOExecutor,
+        name="s3",
+        max_workers=settings.S3.pool_max_size,
+        max_queue=settings.S3.EXECUTOR.max_queue,
+        wait_budget=settings.S3.EXECUTOR.wait_budget,
+    )
+
+    minio_client = OnlyContainer(
         MinioClient,
         protocol=settings.S3.protocol,
         host=settings.S3.host,
@@ -35,15 +151,107 @@ class Container(Singleton):
         secret_key=settings.S3.secret_key,
         region=settings.S3.region,
         chunk_size=settings.S3.chunk_size,
+        max_chunk_size=settings.S3.max_chunk_size,
+        chunk_latency=settings.S3.chunk_latency,
+        pool_max_size=settings.S3.pool_max_size,
+        multipart=multipart_uploader,
         loop=None,
+        executor=s3_executor,
+    )
+
+    aio_s3_client = OnlyContainer(
+        AioS3Client,
+        protocol=settings.S3.protocol,
+        host=settings.S3.host,
+        port=settings.S3.port,
+        access_key=settings.S3.access_key,
+        secret_key=settings.S3.secret_key,
+        region=settings.S3.region,
+        chunk_size=settings.S3.chunk_size,
+        pool_max_size=settings.S3.pool_max_size,
+        keepalive_timeout=settings.S3.keepalive_timeout,
+        multipart=multipart_uploader,
+    )
+
+    file_hosting_client = (
+        aio_s3_client if settings.S3.backend == "aiohttp" else minio_client
     )
 
     file_read_registry = OnlyContainer(
         FileReadRegistry,
-        session_manager=alchemy_manager(),
+        session_manager=alchemy_manager,
+        cache=file_cache,
+        replicas=db_router,
+    )
+
+    singleflight = OnlyContainer(SingleFlight)
+
+    transfers = OnlyContainer(TransferTracker)
+
+    reference_loader = OnlyContainer(
+        BatchLoader,
+        batch_load=lambda keys: Container.file_read_registry().get_by_references(keys),
+        window=settings.LOADER.window,
+        max_batch_size=settings.LOADER.max_batch_size,
+        default=[],
     )
 
     file_write_registry = OnlyContainer(
         FileWriteRegistry,
-        session_manager=alchemy_manager(),
+        session_manager=alchemy_manager,
+        cache=file_cache,
+        replicas=db_router,
+        events_topic=settings.OUTBOX.topic if settings.OUTBOX.enabled else None,
+    )
+
+    blob_registry = OnlyContainer(
+        BlobRegistry,
+        session_manager=alchemy_manager,
     )
+
+    @classmethod
+    async def startup(cls) -> None:
+        """
+        Создание ресурсов внутри запущенного цикла событий и прогрев пулов:
+        соединения с БД и S3 открываются до первых запросов
+        """
+        await cls.file_cache().start()
+        await cls.mat_view_refresher().start()
+        await cls.db_router().start()
+        if settings.OUTBOX.enabled:
+            await cls.outbox_relay().start()
+        await asyncio.gather(
+            cls.alchemy_manager().warm_up(settings.LIFESPAN.db_connections),
+            cls.db_router().warm_up(settings.LIFESPAN.db_connections),
+            cls.file_hosting_client().warm_up(settings.LIFESPAN.s3_connections),
+        )
+
+    @classmethod
+    async def shutdown(cls) -> None:
+        """
+        Остановка приема RPC и ожидание выполняющихся передач, затем
+        остановка фоновых задач и закрытие пулов; закрываются только
+        созданные ресурсы
+        """
+        if cls.rpc.initialized:
+            await cls.rpc().close()
+        if cls.transfers.initialized:
+            await cls.transfers().drain(settings.LIFESPAN.drain_timeout)
+        for provider, method in (
+            (cls.file_cache, "stop"),
+            (cls.mat_view_refresher, "stop"),
+            (cls.outbox_relay, "stop"),
+            (cls.file_hosting_client, "close"),
+            (cls.db_router, "close"),
+            (cls.alchemy_manager, "close"),
+            (cls.redis, "aclose"),
+        ):
+            if not provider.initialized:
+                continue
+            try:
+                await getattr(provider(), method)()
+            except Exception as error:
+                logging.error("Ошибка остановки %s: %s", provider.class_type, error)
+        for provider in vars(cls).values():
+            if isinstance(provider, OnlyContainer):
+                provider.reset()
@@ -1,56 +1,243 @@
-from typing import Any, List, Optional
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import AsyncGenerator, Awaitable, Callable, Optional
 from uuid import UUID
 
 from asyncpg import UniqueViolationError
-from sqlalchemy import delete, insert, select, update
+from sqlalchemy import (
+    BigInteger,
+    Integer,
+    Text,
+    any_,
+    bindparam,
+    delete,
+    func,
+    insert,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
-from domain.file.schema import CreateFile
+from domain.file.schema import (
+    CreateFile,
+    ExportFiles,
+    FileFilter,
+    FileReturnData,
+    FileStats,
+    ListFiles,
+)
 from infrastructure.base_entities.abs_repository import (
     AbstractReadRepository,
     AbstractWriteRepository,
 )
+from infrastructure.base_entities.base_mq import BaseMQ
+from infrastructure.cache.two_tier_cache import TwoTierCache
 from infrastructure.database.alchemy_gateway import SessionManager
-from infrastructure.database.models import File
-from infrastructure.exceptions.minio_exceptions import FileAlreadyExist
+from infrastructure.database.models import Blob, File, OutboxEvent, file_stats
+from infrastructure.database.replicas import ReplicaRouter
+from infrastructure.exceptions.minio_exceptions import FileAlreadyExist, InvalidCursor
+from infrastructure.handlers.cursor_handler import decode_cursor, encode_cursor
+from infrastructure.handlers.metrics import observed
+
+
+def uuid_in(column, uuids: list[UUID]):
+    """
+    column = ANY($1): один параметр-массив вместо IN со списком параметров
+    """
+    return column == any_(
+        bindparam("uuids", value=list(uuids), type_=ARRAY(PG_UUID(as_uuid=True)))
+    )
 
 
 class FileReadRegistry(AbstractReadRepository):
-    def __init__(self, session_manager: SessionManager):
+    def __init__(
+        self,
+        session_manager: SessionManager,
+        cache: Optional[TwoTierCache] = None,
+        replicas: Optional[ReplicaRouter] = None,
+    ):
         super().__init__()
         self.model = File
-        self.transactional_session: async_sessionmaker = (
-            session_manager.transactional_session
-        )
-        self.async_session_factory: async_sessionmaker = (
-            session_manager.async_session_factory
-        )
+        self.cache = cache
+        self.session_manager = session_manager
+        self.replicas = replicas
 
-    async def get(self, file_uuid: UUID) -> Optional[File]:
-        async with self.transactional_session() as session:
+    def _reader(self, *keys) -> SessionManager:
+        if self.replicas is None:
+            return self.session_manager
+        return self.replicas.reader(*keys)
+
+    def _filter(self, stmt, cmd: FileFilter):
+        for name in FileFilter.model_fields:
+            if (value := getattr(cmd, name)) is not None:
+                stmt = stmt.where(getattr(self.model, name) == value)
+        return stmt
+
+    @observed("db", "file.get")
+    async def get(self, file_uuid: UUID) -> Optional[FileReturnData]:
+        key = str(file_uuid)
+        if self.cache and (cached := await self.cache.get(key)):
+            return FileReturnData.model_validate(cached)
+        reader = self._reader(file_uuid)
+        async with reader.transactional_session() as session:
             stmt = select(self.model).filter(self.model.uuid == file_uuid)
             result = await session.execute(stmt)
             answer = result.scalar_one_or_none()
+        if answer is None:
+            return None
+        data = answer.as_dict()
+        # кэш общий для всех экземпляров: данные реплики могут отставать,
+        # поэтому кэш заполняется только чтением из primary
+        if self.cache and reader is self.session_manager:
+            await self.cache.set(key, data)
+        return FileReturnData.model_validate(data)
+
+    @observed("db", "file.get_many")
+    async def get_many(self, uuids: list[UUID]) -> list[Row]:
+        """
+        Строки таблицы без ORM-объектов: доступ к полям как к атрибутам,
+        row._mapping - словарь колонок
+        """
+        stmt = select(self.model.__table__).where(uuid_in(self.model.uuid, uuids))
+        async with self._reader(*uuids).engine.connect() as connection:
+            result = await connection.execute(stmt)
+            return list(result)
+
+    @observed("db", "file.get_by_references")
+    async def get_by_references(
+        self, reference_uuids: list[UUID]
+    ) -> dict[UUID, list[FileReturnData]]:
+        stmt = (
+            select(self.model)
+            .where(uuid_in(self.model.reference_uuid, reference_uuids))
+            .order_by(self.model.created_at, self.model.uuid)
+        )
+        async with self._reader(*reference_uuids).async_session_factory() as session:
+            result = await session.execute(stmt)
+            rows = result.scalars().all()
+        answer: dict[UUID, list[FileReturnData]] = {}
+        for row in rows:
+            answer.setdefault(row.reference_uuid, []).append(
+                FileReturnData.model_validate(row.as_dict())
+            )
         return answer
 
-    async def get_list(
-        self,
-        parameter: Any = "created_at",
-    ) -> Optional[List[File]]:
-        async with self.async_session_factory() as session:
-            final = None
-            if option := getattr(self.model, parameter):
-                stmt = select(self.model).order_by(option)
-                result = await session.execute(stmt)
-                final = result.scalars().all()
-        return final
+    @observed("db", "file.get_stats")
+    async def get_stats(self, cmd: FileFilter) -> FileStats:
+        """
+        Агрегаты из материализованного представления file_stats
+        (актуальны на момент последнего обновления)
+        """
+        stmt = select(
+            file_stats.c.mimetype,
+            func.sum(file_stats.c.file_count),
+            func.sum(file_stats.c.total_bytes),
+        ).group_by(file_stats.c.mimetype)
+        for name in FileFilter.model_fields:
+            if (value := getattr(cmd, name)) is not None:
+                stmt = stmt.where(file_stats.c[name] == value)
+        async with self._reader().async_session_factory() as session:
+            rows = (await session.execute(stmt)).all()
+        return FileStats(
+            file_count=sum(count for _, count, _ in rows),
+            total_bytes=sum(size for _, _, size in rows),
+            mimetypes={mimetype: count for mimetype, count, _ in rows},
+        )
+
+    @observed("db", "file.get_without_stats")
+    async def get_without_stats(
+        self, after: Optional[UUID] = None, limit: int = 1000
+    ) -> list[File]:
+        """
+        Записи без размера или ETag объекта, по возрастанию uuid
+        """
+        stmt = select(self.model).where(
+            (self.model.size.is_(None)) | (self.model.etag.is_(None))
+        )
+        if after is not None:
+            stmt = stmt.where(self.model.uuid > after)
+        async with self._reader().async_session_factory() as session:
+            result = await session.execute(stmt.order_by(self.model.uuid).limit(limit))
+            return list(result.scalars())
+
+    def _after_cursor(self, cmd: ListFiles):
+        column = getattr(self.model, cmd.sort)
+        try:
+            sort, direction, value, last_uuid = decode_cursor(cmd.cursor)
+            if (sort, direction) != (cmd.sort, cmd.direction):
+                raise ValueError
+            if column.type.python_type is datetime:
+                value = datetime.fromisoformat(value)
+            last_uuid = UUID(last_uuid)
+        except (TypeError, ValueError):
+            raise InvalidCursor
+        key = tuple_(column, self.model.uuid)
+        return (
+            key > (value, last_uuid)
+            if cmd.direction == "asc"
+            else key < (value, last_uuid)
+        )
+
+    @observed("db", "file.get_list")
+    async def get_list(self, cmd: ListFiles) -> dict:
+        """
+        Страница в виде словаря {items, next_cursor}, элементы - словари
+        колонок строк (без ORM-объектов и моделей ответа)
+        """
+        column = getattr(self.model, cmd.sort)
+        stmt = self._filter(select(self.model.__table__), cmd)
+        if cmd.cursor:
+            stmt = stmt.where(self._after_cursor(cmd))
+        if cmd.direction == "asc":
+            stmt = stmt.order_by(column.asc(), self.model.uuid.asc())
+        else:
+            stmt = stmt.order_by(column.desc(), self.model.uuid.desc())
+        async with self._reader().engine.connect() as connection:
+            result = await connection.execute(stmt.limit(cmd.limit + 1))
+            rows = result.mappings().all()
+        next_cursor = None
+        if len(rows) > cmd.limit:
+            rows = rows[: cmd.limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(
+                [cmd.sort, cmd.direction, last[cmd.sort], last["uuid"]]
+            )
+        return {"items": [dict(row) for row in rows], "next_cursor": next_cursor}
+
+    async def export(self, cmd: ExportFiles) -> AsyncGenerator[list[dict], None]:
+        """
+        Выгрузка строк пачками по batch_size через серверный курсор,
+        без материализации всей таблицы
+        """
+        stmt = self._filter(select(self.model.__table__), cmd).execution_options(
+            yield_per=cmd.batch_size
+        )
+        async with self._reader().engine.connect() as connection:
+            result = await connection.stream(stmt)
+            async for partition in result.mappings().partitions():
+                yield partition
 
 
 class FileWriteRegistry(AbstractWriteRepository):
-    def __init__(self, session_manager: SessionManager):
+    def __init__(
+        self,
+        session_manager: SessionManager,
+        cache: Optional[TwoTierCache] = None,
+        replicas: Optional[ReplicaRouter] = None,
+        events_topic: Optional[str] = None,
+    ):
         super().__init__()
         self.model = File
+        self.cache = cache
+        self.replicas = replicas
+        self.events_topic = events_topic
         self.transactional_session: async_sessionmaker = (
             session_manager.transactional_session
         )
@@ -58,36 +245,129 @@ class FileWriteRegistry(AbstractWriteRepository):
             session_manager.async_session_factory
         )
 
-    async def create(self, cmd: CreateFile) -> Optional[File]:
+    def _written(self, *keys) -> None:
+        """
+        Чтение записанных ключей ненадолго направляется в primary
+        """
+        if self.replicas:
+            self.replicas.stick(*keys)
+
+    async def _publish(self, session, event: str, rows: list[Optional[File]]) -> None:
+        """
+        Запись событий в outbox в транзакции изменения:
+        публикацию выполняет OutboxRelay вне обработки запроса
+        """
+        rows = [row for row in rows if row is not None]
+        if not self.events_topic or not rows:
+            return
+        await session.execute(
+            insert(OutboxEvent),
+            [
+                {
+                    "topic": self.events_topic,
+                    "key": str(row.uuid),
+                    "event": event,
+                    "payload": BaseMQ.serialize_message(
+                        {
+                            "event": event,
+                            "file": FileReturnData.model_validate(
+                                row.as_dict()
+                            ).model_dump(mode="json"),
+                        }
+                    ),
+                }
+                for row in rows
+            ],
+        )
+
+    def _is_duplicate(self, error: IntegrityError) -> bool:
+        """
+        Нарушение первичного ключа files - запись с таким uuid уже есть.
+        Прочие нарушения целостности (NOT NULL, outbox и т.п.) не подменяются
+        """
+        cause = error.orig.__cause__
+        return (
+            isinstance(cause, UniqueViolationError)
+            and cause.constraint_name == f"{self.model.__tablename__}_pkey"
+        )
+
+    @observed("db", "file.create")
+    async def create(
+        self,
+        cmd: CreateFile,
+        file_uuid: Optional[UUID] = None,
+    ) -> Optional[File]:
+        values = cmd.model_dump()
+        if file_uuid:
+            values["uuid"] = file_uuid
         try:
             async with self.transactional_session() as session:
-                stmt = (
-                    insert(self.model).values(**cmd.model_dump()).returning(self.model)
-                )
+                stmt = insert(self.model).values(**values).returning(self.model)
                 result = await session.execute(stmt)
-                await session.commit()
                 answer = result.scalar_one_or_none()
-            return answer
-        except (UniqueViolationError, IntegrityError):
-            raise FileAlreadyExist
+                await self._publish(session, "file.created", [answer])
+                await session.commit()
+        except IntegrityError as error:
+            if self._is_duplicate(error):
+                raise FileAlreadyExist
+            raise
+        if answer:
+            self._written(answer.uuid, answer.reference_uuid)
+        return answer
+
+    @observed("db", "file.create_many")
+    async def create_many(self, cmds: list[CreateFile]) -> list[File]:
+        """
+        Вставка пачки записей одним INSERT ... VALUES (...), (...) RETURNING.
+        uuid генерируются заранее, результат возвращается в порядке cmds
+        """
+        if not cmds:
+            return []
+        values = [{"uuid": uuid.uuid4(), **cmd.model_dump()} for cmd in cmds]
+        try:
+            async with self.transactional_session() as session:
+                stmt = insert(self.model).values(values).returning(self.model)
+                result = await session.execute(stmt)
+                rows = {row.uuid: row for row in result.scalars()}
+                await self._publish(session, "file.created", list(rows.values()))
+                await session.commit()
+        except IntegrityError as error:
+            if self._is_duplicate(error):
+                raise FileAlreadyExist
+            raise
+        self._written(
+            *(key for row in rows.values() for key in (row.uuid, row.reference_uuid))
+        )
+        return [rows[value["uuid"]] for value in values]
 
+    @observed("db", "file.update")
     async def update(
         self,
         cmd: CreateFile,
         file_uuid: UUID,
     ) -> Optional[File]:
+        """
+        Обновление метаданных. path и bucket - адрес объекта с учетом
+        в blobs, они меняются только сервисом вместе со ссылками на объекты
+        """
         async with self.transactional_session() as session:
             stmt = (
                 update(self.model)
-                .values(**cmd.model_dump())
+                .values(**cmd.model_dump(exclude={"path", "bucket"}))
                 .where(self.model.uuid == file_uuid)
                 .returning(self.model)
             )
             result = await session.execute(stmt)
-            await session.commit()
             answer = result.scalar_one_or_none()
+            await self._publish(session, "file.updated", [answer])
+            await session.commit()
+        if answer:
+            self._written(answer.uuid, answer.reference_uuid)
+        if self.cache:
+            await self.cache.invalidate(str(file_uuid))
         return answer
 
+    @observed("db", "file.delete")
     async def delete(self, file_uuid: UUID) -> Optional[File]:
         async with self.transactional_session() as session:
             stmt = (
@@ -96,6 +376,218 @@ class FileWriteRegistry(AbstractWriteRepository):
                 .returning(self.model)
             )
             result = await session.execute(stmt)
+            answer = result.scalar_one_or_none()
+            await self._publish(session, "file.deleted", [answer])
             await session.commit()
+        if answer:
+            self._written(answer.uuid, answer.reference_uuid)
+        if self.cache:
+            await self.cache.invalidate(str(file_uuid))
+        return answer
+
+    @observed("db", "file.update_stats")
+    async def update_stats(self, stats: list[tuple[UUID, int, Optional[str]]]) -> int:
+        """
+        Заполнение size/etag пачки записей одним UPDATE ... FROM unnest(...)
+        """
+        if not stats:
+            return 0
+        uuids, sizes, etags = map(list, zip(*stats))
+        values = select(
+            func.unnest(
+                bindparam("uuids", value=uuids, type_=ARRAY(PG_UUID(as_uuid=True)))
+            ).label("uuid"),
+            func.unnest(bindparam("sizes", value=sizes, type_=ARRAY(BigInteger))).label(
+                "size"
+            ),
+            func.unnest(bindparam("etags", value=etags, type_=ARRAY(Text))).label(
+                "etag"
+            ),
+        ).subquery("stats")
+        async with self.transactional_session() as session:
+            result = await session.execute(
+                update(self.model)
+                .where(self.model.uuid == values.c.uuid)
+                .values(size=values.c.size, etag=values.c.etag)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+        self._written(*uuids)
+        if self.cache:
+            await self.cache.invalidate(*(str(file_uuid) for file_uuid in uuids))
+        return result.rowcount
+
+    @observed("db", "file.replace_content")
+    async def replace_content(
+        self,
+        file_uuid: UUID,
+        expected_path: str,
+        path: str,
+        size: int,
+        etag: Optional[str],
+    ) -> Optional[File]:
+        """
+        Перевод записи на загруженный в обход сервиса объект.
+        Запись меняется, только если ее path все еще expected_path,
+        иначе None
+        """
+        async with self.transactional_session() as session:
+            result = await session.execute(
+                update(self.model)
+                .where(self.model.uuid == file_uuid, self.model.path == expected_path)
+                .values(path=path, size=size, etag=etag, checksum=None)
+                .returning(self.model)
+            )
             answer = result.scalar_one_or_none()
+            await self._publish(session, "file.updated", [answer] if answer else [])
+            await session.commit()
+        if answer:
+            self._written(answer.uuid, answer.reference_uuid)
+        if self.cache:
+            await self.cache.invalidate(str(file_uuid))
         return answer
+
+    @observed("db", "file.delete_many")
+    async def delete_many(self, uuids: list[UUID]) -> list[File]:
+        async with self.transactional_session() as session:
+            stmt = (
+                delete(self.model)
+                .where(uuid_in(self.model.uuid, uuids))
+                .returning(self.model)
+            )
+            result = await session.execute(stmt)
+            answer = list(result.scalars())
+            await self._publish(session, "file.deleted", answer)
+            await session.commit()
+        self._written(
+            *(key for row in answer for key in (row.uuid, row.reference_uuid))
+        )
+        if self.cache:
+            await self.cache.invalidate(*(str(row.uuid) for row in answer))
+        return answer
+
+
+class BlobRegistry:
+    """
+    Учет содержимого по SHA-256: один объект в bucket на одинаковое содержимое,
+    refcount - количество записей File, ссылающихся на объект
+    """
+
+    def __init__(self, session_manager: SessionManager):
+        self.model = Blob
+        self.transactional_session: async_sessionmaker = (
+            session_manager.transactional_session
+        )
+
+    @observed("db", "blob.acquire")
+    async def acquire(self, bucket: str, sha256: str) -> Optional[Blob]:
+        """
+        Новая ссылка на существующий объект, None - если содержимого еще нет
+        """
+        async with self.transactional_session() as session:
+            stmt = (
+                update(self.model)
+                .where(self.model.bucket == bucket, self.model.sha256 == sha256)
+                .values(refcount=self.model.refcount + 1)
+                .returning(self.model)
+            )
+            result = await session.execute(stmt)
+            await session.commit()
+            return result.scalar_one_or_none()
+
+    @observed("db", "blob.register")
+    async def register(
+        self,
+        bucket: str,
+        sha256: str,
+        path: str,
+        size: int,
+        etag: Optional[str] = None,
+    ) -> Blob:
+        """
+        Регистрация загруженного объекта. Если то же содержимое успели
+        зарегистрировать раньше, возвращается уже существующий объект
+        """
+        async with self.transactional_session() as session:
+            stmt = pg_insert(self.model).values(
+                bucket=bucket, sha256=sha256, path=path, size=size, etag=etag
+            )
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_blobs_bucket_sha256",
+                set_={"refcount": self.model.refcount + 1},
+            ).returning(self.model)
+            result = await session.execute(stmt)
+            await session.commit()
+            return result.scalar_one()
+
+    @observed("db", "blob.fill_etags")
+    async def fill_etags(self) -> int:
+        """
+        ETag объектов, зарегистрированных до появления колонки, из files
+        """
+        async with self.transactional_session() as session:
+            result = await session.execute(
+                update(self.model)
+                .where(
+                    self.model.etag.is_(None),
+                    self.model.bucket == File.bucket,
+                    self.model.path == File.path,
+                    File.etag.is_not(None),
+                )
+                .values(etag=File.etag)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+        return result.rowcount
+
+    @observed("db", "blob.release")
+    async def release(
+        self,
+        bucket: str,
+        paths: list[str],
+        purge: Callable[[list[str]], Awaitable],
+    ) -> list[str]:
+        """
+        Снятие ссылок (по одной на каждый элемент paths). Объекты, которые
+        больше никем не используются или не учитываются в blobs (загружены
+        до дедупликации), удаляются purge до фиксации транзакции: пока
+        строки blobs заблокированы, acquire/register того же содержимого
+        ждут и не получают ссылку на удаляемый объект.
+        Возвращает пути удаленных объектов
+        """
+        counts = Counter(paths)
+        released = select(
+            func.unnest(
+                bindparam("paths", value=list(counts), type_=ARRAY(Text))
+            ).label("path"),
+            func.unnest(
+                bindparam("counts", value=list(counts.values()), type_=ARRAY(Integer))
+            ).label("count"),
+        ).subquery("released")
+        async with self.transactional_session() as session:
+            result = await session.execute(
+                update(self.model)
+                .where(
+                    self.model.bucket == bucket,
+                    self.model.path == released.c.path,
+                )
+                .values(refcount=self.model.refcount - released.c.count)
+                .returning(self.model.path, self.model.refcount)
+            )
+            rows = result.all()
+            unused = [path for path, refcount in rows if refcount <= 0]
+            if unused:
+                await session.execute(
+                    delete(self.model).where(
+                        self.model.bucket == bucket,
+                        self.model.path
+                        == any_(bindparam("unused", value=unused, type_=ARRAY(Text))),
+                        self.model.refcount <= 0,
+                    )
+                )
+            tracked = {path for path, _ in rows}
+            unused += [path for path in counts if path not in tracked]
+            if unused:
+                await purge(unused)
+            await session.commit()
+        return unused
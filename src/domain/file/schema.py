@@ -1,9 +1,15 @@
 import json
+from collections.abc import AsyncIterator
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Literal, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, model_validator
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+MAX_PAGE_SIZE = 1000
+MAX_BULK_SIZE = 10000
+MAX_PRESIGN_SIZE = 1000
+MAX_PRESIGN_EXPIRES = 7 * 24 * 3600
 
 
 class GetFileByUUID(BaseModel):
@@ -28,6 +34,114 @@ class CreateFile(BaseModel):
         return value
 
 
-class FileReturnData(GetFileByUUID, CreateFile):
+class StoredFile(CreateFile):
+    size: Optional[int] = None
+    etag: Optional[str] = None
+    checksum: Optional[str] = None
+
+
+class FileReturnData(GetFileByUUID, StoredFile):
     created_at: datetime
     updated_at: datetime
+
+
+class GetFilesByReference(BaseModel):
+    reference_uuid: UUID
+    references: Optional[str] = None
+
+
+class GetFilesByUUID(BaseModel):
+    uuids: List[UUID] = Field(..., min_length=1, max_length=MAX_BULK_SIZE)
+
+
+class BatchFileResult(BaseModel):
+    index: int
+    status: Literal["created", "failed"]
+    file: Optional[FileReturnData] = None
+    error: Optional[str] = None
+
+
+class FileFilter(BaseModel):
+    bucket: Optional[str] = None
+    mimetype: Optional[str] = None
+    references: Optional[str] = None
+    reference_uuid: Optional[UUID] = None
+
+
+class ListFiles(FileFilter):
+    sort: Literal["created_at", "updated_at", "name"] = "created_at"
+    direction: Literal["asc", "desc"] = "asc"
+    limit: int = Field(100, ge=1, le=MAX_PAGE_SIZE)
+    cursor: Optional[str] = None
+
+
+class ExportFiles(FileFilter):
+    batch_size: int = Field(1000, ge=1, le=10000)
+
+
+class PresignFile(GetFileByUUID):
+    method: Literal["GET", "PUT"] = "GET"
+    expires: Optional[int] = Field(None, ge=1, le=MAX_PRESIGN_EXPIRES)
+
+
+class PresignFiles(BaseModel):
+    uuids: List[UUID] = Field(..., min_length=1, max_length=MAX_PRESIGN_SIZE)
+    expires: Optional[int] = Field(None, ge=1, le=MAX_PRESIGN_EXPIRES)
+
+
+class PresignedUrl(GetFileByUUID):
+    method: str
+    url: str
+    expires_at: datetime
+    path: Optional[str] = None
+
+
+class CompleteUpload(GetFileByUUID):
+    path: str
+
+
+class FileStats(BaseModel):
+    file_count: int = 0
+    total_bytes: int = 0
+    mimetypes: Dict[str, int] = {}
+
+
+class InternalStats(BaseModel):
+    cache: Dict[str, int]
+    reference_loader: Dict[str, int]
+    singleflight: Dict[str, int]
+    presigned_cache: Dict[str, int]
+    transfers: Dict[str, int]
+    replicas: Optional[Dict[str, int]] = None
+
+
+class FilePage(BaseModel):
+    items: List[FileReturnData]
+    next_cursor: Optional[str] = None
+
+
+class UploadFileContent(GetFileByUUID):
+    file: CreateFile
+
+
+class DownloadFile(GetFileByUUID):
+    range: Optional[str] = None
+    if_range: Optional[str] = None
+
+
+class FileContent(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    name: str
+    mimetype: str
+    size: int
+    start: int
+    end: int
+    partial: bool
+    etag: Optional[str] = None
+    last_modified: Optional[datetime] = None
+    stream: AsyncIterator
+
+    @property
+    def content_length(self) -> int:
+        return self.end - self.start + 1
@@ -0,0 +1,219 @@
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncGenerator, AsyncIterator, Iterable, Optional, Protocol
+from urllib.parse import urlencode
+
+from infrastructure.file_manager.bucket_registry import BucketRegistry
+from infrastructure.file_manager.schema import ObjectStat, UploadedObject
+
+DELETE_BATCH_SIZE = 1000
+
+
+class FileReaderProtocol(Protocol):
+    def read(self) -> bytes:
+        pass
+
+
+class BaseFileManager(ABC):
+    """
+    Общий интерфейс клиентов объектного хранилища
+    """
+
+    buckets: BucketRegistry
+
+    async def warm_up(self, connections: int = 1) -> None:
+        """
+        Заполнение реестра bucket и открытие до connections соединений пула
+        конкурентными запросами list_buckets
+        """
+        await asyncio.gather(
+            self.buckets.warm_up(self),
+            *(self._touch() for _ in range(connections - 1)),
+        )
+
+    async def _touch(self) -> None:
+        try:
+            await self.list_buckets()
+        except Exception:
+            pass
+
+    async def ensure_bucket(self, bucket_name: str) -> None:
+        await self.buckets.ensure(self, bucket_name)
+
+    @abstractmethod
+    async def list_buckets(self) -> list[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def bucket_exists(self, bucket_name: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def make_bucket(self, bucket_name: str) -> None:
+        """
+        Создание bucket; уже существующий bucket владельца не считается ошибкой
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def upload_file(
+        self,
+        bucket_name: str,
+        object_name: str,
+        mimetype: str,
+        data: FileReaderProtocol,
+        **kwargs,
+    ) -> UploadedObject:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def upload_stream(
+        self,
+        bucket_name: str,
+        object_name: str,
+        mimetype: str,
+        stream: AsyncIterator[bytes],
+        **kwargs,
+    ) -> UploadedObject:
+        """
+        Загрузка из асинхронного потока без промежуточной записи на диск.
+        object_name используется как есть, без format_masks
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def download_file(
+        self, bucket_name: str, object_name: str, **kwargs
+    ) -> bytes:
+        raise NotImplementedError
+
+    @abstractmethod
+    def download_file_chunk(
+        self,
+        bucket_name: str,
+        object_name: str,
+        offset: int = 0,
+        length: Optional[int] = None,
+        **kwargs,
+    ) -> AsyncGenerator:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_object(self, bucket_name: str, object_name: str, **kwargs) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_objects(
+        self, bucket_name: str, object_names: list[str]
+    ) -> list[str]:
+        """
+        Пакетное удаление объектов (не более DELETE_BATCH_SIZE ключей за запрос).
+        Возвращает имена объектов, которые удалить не удалось
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_list_objects(self, bucket_name: str, **kwargs) -> Iterable:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def check_file_exist(
+        self, bucket_name: str, object_name: str, **kwargs
+    ) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def stat_file(
+        self, bucket_name: str, object_name: str, **kwargs
+    ) -> Optional[ObjectStat]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def presigned_url(
+        self, method: str, bucket_name: str, object_name: str, expires: int
+    ) -> str:
+        """
+        Подписанная ссылка на объект, действительна expires секунд
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def create_multipart_upload(
+        self, bucket_name: str, object_name: str, headers: dict
+    ) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def upload_part(
+        self,
+        bucket_name: str,
+        object_name: str,
+        upload_id: str,
+        part_number: int,
+        data: bytes,
+    ) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def complete_multipart_upload(
+        self,
+        bucket_name: str,
+        object_name: str,
+        upload_id: str,
+        parts: list[tuple[int, str]],
+    ) -> Optional[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def abort_multipart_upload(
+        self, bucket_name: str, object_name: str, upload_id: str
+    ) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+    @staticmethod
+    def content_length(data: FileReaderProtocol) -> Optional[int]:
+        try:
+            position = data.tell()
+            end = data.seek(0, os.SEEK_END)
+            data.seek(position)
+        except (AttributeError, OSError, ValueError):
+            return None
+        return end - position
+
+    @staticmethod
+    def object_headers(
+        content_type: str,
+        tags: Optional[dict] = None,
+        metadata: Optional[dict] = None,
+    ) -> dict:
+        headers = {"Content-Type": content_type}
+        if tags:
+            headers["x-amz-tagging"] = urlencode(tags)
+        for key, value in (metadata or {}).items():
+            headers[f"x-amz-meta-{key}"] = value
+        return headers
+
+    @staticmethod
+    def batches(items: list, size: int = DELETE_BATCH_SIZE) -> Iterable[list]:
+        for start in range(0, len(items), size):
+            yield items[start : start + size]
+
+    @classmethod
+    def format_masks(
+        cls, text: str, extension: str, date: Optional[datetime] = None
+    ) -> str:
+        type_ext = "." + extension.split("/")[-1]
+        date = date or datetime.now()
+        dates = {
+            "DD": date.strftime("%d").zfill(2),
+            "MM": date.strftime("%m").zfill(2),
+            "YY": date.strftime("%y").zfill(2),
+            "YYYY": date.strftime("%Y"),
+            "MONTH": date.strftime("%B"),
+        }
+        return text.format(**dates) + type_ext
@@ -1,4 +1,4 @@
-from typing import Any, Union
+from typing import Any, Optional, Union
 
 from orjson import dumps, loads
 
@@ -7,6 +7,9 @@ from infrastructure.exceptions.mq_exceptions import (
     SerializationError,
 )
 
+# (топик, ключ, тело) сообщения для пакетной отправки
+Message = tuple[str, Optional[bytes], bytes]
+
 
 class BaseMQ:
 
@@ -11,11 +11,30 @@ class Singleton:
 
 
 class OnlyContainer(BaseEntity):
+    """
+    Ленивый singleton-провайдер: объект создается при первом вызове,
+    аргументы-провайдеры разрешаются в этот же момент
+    """
+
     def __init__(self, class_type, *args, **kwargs):
         self.class_object = None
         super().__init__(class_type, *args, **kwargs)
 
+    @staticmethod
+    def _resolve(value):
+        return value() if isinstance(value, BaseEntity) else value
+
     def _call(self):
         if not self.class_object:
-            self.class_object = self.class_type(*self.args, **self.kwargs)
+            self.class_object = self.class_type(
+                *(self._resolve(arg) for arg in self.args),
+                **{key: self._resolve(value) for key, value in self.kwargs.items()},
+            )
         return self.class_object
+
+    @property
+    def initialized(self) -> bool:
+        return self.class_object is not None
+
+    def reset(self) -> None:
+        self.class_object = None
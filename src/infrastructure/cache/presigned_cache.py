@@ -0,0 +1,58 @@
+import logging
+from typing import Optional
+
+from orjson import dumps, loads
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+
+class PresignedUrlCache:
+    """
+    Кэш подписанных ссылок в Redis: ссылка хранится до expires - margin секунд,
+    чтобы клиент не получил ссылку, которая вот-вот истечет
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        prefix: str,
+        margin: int = 60,
+        logger: logging.Logger = logging,
+    ):
+        self.redis = redis
+        self.prefix = prefix
+        self.margin = margin
+        self.logger = logger
+        self.counters = {"hits": 0, "misses": 0, "errors": 0}
+
+    def key(self, method: str, bucket: str, path: str, expires: int) -> str:
+        return f"{self.prefix}:{method}:{expires}:{bucket}:{path}"
+
+    async def get_many(self, keys: list[str]) -> list[Optional[dict]]:
+        try:
+            raw = await self.redis.mget(keys)
+        except RedisError as error:
+            self.counters["errors"] += 1
+            self.logger.warning("Ошибка чтения кэша ссылок: %s", error)
+            raw = [None] * len(keys)
+        values = [loads(value) if value is not None else None for value in raw]
+        hits = sum(value is not None for value in values)
+        self.counters["hits"] += hits
+        self.counters["misses"] += len(values) - hits
+        return values
+
+    async def set_many(self, values: dict[str, dict], expires: int) -> None:
+        ttl = expires - self.margin
+        if ttl <= 0 or not values:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, value in values.items():
+                    pipe.set(key, dumps(value, default=str), ex=ttl)
+                await pipe.execute()
+        except RedisError as error:
+            self.counters["errors"] += 1
+            self.logger.warning("Ошибка записи кэша ссылок: %s", error)
+
+    def stats(self) -> dict:
+        return dict(self.counters)
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+from typing import Any, Optional
+
+from orjson import dumps, loads
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from infrastructure.cache.lru_cache import TTLCache
+
+# метка удаленного ключа (не JSON, с сериализованным значением не совпадает)
+TOMBSTONE = "tombstone"
+
+
+class TwoTierCache:
+    """
+    Read-through кэш: локальный TTL/LRU уровень процесса перед общим уровнем в Redis.
+    Инвалидация заменяет ключ в Redis меткой на tombstone_ttl секунд и
+    рассылает его через pub/sub, чтобы все воркеры сбросили локальную копию.
+    set записывает значение только при отсутствии ключа (SET NX): значение,
+    прочитанное из БД до инвалидации, не вернется в кэш поверх метки
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        prefix: str,
+        channel: str,
+        local_maxsize: int = 10000,
+        local_ttl: float = 30,
+        redis_ttl: int = 300,
+        tombstone_ttl: int = 5,
+        logger: logging.Logger = logging,
+    ):
+        self.redis = redis
+        self.prefix = prefix
+        self.channel = channel
+        self.redis_ttl = redis_ttl
+        self.tombstone_ttl = tombstone_ttl
+        self.logger = logger
+        self.local = TTLCache(maxsize=local_maxsize, ttl=local_ttl)
+        self.counters = {"local_hits": 0, "redis_hits": 0, "misses": 0, "errors": 0}
+        self._listener: Optional[asyncio.Task] = None
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        if (value := self.local.get(key)) is not None:
+            self.counters["local_hits"] += 1
+            return value
+        try:
+            raw = await self.redis.get(self._key(key))
+        except RedisError as error:
+            self.counters["errors"] += 1
+            self.logger.warning("Ошибка чтения кэша %s: %s", key, error)
+            raw = None
+        if raw is None or raw == TOMBSTONE:
+            self.counters["misses"] += 1
+            return None
+        self.counters["redis_hits"] += 1
+        value = loads(raw)
+        self.local.set(key, value)
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        try:
+            stored = await self.redis.set(
+                self._key(key), dumps(value, default=str), ex=self.redis_ttl, nx=True
+            )
+        except RedisError as error:
+            self.counters["errors"] += 1
+            self.logger.warning("Ошибка записи кэша %s: %s", key, error)
+            stored = True
+        if stored:
+            self.local.set(key, value)
+
+    async def invalidate(self, *keys: str) -> None:
+        if not keys:
+            return
+        for key in keys:
+            self.local.pop(key)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.set(self._key(key), TOMBSTONE, ex=self.tombstone_ttl)
+                    pipe.publish(self.channel, key)
+                await pipe.execute()
+        except RedisError as error:
+            self.counters["errors"] += 1
+            self.logger.warning("Ошибка инвалидации кэша %s: %s", keys, error)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.local.pop(message["data"])
+            except RedisError as error:
+                self.logger.warning("Потеряна подписка на %s: %s", self.channel, error)
+                self.local.clear()
+                await asyncio.sleep(1)
+
+    async def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+
+    def stats(self) -> dict:
+        return {**self.counters, "local_size": len(self.local)}
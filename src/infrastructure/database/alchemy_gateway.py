@@ -1,10 +1,41 @@
-from sqlalchemy import AsyncAdaptedQueuePool, Pool
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+import asyncio
+import time
+import uuid
+from contextlib import AsyncExitStack
 
-from infrastructure.base_entities.singleton import Singleton
+from sqlalchemy import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool, text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    async_sessionmaker,
+    create_async_engine,
+)
 
+from infrastructure.handlers.metrics import DB_POOL_WAIT_SECONDS, pools
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул с замером ожидания соединения: время выдачи из очереди пула,
+    включая открытие нового соединения, метка - pool_logging_name
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT_SECONDS.labels(self.logging_name or "default").observe(
+                time.perf_counter() - started
+            )
+
+
+class SessionManager:
+    """
+    Engine и фабрики сессий одной базы. В режиме pgbouncer пул ведет
+    PgBouncer: своего пула нет (NullPool), кэш подготовленных выражений
+    asyncpg отключен, имена выражений уникальны (transaction pooling)
+    """
 
-class SessionManager(Singleton):
     def __init__(
         self,
         host: str,
@@ -14,7 +45,11 @@ class SessionManager(Singleton):
         password: str,
         database: str,
         echo: bool,
-        poolclass: Pool = AsyncAdaptedQueuePool,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_timeout: float = 30,
+        pgbouncer: bool = False,
+        poolclass: Pool = InstrumentedQueuePool,
     ):
         self.dialect = dialect
         self.login = login
@@ -23,12 +58,17 @@ class SessionManager(Singleton):
         self.port = port
         self.echo = echo
         self.database = database
+        self.pgbouncer = pgbouncer
 
         self._engine = create_async_engine(
             url=self._db_url,
             echo=self.echo,
-            poolclass=poolclass,
+            **self._pool_options(poolclass, pool_size, max_overflow, pool_timeout),
         )
+        if isinstance(self._engine.pool, QueuePool):
+            pools.track_db_pool(
+                self._pool_name, self._engine.sync_engine, pool_size + max_overflow
+            )
         self._autocommit_session = self._engine.execution_options(
             isolation_level="AUTOCOMMIT",
         )
@@ -38,10 +78,38 @@ class SessionManager(Singleton):
         )
         self._async_session_factory = async_sessionmaker(bind=self._engine)
 
+    def _pool_options(
+        self, poolclass: Pool, pool_size: int, max_overflow: int, pool_timeout: float
+    ) -> dict:
+        if not self.pgbouncer:
+            return {
+                "poolclass": poolclass,
+                "pool_size": pool_size,
+                "max_overflow": max_overflow,
+                "pool_timeout": pool_timeout,
+                "pool_logging_name": self._pool_name,
+            }
+        options = {"poolclass": NullPool}
+        if self.dialect == "asyncpg":
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+            }
+        return options
+
+    @property
+    def _pool_name(self) -> str:
+        return f"{self.host}:{self.port}/{self.database}"
+
     @property
     def _db_url(self) -> str:
         return f"postgresql+{self.dialect}://{self.login}:{self.password}@{self.host}:{self.port}/{self.database}"
 
+    @property
+    def engine(self) -> AsyncEngine:
+        return self._engine
+
     @property
     def transactional_session(self):
         return self._transactional_session
@@ -49,3 +117,26 @@ class SessionManager(Singleton):
     @property
     def async_session_factory(self):
         return self._async_session_factory
+
+    async def warm_up(self, connections: int) -> None:
+        """
+        Открытие connections соединений пула до первых запросов:
+        соединения удерживаются одновременно, поэтому открываются разные.
+        Соединения сверх размера пула после возврата закрываются, их не открываем;
+        в режиме pgbouncer прогревать нечего
+        """
+        if self.pgbouncer:
+            return
+        connections = min(connections, self._engine.pool.size())
+        async with AsyncExitStack() as stack:
+            opened = await asyncio.gather(
+                *(
+                    stack.enter_async_context(self._engine.connect())
+                    for _ in range(connections)
+                )
+            )
+            for connection in opened:
+                await connection.execute(text("SELECT 1"))
+
+    async def close(self) -> None:
+        await self._engine.dispose()
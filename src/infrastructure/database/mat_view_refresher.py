@@ -0,0 +1,64 @@
+import asyncio
+import logging
+import zlib
+from typing import Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from infrastructure.database.alchemy_gateway import SessionManager
+
+
+class MatViewRefresher:
+    """
+    Периодическое обновление материализованных представлений
+    (REFRESH MATERIALIZED VIEW CONCURRENTLY, чтение не блокируется).
+    Обновление каждого представления выполняет один воркер:
+    остальные пропускают цикл, если advisory lock уже занят
+    """
+
+    def __init__(
+        self,
+        session_manager: SessionManager,
+        views: list[str],
+        interval: float = 15 * 60,
+        logger: logging.Logger = logging,
+    ):
+        self.transactional_session = session_manager.transactional_session
+        self.views = views
+        self.interval = interval
+        self.logger = logger
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh(self, view: str) -> bool:
+        async with self.transactional_session() as session:
+            locked = await session.scalar(
+                select(func.pg_try_advisory_xact_lock(zlib.crc32(view.encode())))
+            )
+            if not locked:
+                return False
+            await session.execute(
+                text(f'REFRESH MATERIALIZED VIEW CONCURRENTLY "{view}"')
+            )
+            await session.commit()
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            for view in self.views:
+                try:
+                    if await self.refresh(view):
+                        self.logger.info("Представление %s обновлено", view)
+                except SQLAlchemyError as error:
+                    self.logger.error("Ошибка обновления %s: %s", view, error)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
@@ -0,0 +1,83 @@
+"""file keyset indexes
+
+Revision ID: 3e3e21ae5a91
+Revises: ca3454216f5e
+Create Date: 2026-10-17 09:12:04.318270
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3e3e21ae5a91"
+down_revision: Union[str, None] = "ca3454216f5e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    "ix_files_created_at_uuid": ["created_at", "uuid"],
+    "ix_files_updated_at_uuid": ["updated_at", "uuid"],
+    "ix_files_name_uuid": ["name", "uuid"],
+    "ix_files_bucket_created_at_uuid": ["bucket", "created_at", "uuid"],
+    "ix_files_mimetype_created_at_uuid": ["mimetype", "created_at", "uuid"],
+    "ix_files_references_created_at_uuid": ["references", "created_at", "uuid"],
+    "ix_files_reference_uuid_created_at_uuid": [
+        "reference_uuid",
+        "created_at",
+        "uuid",
+    ],
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            op.create_index(
+                name,
+                "files",
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        op.drop_index(
+            "ix_files_reference_uuid",
+            table_name="files",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_files_references",
+            table_name="files",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_files_references",
+            "files",
+            ["references"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_files_reference_uuid",
+            "files",
+            ["reference_uuid"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        for name in INDEXES:
+            op.drop_index(
+                name,
+                table_name="files",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,45 @@
+"""file stats view
+
+Revision ID: 9c58b2f8bf28
+Revises: a5034173d104
+Create Date: 2026-10-17 06:46:23.076265
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9c58b2f8bf28"
+down_revision: Union[str, None] = "a5034173d104"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE MATERIALIZED VIEW file_stats AS
+        SELECT
+            bucket,
+            "references",
+            reference_uuid,
+            mimetype,
+            count(*) AS file_count,
+            coalesce(sum(size), 0)::bigint AS total_bytes
+        FROM files
+        GROUP BY bucket, "references", reference_uuid, mimetype
+        """)
+    # уникальный индекс обязателен для REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute("""
+        CREATE UNIQUE INDEX ux_file_stats
+        ON file_stats (bucket, "references", reference_uuid, mimetype)
+        """)
+    op.execute('CREATE INDEX ix_file_stats_references ON file_stats ("references")')
+    op.execute(
+        "CREATE INDEX ix_file_stats_reference_uuid ON file_stats (reference_uuid)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS file_stats")
@@ -0,0 +1,59 @@
+"""outbox_events_seq_pk
+
+Revision ID: f8f640bbbd62
+Revises: 02c2c2d80f58
+Create Date: 2026-10-17 07:36:47.632905
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f8f640bbbd62"
+down_revision: Union[str, None] = "02c2c2d80f58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_constraint("outbox_events_pkey", "outbox_events", type_="primary")
+    op.drop_column("outbox_events", "uuid")
+    op.drop_column("outbox_events", "created_at")
+    op.drop_column("outbox_events", "updated_at")
+    op.create_primary_key("outbox_events_pkey", "outbox_events", ["seq"])
+
+
+def downgrade() -> None:
+    op.drop_constraint("outbox_events_pkey", "outbox_events", type_="primary")
+    op.add_column(
+        "outbox_events",
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "outbox_events",
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "outbox_events",
+        sa.Column(
+            "uuid",
+            sa.UUID(),
+            server_default=sa.text("gen_random_uuid()"),
+            nullable=False,
+        ),
+    )
+    op.alter_column("outbox_events", "uuid", server_default=None)
+    op.create_primary_key("outbox_events_pkey", "outbox_events", ["uuid"])
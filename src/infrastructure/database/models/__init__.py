@@ -1,4 +1,7 @@
 from .base import Base
+from .blob import Blob
 from .file import File
+from .file_stats import file_stats
+from .outbox import OutboxEvent
 
-__all__: tuple[str] = ("Base", "File")
+__all__: tuple[str] = ("Base", "Blob", "File", "OutboxEvent", "file_stats")
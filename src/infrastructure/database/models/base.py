@@ -21,13 +21,13 @@ class Base(DeclarativeBase):
 
     created_at: Mapped[datetime] = mapped_column(
         server_default=func.now(),
-        default=datetime.now(),
+        default=datetime.now,
     )
 
     updated_at: Mapped[datetime] = mapped_column(
         server_default=func.now(),
-        default=datetime.now(),
-        onupdate=datetime.now(),
+        default=datetime.now,
+        onupdate=datetime.now,
     )
 
     def as_dict(self):
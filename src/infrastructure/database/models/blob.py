@@ -0,0 +1,28 @@
+from sqlalchemy import BigInteger, Integer, Text, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from infrastructure.database.models.base import Base
+
+
+class Blob(Base):
+    __table_args__ = (
+        UniqueConstraint("bucket", "sha256", name="uq_blobs_bucket_sha256"),
+        UniqueConstraint("bucket", "path", name="uq_blobs_bucket_path"),
+    )
+
+    bucket: Mapped[str] = mapped_column(
+        Text, nullable=False, comment="Bucket хранилища"
+    )
+    sha256: Mapped[str] = mapped_column(
+        Text, nullable=False, comment="SHA-256 содержимого"
+    )
+    path: Mapped[str] = mapped_column(
+        Text, nullable=False, comment="Путь к объекту в bucket"
+    )
+    size: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, comment="Размер объекта в байтах"
+    )
+    etag: Mapped[str] = mapped_column(Text, nullable=True, comment="ETag объекта")
+    refcount: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="1", comment="Количество ссылок"
+    )
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import UUID, Text
+from sqlalchemy import UUID, BigInteger, Index, Text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -8,12 +8,29 @@ from infrastructure.database.models.base import Base
 
 
 class File(Base):
+    __table_args__ = (
+        Index("ix_files_created_at_uuid", "created_at", "uuid"),
+        Index("ix_files_updated_at_uuid", "updated_at", "uuid"),
+        Index("ix_files_name_uuid", "name", "uuid"),
+        Index("ix_files_bucket_created_at_uuid", "bucket", "created_at", "uuid"),
+        Index("ix_files_mimetype_created_at_uuid", "mimetype", "created_at", "uuid"),
+        Index(
+            "ix_files_references_created_at_uuid", "references", "created_at", "uuid"
+        ),
+        Index(
+            "ix_files_reference_uuid_created_at_uuid",
+            "reference_uuid",
+            "created_at",
+            "uuid",
+        ),
+    )
+
     name: Mapped[str] = mapped_column(Text, nullable=False, comment="Название")
     references: Mapped[str] = mapped_column(
-        Text, index=True, nullable=True, comment="Связанный объект"
+        Text, nullable=True, comment="Связанный объект"
     )
     reference_uuid: Mapped[uuid.UUID] = mapped_column(
-        UUID, index=True, nullable=True, comment="Идентификатор связанного объекта"
+        UUID, nullable=True, comment="Идентификатор связанного объекта"
     )
     bucket: Mapped[str] = mapped_column(
         Text, nullable=False, comment="Bucket хранилища"
@@ -24,6 +41,13 @@ class File(Base):
     mimetype: Mapped[str] = mapped_column(
         Text, nullable=False, comment="Тип файла по спецификации MIME"
     )
+    size: Mapped[int] = mapped_column(
+        BigInteger, nullable=True, comment="Размер объекта в байтах"
+    )
+    etag: Mapped[str] = mapped_column(Text, nullable=True, comment="ETag объекта")
+    checksum: Mapped[str] = mapped_column(
+        Text, nullable=True, comment="SHA-256 содержимого"
+    )
     jdata: Mapped[dict] = mapped_column(
         JSONB, nullable=True, server_default="{}", comment="Доп данные"
     )  # noqa: P103
@@ -0,0 +1,16 @@
+from sqlalchemy import UUID, BigInteger, Column, MetaData, Table, Text
+
+# Материализованное представление создается миграцией, поэтому описано
+# в отдельной MetaData и не участвует в autogenerate
+view_metadata = MetaData()
+
+file_stats = Table(
+    "file_stats",
+    view_metadata,
+    Column("bucket", Text),
+    Column("references", Text),
+    Column("reference_uuid", UUID(as_uuid=True)),
+    Column("mimetype", Text),
+    Column("file_count", BigInteger),
+    Column("total_bytes", BigInteger),
+)
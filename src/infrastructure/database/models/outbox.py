@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Identity, Index, LargeBinary, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from infrastructure.database.models.base import Base
+
+
+class OutboxEvent(Base):
+    """
+    Событие для публикации. Первичный ключ - seq (порядок публикации),
+    uuid и временные метки Base не нужны
+    """
+
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        Index(
+            "ix_outbox_events_pending",
+            "seq",
+            postgresql_where="delivered_at IS NULL",
+        ),
+        Index("ix_outbox_events_delivered_at", "delivered_at"),
+    )
+
+    uuid = None
+    created_at = None
+    updated_at = None
+
+    seq: Mapped[int] = mapped_column(
+        BigInteger, Identity(), primary_key=True, comment="Порядок публикации"
+    )
+    topic: Mapped[str] = mapped_column(Text, nullable=False, comment="Топик")
+    key: Mapped[str] = mapped_column(Text, nullable=True, comment="Ключ сообщения")
+    event: Mapped[str] = mapped_column(Text, nullable=False, comment="Тип события")
+    payload: Mapped[bytes] = mapped_column(
+        LargeBinary, nullable=False, comment="Тело сообщения"
+    )
+    delivered_at: Mapped[datetime] = mapped_column(
+        nullable=True, comment="Время публикации"
+    )
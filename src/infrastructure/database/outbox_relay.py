@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import time
+import zlib
+from datetime import timedelta
+from typing import Optional, Union
+
+from sqlalchemy import BigInteger, any_, bindparam, delete, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from infrastructure.database.alchemy_gateway import SessionManager
+from infrastructure.database.models import OutboxEvent
+from infrastructure.mq.kafka_producer import KafkaProducer
+from infrastructure.mq.memory_producer import MemoryProducer
+
+RELAY_LOCK = zlib.crc32(b"outbox_relay")
+
+
+class OutboxRelay:
+    """
+    Публикация событий из outbox: строки читаются пачками в порядке seq,
+    отправляются одной пакетной отправкой и отмечаются доставленными
+    в той же транзакции. Пачку публикует один воркер: остальные пропускают
+    цикл, если advisory lock уже занят, поэтому события одного файла
+    попадают в брокер в порядке записи. Доставка at-least-once: при ошибке
+    пачка публикуется повторно. Блокировка и транзакция удерживаются до
+    подтверждения брокера (иначе следующую пачку мог бы опубликовать другой
+    воркер раньше этой), поэтому отправка ограничена send_timeout секундами.
+    Доставленные строки удаляются через retention секунд
+    """
+
+    def __init__(
+        self,
+        session_manager: SessionManager,
+        producer: Union[KafkaProducer, MemoryProducer],
+        batch_size: int = 500,
+        interval: float = 0.5,
+        retention: float = 24 * 60 * 60,
+        send_timeout: float = 30,
+        logger: logging.Logger = logging,
+    ):
+        self.transactional_session = session_manager.transactional_session
+        self.producer = producer
+        self.batch_size = batch_size
+        self.interval = interval
+        self.retention = retention
+        self.send_timeout = send_timeout
+        self.logger = logger
+        self.counters = {"published": 0, "batches": 0, "errors": 0, "purged": 0}
+        self._task: Optional[asyncio.Task] = None
+
+    async def relay(self) -> int:
+        async with self.transactional_session() as session:
+            locked = await session.scalar(
+                select(func.pg_try_advisory_xact_lock(RELAY_LOCK))
+            )
+            if not locked:
+                return 0
+            rows = (
+                await session.execute(
+                    select(
+                        OutboxEvent.seq,
+                        OutboxEvent.topic,
+                        OutboxEvent.key,
+                        OutboxEvent.payload,
+                    )
+                    .where(OutboxEvent.delivered_at.is_(None))
+                    .order_by(OutboxEvent.seq)
+                    .limit(self.batch_size)
+                )
+            ).all()
+            if not rows:
+                return 0
+            await asyncio.wait_for(
+                self.producer.send_batch(
+                    [
+                        (row.topic, row.key.encode() if row.key else None, row.payload)
+                        for row in rows
+                    ]
+                ),
+                self.send_timeout,
+            )
+            await session.execute(
+                update(OutboxEvent)
+                .where(
+                    OutboxEvent.seq
+                    == any_(
+                        bindparam(
+                            "seqs",
+                            value=[row.seq for row in rows],
+                            type_=ARRAY(BigInteger),
+                        )
+                    )
+                )
+                .values(delivered_at=func.now())
+            )
+            await session.commit()
+        self.counters["published"] += len(rows)
+        self.counters["batches"] += 1
+        return len(rows)
+
+    async def purge(self) -> int:
+        async with self.transactional_session() as session:
+            result = await session.execute(
+                delete(OutboxEvent).where(
+                    OutboxEvent.delivered_at
+                    < func.now() - timedelta(seconds=self.retention)
+                )
+            )
+            await session.commit()
+        self.counters["purged"] += result.rowcount
+        return result.rowcount
+
+    async def _run(self) -> None:
+        purged_at, failures = time.monotonic(), 0
+        while True:
+            try:
+                sent = await self.relay()
+                if time.monotonic() - purged_at > self.retention / 24:
+                    purged_at = time.monotonic()
+                    await self.purge()
+                failures = 0
+            except Exception as error:
+                self.counters["errors"] += 1
+                self.logger.error("Ошибка публикации событий outbox: %s", error)
+                sent, failures = 0, failures + 1
+            if sent < self.batch_size:
+                await asyncio.sleep(min(self.interval * 2**failures, 30))
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.producer.stop()
+
+    def stats(self) -> dict:
+        return dict(self.counters)
@@ -0,0 +1,135 @@
+import asyncio
+import itertools
+import logging
+import time
+from contextvars import ContextVar
+from typing import Hashable, Optional
+
+from sqlalchemy import text
+
+from infrastructure.cache.lru_cache import TTLCache
+from infrastructure.database.alchemy_gateway import SessionManager
+
+_primary_until: ContextVar[float] = ContextVar("primary_until", default=0.0)
+
+
+class ReplicaRouter:
+    """
+    Маршрутизация чтения по репликам (replicas - параметры SessionManager):
+    round-robin среди реплик, прошедших проверку (доступна и отстает
+    не больше max_lag секунд), при их отсутствии чтение идет в primary.
+    Read-your-writes: после записи чтение в том же контексте (запросе),
+    а также чтение записанных ключей в течение sticky_seconds идет в primary
+    """
+
+    def __init__(
+        self,
+        primary: SessionManager,
+        replicas: list[dict],
+        check_interval: float = 5,
+        max_lag: float = 10,
+        sticky_seconds: float = 5,
+        sticky_maxsize: int = 100000,
+        logger: logging.Logger = logging,
+    ):
+        self.primary = primary
+        self.replicas = [SessionManager(**options) for options in replicas]
+        self.check_interval = check_interval
+        self.max_lag = max_lag
+        self.sticky_seconds = sticky_seconds
+        self.logger = logger
+        self.healthy: list[SessionManager] = list(self.replicas)
+        self.recent = TTLCache(maxsize=sticky_maxsize, ttl=sticky_seconds)
+        self.counters = {"primary_reads": 0, "replica_reads": 0, "sticky_reads": 0}
+        self._next = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+
+    def stick(self, *keys: Hashable) -> None:
+        if not self.replicas:
+            return
+        _primary_until.set(time.monotonic() + self.sticky_seconds)
+        for key in keys:
+            if key is not None:
+                self.recent.set(key, True)
+
+    def reader(self, *keys: Hashable) -> SessionManager:
+        if not self.healthy:
+            self.counters["primary_reads"] += 1
+            return self.primary
+        if _primary_until.get() > time.monotonic() or any(
+            self.recent.get(key) for key in keys
+        ):
+            self.counters["sticky_reads"] += 1
+            return self.primary
+        self.counters["replica_reads"] += 1
+        return self.healthy[next(self._next) % len(self.healthy)]
+
+    @staticmethod
+    async def _lag(replica: SessionManager) -> float:
+        """
+        Отставание в секундах: 0, если весь полученный WAL применен
+        (иначе простаивающая реплика считалась бы отстающей)
+        """
+        async with replica.engine.connect() as connection:
+            return await connection.scalar(
+                text(
+                    "SELECT CASE WHEN pg_last_wal_receive_lsn() "
+                    "= pg_last_wal_replay_lsn() THEN 0 "
+                    "ELSE COALESCE(EXTRACT(EPOCH FROM "
+                    "now() - pg_last_xact_replay_timestamp()), 0) END"
+                )
+            )
+
+    async def _check(self, replica: SessionManager) -> bool:
+        try:
+            lag = await asyncio.wait_for(self._lag(replica), self.check_interval)
+        except Exception as error:
+            self.logger.error("Реплика %s недоступна: %r", replica.host, error)
+            return False
+        if lag > self.max_lag:
+            self.logger.warning("Реплика %s отстает на %.1f с", replica.host, lag)
+            return False
+        return True
+
+    async def check(self) -> None:
+        results = await asyncio.gather(
+            *(self._check(replica) for replica in self.replicas)
+        )
+        healthy = [replica for replica, ok in zip(self.replicas, results) if ok]
+        if len(healthy) != len(self.healthy):
+            self.logger.warning(
+                "Доступно реплик: %s из %s", len(healthy), len(self.replicas)
+            )
+        self.healthy = healthy
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self.check()
+
+    async def start(self) -> None:
+        if self.replicas and self._task is None:
+            await self.check()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def warm_up(self, connections: int) -> None:
+        await asyncio.gather(
+            *(replica.warm_up(connections) for replica in self.healthy)
+        )
+
+    async def close(self) -> None:
+        await self.stop()
+        await asyncio.gather(*(replica.close() for replica in self.replicas))
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "replicas": len(self.replicas),
+            "healthy": len(self.healthy),
+        }
@@ -8,6 +8,15 @@ class OutDiskSpace(BaseAPIException):
     status_code = status.HTTP_503_SERVICE_UNAVAILABLE
 
 
+class StorageOverloaded(BaseAPIException):
+    message = "Storage is overloaded, retry later"
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    def __init__(self, message: str | None = None) -> None:
+        super().__init__(message)
+        self.headers = {"Retry-After": "1"}
+
+
 class FileNotFound(BaseAPIException):
     message = "File not found"
     status_code = status.HTTP_404_NOT_FOUND
@@ -16,3 +25,40 @@ class FileNotFound(BaseAPIException):
 class FileAlreadyExist(BaseAPIException):
     message = "File already exist"
     status_code = status.HTTP_400_BAD_REQUEST
+
+
+class UploadNotFound(BaseAPIException):
+    message = "Uploaded object not found"
+    status_code = status.HTTP_400_BAD_REQUEST
+
+
+class UploadConflict(BaseAPIException):
+    message = "File content was changed concurrently, retry"
+    status_code = status.HTTP_409_CONFLICT
+
+
+class RangeNotSatisfiable(BaseAPIException):
+    message = "Requested range not satisfiable"
+    status_code = status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+
+    def __init__(self, size: int, message: str | None = None) -> None:
+        super().__init__(message)
+        self.headers = {"Content-Range": f"bytes */{size}"}
+
+
+class S3ResponseError(Exception):
+    def __init__(self, code: str, message: str = "", status: int | None = None) -> None:
+        self.code = code
+        self.message = message
+        self.status = status
+        super().__init__(f"{code}: {message}" if message else code)
+
+
+class InvalidCursor(BaseAPIException):
+    message = "Invalid pagination cursor"
+    status_code = status.HTTP_400_BAD_REQUEST
+
+
+class BatchMismatch(BaseAPIException):
+    message = "Files count does not match metadata count"
+    status_code = status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,27 @@
+from typing import Any
+
+
+class MQException(Exception):
+    message: str = "Message queue error"
+
+    def __init__(self, data: Any = None, message: str | None = None) -> None:
+        if message is not None:
+            self.message = message
+        self.data = data
+        super().__init__(self.message)
+
+
+class SerializationError(MQException):
+    message = "Message serialization failed"
+
+
+class DeserializationError(MQException):
+    message = "Message deserialization failed"
+
+
+class RPCTimeout(MQException):
+    message = "RPC call timed out"
+
+
+class RPCError(MQException):
+    message = "RPC call failed"
@@ -0,0 +1,564 @@
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+import ssl
+from collections.abc import AsyncGenerator, AsyncIterator
+from email.utils import parsedate_to_datetime
+from typing import Iterator, Optional, Union
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+import aiohttp
+import certifi
+
+from application.config import settings
+from infrastructure.base_entities.base_file_manager import (
+    BaseFileManager,
+    FileReaderProtocol,
+)
+from infrastructure.exceptions.minio_exceptions import OutDiskSpace, S3ResponseError
+from infrastructure.file_manager.bucket_registry import BucketRegistry
+from infrastructure.file_manager.multipart import (
+    MultipartUploader,
+    file_reader,
+    stream_reader,
+)
+from infrastructure.file_manager.schema import ObjectStat, UploadedObject
+from infrastructure.file_manager.sigv4 import (
+    EMPTY_SHA256,
+    UNSIGNED_PAYLOAD,
+    SigV4Signer,
+    canonical_query,
+    sha256_hex,
+    uri_encode,
+)
+from infrastructure.handlers.metrics import observed, stage
+
+S3_NAMESPACE = "{http://s3.amazonaws.com/doc/2006-03-01/}"
+RETRY_STATUSES = (500, 502, 503, 504)
+
+
+class AioS3Client(BaseFileManager):
+    """
+    Асинхронный клиент S3 поверх aiohttp: подпись SigV4,
+    пул keep-alive соединений, без переходов в executor
+    """
+
+    def __init__(
+        self,
+        protocol: str,
+        host: str,
+        port: Union[str, int],
+        access_key: str,
+        secret_key: str,
+        region: str,
+        chunk_size: int = 64 * 1024,
+        timeout=300,
+        pool_max_size=30,
+        keepalive_timeout=30,
+        cert_check=True,
+        retry_count=5,
+        multipart: Optional[MultipartUploader] = None,
+        logger: logging.Logger = logging,
+    ):
+        self.multipart = multipart or MultipartUploader(logger=logger)
+        self.chunk_size = chunk_size or 64 * 1024
+        self.timeout = timeout
+        self.pool_max_size = pool_max_size
+        self.keepalive_timeout = keepalive_timeout
+        self.cert_check = cert_check
+        self.retry_count = retry_count
+        self.logger = logger
+        self.endpoint = f"{protocol}://{host}:{port}"
+        self.host = f"{host}:{port}"
+        self.signer = SigV4Signer(
+            access_key=access_key or "",
+            secret_key=secret_key or "",
+            region=region or "us-east-1",
+        )
+        self.buckets = BucketRegistry(logger=logger)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            ssl_context = None
+            if self.endpoint.startswith("https"):
+                ssl_context = ssl.create_default_context(
+                    cafile=os.environ.get("SSL_CERT_FILE") or certifi.where()
+                )
+                if not self.cert_check:
+                    ssl_context.check_hostname = False
+                    ssl_context.verify_mode = ssl.CERT_NONE
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.pool_max_size,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ssl=ssl_context,
+                ),
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=self.timeout, sock_read=self.timeout
+                ),
+                auto_decompress=False,
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    @staticmethod
+    def _path(bucket_name: str, object_name: str = "") -> str:
+        return f"/{bucket_name}/{object_name}" if object_name else f"/{bucket_name}"
+
+    async def _request(
+        self,
+        method: str,
+        bucket_name: str,
+        object_name: str = "",
+        query: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        body: Union[bytes, AsyncGenerator, None] = None,
+    ) -> aiohttp.ClientResponse:
+        path = self._path(bucket_name, object_name)
+        retryable = not isinstance(body, AsyncGenerator)
+        if body is None:
+            payload_hash = EMPTY_SHA256
+        elif isinstance(body, bytes):
+            payload_hash = sha256_hex(body)
+        else:
+            payload_hash = UNSIGNED_PAYLOAD
+        attempt = 0
+        while True:
+            signed = self.signer.sign_headers(
+                method=method,
+                host=self.host,
+                path=path,
+                query=query,
+                headers=headers,
+                payload_hash=payload_hash,
+            )
+            try:
+                response = await self.session.request(
+                    method,
+                    f"{self.endpoint}{path}",
+                    params=query,
+                    headers=signed,
+                    data=body,
+                )
+            except aiohttp.ClientConnectionError:
+                if not retryable or attempt >= self.retry_count:
+                    raise
+            else:
+                if response.status < 300:
+                    return response
+                if not (
+                    retryable
+                    and response.status in RETRY_STATUSES
+                    and attempt < self.retry_count
+                ):
+                    raise await self._error(response)
+                response.release()
+            await asyncio.sleep(0.2 * 2**attempt)
+            attempt += 1
+
+    @staticmethod
+    async def _error(response: aiohttp.ClientResponse) -> S3ResponseError:
+        try:
+            content = await response.read()
+        finally:
+            response.release()
+        code, message = None, ""
+        if content:
+            try:
+                root = ElementTree.fromstring(content)
+                code = root.findtext("Code")
+                message = root.findtext("Message") or ""
+            except ElementTree.ParseError:
+                message = content.decode("utf-8", errors="replace")
+        if code is None:
+            code = (
+                settings.S3_ERRORS.NO_SUCH_FILE
+                if response.status == 404
+                else str(response.status)
+            )
+        return S3ResponseError(code=code, message=message, status=response.status)
+
+    async def _read_body(self, data: FileReaderProtocol, length: int) -> AsyncGenerator:
+        """
+        Тело PUT блоками chunk_size: чтение файла (SpooledTemporaryFile может
+        лежать на диске) выполняется в executor, цикл событий не блокируется
+        """
+        read = file_reader(data)
+        while length > 0 and (chunk := await read(min(self.chunk_size, length))):
+            length -= len(chunk)
+            yield chunk
+
+    @observed("s3")
+    async def list_buckets(self) -> list[str]:
+        response = await self._request("GET", "")
+        try:
+            root = ElementTree.fromstring(await response.read())
+        finally:
+            response.release()
+        return [
+            bucket.findtext(f"{S3_NAMESPACE}Name")
+            for bucket in root.iter(f"{S3_NAMESPACE}Bucket")
+        ]
+
+    @observed("s3")
+    async def bucket_exists(self, bucket_name: str) -> bool:
+        try:
+            response = await self._request("HEAD", bucket_name)
+        except S3ResponseError as error:
+            if error.status == 404:
+                return False
+            raise error
+        response.release()
+        return True
+
+    @observed("s3")
+    async def make_bucket(self, bucket_name: str) -> None:
+        self.logger.warning("Не найден bucket %s...", bucket_name)
+        try:
+            response = await self._request("PUT", bucket_name)
+        except S3ResponseError as error:
+            if error.code != settings.S3_ERRORS.BUCKET_ALREADY_OWNED:
+                raise error
+        else:
+            response.release()
+        self.logger.warning("Bucket %s успешно создан", bucket_name)
+
+    @observed("s3")
+    async def upload_file(
+        self,
+        bucket_name: str,
+        object_name: str,
+        mimetype: str,
+        data: FileReaderProtocol,
+        **kwargs,
+    ) -> UploadedObject:
+        self.logger.warning(
+            "Загрузка файла %s в bucket %s...", object_name, bucket_name
+        )
+        object_name = self.format_masks(object_name, mimetype)
+        length = kwargs.pop("length", -1)
+        if length == -1:
+            length = self.content_length(data)
+        headers = self.object_headers(
+            content_type=kwargs.pop("content_type", mimetype),
+            tags=kwargs.pop("tags", None),
+            metadata=kwargs.pop("metadata", None),
+        )
+        await self.ensure_bucket(bucket_name)
+        try:
+            if length is None or length > self.multipart.part_size:
+                uploaded = await self.multipart.upload(
+                    self,
+                    bucket_name=bucket_name,
+                    object_name=object_name,
+                    read=file_reader(data),
+                    headers=headers,
+                )
+            else:
+                etag = await self._put_object(
+                    bucket_name, object_name, data, length, headers
+                )
+                uploaded = UploadedObject(
+                    object_name=object_name, etag=etag, size=length
+                )
+        except S3ResponseError as error:
+            if error.code == settings.S3_ERRORS.NO_SUCH_BUCKET:
+                self.buckets.forget(bucket_name)
+            if error.code == settings.S3_ERRORS.MINIO_STORAGE_FULL:
+                self.logger.error("Закончилось место на диске")
+                raise OutDiskSpace("Закончилось место на диске")
+            raise error
+        self.logger.warning(
+            "Загрузка файла %s в bucket %s прошла успешно", object_name, bucket_name
+        )
+        return uploaded
+
+    @observed("s3")
+    async def upload_stream(
+        self,
+        bucket_name: str,
+        object_name: str,
+        mimetype: str,
+        stream: AsyncIterator[bytes],
+        **kwargs,
+    ) -> UploadedObject:
+        self.logger.warning(
+            "Потоковая загрузка файла %s в bucket %s...", object_name, bucket_name
+        )
+        await self.ensure_bucket(bucket_name)
+        try:
+            uploaded = await self.multipart.upload(
+                self,
+                bucket_name=bucket_name,
+                object_name=object_name,
+                read=stream_reader(stream),
+                headers=self.object_headers(
+                    content_type=kwargs.pop("content_type", mimetype),
+                    tags=kwargs.pop("tags", None),
+                    metadata=kwargs.pop("metadata", None),
+                ),
+            )
+        except S3ResponseError as error:
+            if error.code == settings.S3_ERRORS.NO_SUCH_BUCKET:
+                self.buckets.forget(bucket_name)
+            if error.code == settings.S3_ERRORS.MINIO_STORAGE_FULL:
+                self.logger.error("Закончилось место на диске")
+                raise OutDiskSpace("Закончилось место на диске")
+            raise error
+        self.logger.warning(
+            "Загрузка файла %s в bucket %s прошла успешно", object_name, bucket_name
+        )
+        return uploaded
+
+    @observed("s3")
+    async def _put_object(
+        self,
+        bucket_name: str,
+        object_name: str,
+        data: FileReaderProtocol,
+        length: int,
+        headers: dict,
+    ) -> Optional[str]:
+        response = await self._request(
+            "PUT",
+            bucket_name,
+            object_name,
+            headers={**headers, "Content-Length": str(length)},
+            body=self._read_body(data, length),
+        )
+        response.release()
+        return response.headers.get("ETag", "").strip('"') or None
+
+    @observed("s3")
+    async def presigned_url(
+        self, method: str, bucket_name: str, object_name: str, expires: int
+    ) -> str:
+        path = self._path(bucket_name, object_name)
+        params = self.signer.presign(
+            method=method, host=self.host, path=path, expires=expires
+        )
+        return (
+            f"{self.endpoint}{uri_encode(path, safe='/-_.~')}"
+            f"?{canonical_query(params)}"
+        )
+
+    @observed("s3")
+    async def create_multipart_upload(
+        self, bucket_name: str, object_name: str, headers: dict
+    ) -> str:
+        response = await self._request(
+            "POST", bucket_name, object_name, query={"uploads": ""}, headers=headers
+        )
+        try:
+            root = ElementTree.fromstring(await response.read())
+        finally:
+            response.release()
+        return root.findtext(f"{S3_NAMESPACE}UploadId")
+
+    @observed("s3")
+    async def upload_part(
+        self,
+        bucket_name: str,
+        object_name: str,
+        upload_id: str,
+        part_number: int,
+        data: bytes,
+    ) -> str:
+        response = await self._request(
+            "PUT",
+            bucket_name,
+            object_name,
+            query={"partNumber": str(part_number), "uploadId": upload_id},
+            body=data,
+        )
+        response.release()
+        return response.headers.get("ETag", "").strip('"')
+
+    @observed("s3")
+    async def complete_multipart_upload(
+        self,
+        bucket_name: str,
+        object_name: str,
+        upload_id: str,
+        parts: list[tuple[int, str]],
+    ) -> Optional[str]:
+        body = "".join(
+            f'<Part><PartNumber>{number}</PartNumber><ETag>"{etag}"</ETag></Part>'
+            for number, etag in sorted(parts)
+        )
+        response = await self._request(
+            "POST",
+            bucket_name,
+            object_name,
+            query={"uploadId": upload_id},
+            headers={"Content-Type": "application/xml"},
+            body=f"<CompleteMultipartUpload>{body}</CompleteMultipartUpload>".encode(),
+        )
+        try:
+            root = ElementTree.fromstring(await response.read())
+        finally:
+            response.release()
+        if root.tag == "Error":
+            raise S3ResponseError(
+                code=root.findtext("Code"),
+                message=root.findtext("Message") or "",
+                status=response.status,
+            )
+        return (root.findtext(f"{S3_NAMESPACE}ETag") or "").strip('"') or None
+
+    @observed("s3")
+    async def abort_multipart_upload(
+        self, bucket_name: str, object_name: str, upload_id: str
+    ) -> None:
+        response = await self._request(
+            "DELETE", bucket_name, object_name, query={"uploadId": upload_id}
+        )
+        response.release()
+
+    @observed("s3")
+    async def download_file(self, bucket_name, object_name, **kwargs) -> bytes:
+        response = await self._request("GET", bucket_name, object_name)
+        try:
+            return await response.read()
+        finally:
+            response.release()
+
+    async def download_file_chunk(
+        self,
+        bucket_name,
+        object_name,
+        offset: int = 0,
+        length: Optional[int] = None,
+        **kwargs,
+    ) -> AsyncGenerator:
+        if length == 0:
+            return
+        headers = None
+        if offset or length:
+            end = offset + length - 1 if length else ""
+            headers = {"range": f"bytes={offset}-{end}"}
+        with stage("s3", "get_object"):
+            response = await self._request(
+                "GET", bucket_name, object_name, headers=headers
+            )
+        try:
+            async for chunk in response.content.iter_chunked(self.chunk_size):
+                yield chunk
+        finally:
+            response.release()
+
+    @observed("s3")
+    async def delete_object(self, bucket_name: str, object_name: str, **kwargs) -> None:
+        response = await self._request("DELETE", bucket_name, object_name)
+        response.release()
+
+    async def _delete_batch(
+        self, bucket_name: str, object_names: list[str]
+    ) -> list[str]:
+        keys = "".join(
+            f"<Object><Key>{escape(name)}</Key></Object>" for name in object_names
+        )
+        body = f"<Delete><Quiet>true</Quiet>{keys}</Delete>".encode()
+        response = await self._request(
+            "POST",
+            bucket_name,
+            query={"delete": ""},
+            headers={
+                "Content-Type": "application/xml",
+                "Content-MD5": base64.b64encode(hashlib.md5(body).digest()).decode(),
+            },
+            body=body,
+        )
+        try:
+            root = ElementTree.fromstring(await response.read())
+        finally:
+            response.release()
+        failed = []
+        for error in root.iter(f"{S3_NAMESPACE}Error"):
+            name = error.findtext(f"{S3_NAMESPACE}Key")
+            self.logger.error(
+                "Не удалось удалить файл %s: %s",
+                name,
+                error.findtext(f"{S3_NAMESPACE}Message"),
+            )
+            failed.append(name)
+        return failed
+
+    @observed("s3")
+    async def delete_objects(
+        self, bucket_name: str, object_names: list[str]
+    ) -> list[str]:
+        results = await asyncio.gather(
+            *(
+                self._delete_batch(bucket_name, batch)
+                for batch in self.batches(object_names)
+            )
+        )
+        return [name for failed in results for name in failed]
+
+    @observed("s3")
+    async def get_list_objects(self, bucket_name: str, **kwargs) -> Iterator:
+        query = {"list-type": "2", "prefix": kwargs.get("prefix") or ""}
+        if not kwargs.get("recursive", False):
+            query["delimiter"] = "/"
+        objects = []
+        while True:
+            response = await self._request("GET", bucket_name, query=query)
+            try:
+                root = ElementTree.fromstring(await response.read())
+            finally:
+                response.release()
+            for item in root.iter(f"{S3_NAMESPACE}Contents"):
+                modified = item.findtext(f"{S3_NAMESPACE}LastModified")
+                objects.append(
+                    ObjectStat(
+                        bucket_name=bucket_name,
+                        object_name=item.findtext(f"{S3_NAMESPACE}Key"),
+                        size=int(item.findtext(f"{S3_NAMESPACE}Size") or 0),
+                        etag=(item.findtext(f"{S3_NAMESPACE}ETag") or "").strip('"'),
+                        last_modified=modified,
+                    )
+                )
+            token = root.findtext(f"{S3_NAMESPACE}NextContinuationToken")
+            if root.findtext(f"{S3_NAMESPACE}IsTruncated") != "true" or not token:
+                break
+            query["continuation-token"] = token
+        return iter(objects)
+
+    @observed("s3")
+    async def check_file_exist(
+        self, bucket_name: str, object_name: str, **kwargs
+    ) -> bool:
+        return await self.stat_file(bucket_name, object_name) is not None
+
+    @observed("s3")
+    async def stat_file(
+        self, bucket_name: str, object_name: str, **kwargs
+    ) -> Optional[ObjectStat]:
+        try:
+            response = await self._request("HEAD", bucket_name, object_name)
+        except S3ResponseError as error:
+            if error.code in (
+                settings.S3_ERRORS.NO_SUCH_FILE,
+                settings.S3_ERRORS.NO_SUCH_BUCKET,
+            ):
+                return None
+            raise error
+        response.release()
+        modified = response.headers.get("Last-Modified")
+        return ObjectStat(
+            bucket_name=bucket_name,
+            object_name=object_name,
+            size=int(response.headers.get("Content-Length", 0)),
+            etag=response.headers.get("ETag", "").strip('"') or None,
+            last_modified=parsedate_to_datetime(modified) if modified else None,
+            content_type=response.headers.get("Content-Type"),
+        )
@@ -0,0 +1,42 @@
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from infrastructure.base_entities.base_file_manager import BaseFileManager
+
+
+class BucketRegistry:
+    """
+    Известные bucket хранилища. Заполняется при старте из list_buckets,
+    неизвестный bucket проверяется и создается до отправки данных,
+    один раз на bucket даже при конкурентных загрузках
+    """
+
+    def __init__(self, logger: logging.Logger = logging):
+        self.logger = logger
+        self.known: set[str] = set()
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def warm_up(self, manager: "BaseFileManager") -> None:
+        try:
+            self.known.update(await manager.list_buckets())
+        except Exception as error:
+            self.logger.error("Не удалось получить список bucket: %s", error)
+            return
+        self.logger.warning("Известные bucket: %s", len(self.known))
+
+    async def ensure(self, manager: "BaseFileManager", bucket_name: str) -> None:
+        if bucket_name in self.known:
+            return
+        lock = self._locks.setdefault(bucket_name, asyncio.Lock())
+        async with lock:
+            if bucket_name in self.known:
+                return
+            if not await manager.bucket_exists(bucket_name):
+                await manager.make_bucket(bucket_name)
+            self.known.add(bucket_name)
+        self._locks.pop(bucket_name, None)
+
+    def forget(self, bucket_name: str) -> None:
+        self.known.discard(bucket_name)
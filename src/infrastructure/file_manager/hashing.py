@@ -0,0 +1,44 @@
+import hashlib
+from typing import AsyncIterator
+
+from infrastructure.base_entities.base_file_manager import FileReaderProtocol
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(data: FileReaderProtocol, chunk_size: int = HASH_CHUNK_SIZE) -> tuple:
+    """
+    SHA-256 и размер файла; позиция чтения возвращается в исходную
+    """
+    start = data.tell()
+    digest = hashlib.sha256()
+    size = 0
+    while chunk := data.read(chunk_size):
+        digest.update(chunk)
+        size += len(chunk)
+    data.seek(start)
+    return digest.hexdigest(), size
+
+
+def content_key(sha256: str) -> str:
+    return f"sha256/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+class HashingStream:
+    """
+    Обертка над асинхронным потоком: считает SHA-256 и размер по мере чтения
+    """
+
+    def __init__(self, stream: AsyncIterator[bytes]):
+        self.stream = stream
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self.stream:
+            self.digest.update(chunk)
+            self.size += len(chunk)
+            yield chunk
+
+    def hexdigest(self) -> str:
+        return self.digest.hexdigest()
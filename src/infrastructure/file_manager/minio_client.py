@@ -1,26 +1,35 @@
 import logging
 import os
-from asyncio import AbstractEventLoop, get_event_loop
-from datetime import datetime
-from typing import AsyncGenerator, Iterator, Optional, Protocol, Union
+from asyncio import AbstractEventLoop
+from datetime import timedelta
+from time import monotonic
+from typing import AsyncGenerator, AsyncIterator, Iterator, Optional, Union
 
 import certifi
 from minio import Minio, S3Error
 from minio.commonconfig import Tags
-from minio.helpers import MIN_PART_SIZE
+from minio.datatypes import Part
+from minio.deleteobjects import DeleteObject
 from urllib3 import HTTPResponse, PoolManager, Retry, Timeout
 
 from application.config import settings
+from infrastructure.base_entities.base_file_manager import (
+    BaseFileManager,
+    FileReaderProtocol,
+)
 from infrastructure.exceptions.minio_exceptions import OutDiskSpace
-from infrastructure.handlers.asyncio_handler import run_in_executor
+from infrastructure.file_manager.bucket_registry import BucketRegistry
+from infrastructure.file_manager.multipart import (
+    MultipartUploader,
+    file_reader,
+    stream_reader,
+)
+from infrastructure.file_manager.schema import ObjectStat, UploadedObject
+from infrastructure.handlers.io_executor import BULK, IOExecutor
+from infrastructure.handlers.metrics import observed, pools
 
 
-class FileReaderProtocol(Protocol):
-    def read(self) -> bytes:
-        pass
-
-
-class MinioClient:
+class MinioClient(BaseFileManager):
     def __init__(
         self,
         protocol: str,
@@ -29,17 +38,28 @@ class MinioClient:
         access_key: str,
         secret_key: str,
         region: str,
-        chunk_size: int = 1024,
+        chunk_size: int = 64 * 1024,
+        max_chunk_size: int = 4 * 1024 * 1024,
+        chunk_latency: float = 0.05,
         timeout=300,
         pool_max_size=30,
         cert_check=True,
         retry_count=5,
-        loop: AbstractEventLoop = get_event_loop(),
+        multipart: Optional[MultipartUploader] = None,
+        loop: Optional[AbstractEventLoop] = None,
+        executor: Optional[IOExecutor] = None,
         logger: logging.Logger = logging,
     ):
-        self.chunk_size = chunk_size
+        self.multipart = multipart or MultipartUploader(logger=logger)
+        self.chunk_size = chunk_size or 64 * 1024
+        self.max_chunk_size = max(max_chunk_size or 0, self.chunk_size)
+        self.chunk_latency = chunk_latency
         self.loop = loop
+        self.executor = executor or IOExecutor(
+            name="s3", max_workers=pool_max_size, logger=logger
+        )
         self.logger = logger
+        self.buckets = BucketRegistry(logger=logger)
         self.client = Minio(
             endpoint=f"{host}:{port}",
             secure=True if protocol == "https" else False,
@@ -58,7 +78,9 @@ class MinioClient:
                 ),
             ),
         )
+        pools.track_http_pool(f"minio:{host}:{port}", self.client._http)
 
+    @observed("s3")
     async def upload_file(
         self,
         bucket_name: str,
@@ -66,37 +88,75 @@ class MinioClient:
         mimetype: str,
         data: FileReaderProtocol,
         **kwargs,
-    ) -> str:
+    ) -> UploadedObject:
         self.logger.warning(
             "Загрузка файла %s в bucket %s...", object_name, bucket_name
         )
+        object_name = self.format_masks(object_name, mimetype)
         length = kwargs.pop("length", -1)
-        kwargs["part_size"] = MIN_PART_SIZE if length == -1 else 0
-        minio_tags = Tags(for_object=True)
-        minio_tags.update(**kwargs.pop("tags", {}))
+        if length == -1:
+            length = self.content_length(data)
+        await self.ensure_bucket(bucket_name)
         try:
-            response = await run_in_executor(
-                loop=self.loop,
-                func=self.client.put_object,
+            if length is None or length > self.multipart.part_size:
+                uploaded = await self.multipart.upload(
+                    self,
+                    bucket_name=bucket_name,
+                    object_name=object_name,
+                    read=file_reader(data, self.loop),
+                    headers=self.object_headers(
+                        content_type=kwargs.pop("content_type", mimetype),
+                        tags=kwargs.pop("tags", None),
+                        metadata=kwargs.pop("metadata", None),
+                    ),
+                )
+            else:
+                etag = await self._put_object(
+                    bucket_name, object_name, data, length, **kwargs
+                )
+                uploaded = UploadedObject(
+                    object_name=object_name, etag=etag, size=length
+                )
+        except S3Error as error:
+            if error.code == settings.S3_ERRORS.NO_SUCH_BUCKET:
+                self.buckets.forget(bucket_name)
+            if error.code == settings.S3_ERRORS.MINIO_STORAGE_FULL:
+                self.logger.error("Закончилось место на диске")
+                raise OutDiskSpace("Закончилось место на диске")
+            raise error
+        self.logger.warning(
+            "Загрузка файла %s в bucket %s прошла успешно", object_name, bucket_name
+        )
+        return uploaded
+
+    @observed("s3")
+    async def upload_stream(
+        self,
+        bucket_name: str,
+        object_name: str,
+        mimetype: str,
+        stream: AsyncIterator[bytes],
+        **kwargs,
+    ) -> UploadedObject:
+        self.logger.warning(
+            "Потоковая загрузка файла %s в bucket %s...", object_name, bucket_name
+        )
+        await self.ensure_bucket(bucket_name)
+        try:
+            uploaded = await self.multipart.upload(
+                self,
                 bucket_name=bucket_name,
-                object_name=self.format_masks(object_name, mimetype),
-                data=data,
-                length=length,
-                tags=minio_tags,
-                **kwargs,
+                object_name=object_name,
+                read=stream_reader(stream),
+                headers=self.object_headers(
+                    content_type=kwargs.pop("content_type", mimetype),
+                    tags=kwargs.pop("tags", None),
+                    metadata=kwargs.pop("metadata", None),
+                ),
             )
         except S3Error as error:
             if error.code == settings.S3_ERRORS.NO_SUCH_BUCKET:
-                self.logger.warning("Не найден bucket %s...", bucket_name)
-                await run_in_executor(
-                    loop=self.loop,
-                    func=self.client.make_bucket,
-                    bucket_name=bucket_name,
-                )
-                self.logger.warning("Bucket %s успешно создан", bucket_name)
-                return await self.upload_file(
-                    bucket_name, object_name, mimetype, data, **kwargs
-                )
+                self.buckets.forget(bucket_name)
             if error.code == settings.S3_ERRORS.MINIO_STORAGE_FULL:
                 self.logger.error("Закончилось место на диске")
                 raise OutDiskSpace("Закончилось место на диске")
@@ -104,13 +164,145 @@ class MinioClient:
         self.logger.warning(
             "Загрузка файла %s в bucket %s прошла успешно", object_name, bucket_name
         )
-        return response.object_name
+        return uploaded
+
+    @observed("s3")
+    async def _put_object(
+        self,
+        bucket_name: str,
+        object_name: str,
+        data: FileReaderProtocol,
+        length: int,
+        **kwargs,
+    ) -> Optional[str]:
+        minio_tags = Tags(for_object=True)
+        minio_tags.update(**(kwargs.pop("tags", None) or {}))
+        result = await self.executor.run(
+            loop=self.loop,
+            priority=BULK,
+            func=self.client.put_object,
+            bucket_name=bucket_name,
+            object_name=object_name,
+            data=data,
+            length=length,
+            tags=minio_tags,
+            **kwargs,
+        )
+        return result.etag
+
+    async def close(self) -> None:
+        self.client._http.clear()
+        self.executor.shutdown()
+
+    @observed("s3")
+    async def list_buckets(self) -> list[str]:
+        buckets = await self.executor.run(loop=self.loop, func=self.client.list_buckets)
+        return [bucket.name for bucket in buckets]
+
+    @observed("s3")
+    async def bucket_exists(self, bucket_name: str) -> bool:
+        return await self.executor.run(
+            loop=self.loop,
+            func=self.client.bucket_exists,
+            bucket_name=bucket_name,
+        )
+
+    @observed("s3")
+    async def make_bucket(self, bucket_name: str) -> None:
+        self.logger.warning("Не найден bucket %s...", bucket_name)
+        try:
+            await self.executor.run(
+                loop=self.loop,
+                func=self.client.make_bucket,
+                bucket_name=bucket_name,
+            )
+        except S3Error as error:
+            if error.code != settings.S3_ERRORS.BUCKET_ALREADY_OWNED:
+                raise error
+        self.logger.warning("Bucket %s успешно создан", bucket_name)
+
+    @observed("s3")
+    async def presigned_url(
+        self, method: str, bucket_name: str, object_name: str, expires: int
+    ) -> str:
+        return await self.executor.run(
+            loop=self.loop,
+            func=self.client.get_presigned_url,
+            method=method,
+            bucket_name=bucket_name,
+            object_name=object_name,
+            expires=timedelta(seconds=expires),
+        )
 
+    @observed("s3")
+    async def create_multipart_upload(
+        self, bucket_name: str, object_name: str, headers: dict
+    ) -> str:
+        return await self.executor.run(
+            loop=self.loop,
+            func=self.client._create_multipart_upload,
+            bucket_name=bucket_name,
+            object_name=object_name,
+            headers=dict(headers),
+        )
+
+    @observed("s3")
+    async def upload_part(
+        self,
+        bucket_name: str,
+        object_name: str,
+        upload_id: str,
+        part_number: int,
+        data: bytes,
+    ) -> str:
+        return await self.executor.run(
+            loop=self.loop,
+            priority=BULK,
+            func=self.client._upload_part,
+            bucket_name=bucket_name,
+            object_name=object_name,
+            data=data,
+            headers=None,
+            upload_id=upload_id,
+            part_number=part_number,
+        )
+
+    @observed("s3")
+    async def complete_multipart_upload(
+        self,
+        bucket_name: str,
+        object_name: str,
+        upload_id: str,
+        parts: list[tuple[int, str]],
+    ) -> Optional[str]:
+        result = await self.executor.run(
+            loop=self.loop,
+            func=self.client._complete_multipart_upload,
+            bucket_name=bucket_name,
+            object_name=object_name,
+            upload_id=upload_id,
+            parts=[Part(number, etag) for number, etag in parts],
+        )
+        return result.etag
+
+    @observed("s3")
+    async def abort_multipart_upload(
+        self, bucket_name: str, object_name: str, upload_id: str
+    ) -> None:
+        await self.executor.run(
+            loop=self.loop,
+            func=self.client._abort_multipart_upload,
+            bucket_name=bucket_name,
+            object_name=object_name,
+            upload_id=upload_id,
+        )
+
+    @observed("s3", "get_object")
     async def download_file_raw(
         self, bucket_name, object_name, **kwargs
     ) -> HTTPResponse:
         self.logger.debug("Загрузка файла %s из bucket %s...", object_name, bucket_name)
-        response = await run_in_executor(
+        response = await self.executor.run(
             loop=self.loop,
             func=self.client.get_object,
             bucket_name=bucket_name,
@@ -122,6 +314,7 @@ class MinioClient:
         )
         return response
 
+    @observed("s3")
     async def download_file(self, bucket_name, object_name, **kwargs) -> bytes:
         response = None
         try:
@@ -135,30 +328,54 @@ class MinioClient:
                 response.release_conn()
 
     async def download_file_chunk(
-        self, bucket_name, object_name, **kwargs
+        self,
+        bucket_name,
+        object_name,
+        offset: int = 0,
+        length: Optional[int] = None,
+        **kwargs,
     ) -> AsyncGenerator:
-        response = None
-        offset = 0
+        """
+        Потоковое чтение объекта через одно соединение.
+        Размер блока, читаемого за один переход в executor, адаптируется:
+        растет до max_chunk_size, пока чтение укладывается в chunk_latency,
+        и уменьшается до chunk_size на медленном соединении
+        """
+        if length == 0:
+            return
+        response = await self.download_file_raw(
+            bucket_name=bucket_name,
+            object_name=object_name,
+            offset=offset,
+            length=length or 0,
+            **kwargs,
+        )
+        read_size = self.chunk_size
         try:
             while True:
-                response = await self.download_file_raw(
-                    bucket_name=bucket_name,
-                    object_name=object_name,
-                    length=self.chunk_size,
-                    offset=offset,
-                    **kwargs,
+                started = monotonic()
+                data = await self.executor.run(
+                    loop=self.loop,
+                    priority=BULK,
+                    shed=False,
+                    func=response.read,
+                    amt=read_size,
                 )
-                offset += self.chunk_size
-                yield response.data
-                if len(response.data) < self.chunk_size:
+                if not data:
                     break
+                elapsed = monotonic() - started
+                if elapsed < self.chunk_latency and len(data) == read_size:
+                    read_size = min(read_size * 2, self.max_chunk_size)
+                elif elapsed > self.chunk_latency * 2:
+                    read_size = max(read_size // 2, self.chunk_size)
+                yield data
         finally:
-            if response:
-                response.close()
-                response.release_conn()
+            response.close()
+            response.release_conn()
 
+    @observed("s3")
     async def delete_object(self, bucket_name: str, object_name: str, **kwargs) -> None:
-        await run_in_executor(
+        await self.executor.run(
             loop=self.loop,
             func=self.client.remove_object,
             bucket_name=bucket_name,
@@ -166,19 +383,45 @@ class MinioClient:
             **kwargs,
         )
 
+    def _remove_objects(self, bucket_name: str, object_names: list[str]) -> list[str]:
+        failed = []
+        for batch in self.batches(object_names):
+            errors = self.client.remove_objects(
+                bucket_name, [DeleteObject(name) for name in batch]
+            )
+            for error in errors:
+                self.logger.error(
+                    "Не удалось удалить файл %s: %s", error.name, error.message
+                )
+                failed.append(error.name)
+        return failed
+
+    @observed("s3")
+    async def delete_objects(
+        self, bucket_name: str, object_names: list[str]
+    ) -> list[str]:
+        return await self.executor.run(
+            loop=self.loop,
+            func=self._remove_objects,
+            bucket_name=bucket_name,
+            object_names=object_names,
+        )
+
+    @observed("s3")
     async def get_list_objects(self, bucket_name: str, **kwargs) -> Iterator:
-        return await run_in_executor(
+        return await self.executor.run(
             loop=self.loop,
             func=self.client.list_objects,
             bucket_name=bucket_name,
             **kwargs,
         )
 
+    @observed("s3")
     async def check_file_exist(
         self, bucket_name: str, object_name: str, **kwargs
     ) -> bool:
         try:
-            await run_in_executor(
+            await self.executor.run(
                 loop=self.loop,
                 func=self.client.stat_object,
                 bucket_name=bucket_name,
@@ -194,17 +437,30 @@ class MinioClient:
             raise error
         return True
 
-    @classmethod
-    def format_masks(
-        cls, text: str, extension: str, date: Optional[datetime] = None
-    ) -> str:
-        type_ext = "." + extension.split("/")[-1]
-        date = date or datetime.now()
-        dates = {
-            "DD": date.strftime("%d").zfill(2),
-            "MM": date.strftime("%m").zfill(2),
-            "YY": date.strftime("%y").zfill(2),
-            "YYYY": date.strftime("%Y"),
-            "MONTH": date.strftime("%B"),
-        }
-        return text.format(**dates) + type_ext
+    @observed("s3")
+    async def stat_file(
+        self, bucket_name: str, object_name: str, **kwargs
+    ) -> Optional[ObjectStat]:
+        try:
+            result = await self.executor.run(
+                loop=self.loop,
+                func=self.client.stat_object,
+                bucket_name=bucket_name,
+                object_name=object_name,
+                **kwargs,
+            )
+        except S3Error as error:
+            if error.code in (
+                settings.S3_ERRORS.NO_SUCH_FILE,
+                settings.S3_ERRORS.NO_SUCH_BUCKET,
+            ):
+                return None
+            raise error
+        return ObjectStat(
+            bucket_name=result.bucket_name,
+            object_name=result.object_name,
+            size=result.size,
+            etag=result.etag,
+            last_modified=result.last_modified,
+            content_type=result.content_type,
+        )
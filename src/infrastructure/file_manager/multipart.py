@@ -0,0 +1,218 @@
+import asyncio
+import logging
+from asyncio import AbstractEventLoop
+from collections import deque
+from functools import partial
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Callable, Optional
+
+from infrastructure.base_entities.base_exception import BaseAPIException
+from infrastructure.file_manager.schema import UploadedObject
+from infrastructure.handlers.asyncio_handler import run_in_executor
+
+if TYPE_CHECKING:
+    from infrastructure.base_entities.base_file_manager import BaseFileManager
+
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+PartReader = Callable[[int], Awaitable[bytes]]
+
+
+def file_reader(data, loop: Optional[AbstractEventLoop] = None) -> PartReader:
+    async def read(size: int) -> bytes:
+        return await run_in_executor(loop=loop, func=partial(data.read, size))
+
+    return read
+
+
+def stream_reader(stream: AsyncIterator[bytes]) -> PartReader:
+    """
+    Чтение частей из асинхронного потока (например, тела запроса):
+    следующий блок запрашивается у потока только когда загрузчику нужна часть
+    """
+    iterator = aiter(stream)
+    buffer = bytearray()
+    exhausted = False
+
+    async def read(size: int) -> bytes:
+        nonlocal exhausted
+        while not exhausted and len(buffer) < size:
+            try:
+                buffer.extend(await anext(iterator))
+            except StopAsyncIteration:
+                exhausted = True
+        data = bytes(buffer[:size])
+        del buffer[:size]
+        return data
+
+    return read
+
+
+class MemoryBudget:
+    """
+    Ограничение объема данных в памяти (в байтах), общее для всех загрузок процесса
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    async def acquire(self, size: int) -> None:
+        while self.used and self.used + size > self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            await waiter
+        self.used += size
+
+    def release(self, size: int) -> None:
+        self.used -= size
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+
+
+class MultipartUploader:
+    """
+    Параллельная multipart загрузка: части читаются последовательно
+    (read(size) возвращает меньше size только в конце данных),
+    отправляются конкурентно (не более concurrency одновременно),
+    в памяти одной загрузки не больше upload_memory байт,
+    всего процесса - не больше process_memory
+    """
+
+    def __init__(
+        self,
+        part_size: int = 16 * 1024 * 1024,
+        concurrency: int = 4,
+        upload_memory: int = 128 * 1024 * 1024,
+        process_memory: int = 1024 * 1024 * 1024,
+        retry_count: int = 3,
+        retry_backoff: float = 0.5,
+        logger: logging.Logger = logging,
+    ):
+        self.part_size = max(part_size or 0, MIN_PART_SIZE)
+        self.concurrency = max(concurrency or 1, 1)
+        self.upload_parts = max((upload_memory or 0) // self.part_size, 1)
+        self.budget = MemoryBudget(max(process_memory or 0, self.part_size))
+        self.retry_count = retry_count
+        self.retry_backoff = retry_backoff
+        self.logger = logger
+
+    async def _upload_part(
+        self,
+        manager: "BaseFileManager",
+        bucket_name: str,
+        object_name: str,
+        upload_id: str,
+        part_number: int,
+        data: bytes,
+        network: asyncio.Semaphore,
+    ) -> tuple[int, str]:
+        async with network:
+            for attempt in range(self.retry_count + 1):
+                try:
+                    etag = await manager.upload_part(
+                        bucket_name=bucket_name,
+                        object_name=object_name,
+                        upload_id=upload_id,
+                        part_number=part_number,
+                        data=data,
+                    )
+                    return part_number, etag
+                except BaseAPIException:
+                    raise
+                except Exception as error:
+                    if attempt == self.retry_count:
+                        raise
+                    self.logger.warning(
+                        "Повторная отправка части %s файла %s: %s",
+                        part_number,
+                        object_name,
+                        error,
+                    )
+                    await asyncio.sleep(self.retry_backoff * 2**attempt)
+
+    async def upload(
+        self,
+        manager: "BaseFileManager",
+        bucket_name: str,
+        object_name: str,
+        read: PartReader,
+        headers: Optional[dict] = None,
+    ) -> UploadedObject:
+        upload_id = await manager.create_multipart_upload(
+            bucket_name=bucket_name,
+            object_name=object_name,
+            headers=headers or {},
+        )
+        network = asyncio.Semaphore(self.concurrency)
+        buffered = asyncio.Semaphore(self.upload_parts)
+        tasks: list[asyncio.Task] = []
+        size = 0
+
+        def release(_task: asyncio.Task) -> None:
+            buffered.release()
+            self.budget.release(self.part_size)
+
+        try:
+            while True:
+                await buffered.acquire()
+                await self.budget.acquire(self.part_size)
+                try:
+                    data = await read(self.part_size)
+                except BaseException:
+                    release(None)
+                    raise
+                if not data and tasks:
+                    release(None)
+                    break
+                size += len(data)
+                task = asyncio.create_task(
+                    self._upload_part(
+                        manager,
+                        bucket_name,
+                        object_name,
+                        upload_id,
+                        len(tasks) + 1,
+                        data,
+                        network,
+                    )
+                )
+                task.add_done_callback(release)
+                tasks.append(task)
+                for done in tasks:
+                    if done.done() and not done.cancelled() and done.exception():
+                        raise done.exception()
+                if len(data) < self.part_size:
+                    break
+            parts = await asyncio.gather(*tasks)
+            etag = await manager.complete_multipart_upload(
+                bucket_name=bucket_name,
+                object_name=object_name,
+                upload_id=upload_id,
+                parts=parts,
+            )
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.logger.error(
+                "Multipart загрузка файла %s прервана, отмена %s",
+                object_name,
+                upload_id,
+            )
+            try:
+                await asyncio.shield(
+                    manager.abort_multipart_upload(
+                        bucket_name=bucket_name,
+                        object_name=object_name,
+                        upload_id=upload_id,
+                    )
+                )
+            except Exception as error:
+                self.logger.error(
+                    "Не удалось отменить загрузку %s: %s", upload_id, error
+                )
+            raise
+        return UploadedObject(object_name=object_name, etag=etag, size=size)
@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class ObjectStat(BaseModel):
+    bucket_name: str
+    object_name: str
+    size: int
+    etag: Optional[str] = None
+    last_modified: Optional[datetime] = None
+    content_type: Optional[str] = None
+
+
+class UploadedObject(BaseModel):
+    object_name: str
+    etag: Optional[str] = None
+    size: Optional[int] = None
@@ -0,0 +1,145 @@
+import hashlib
+import hmac
+from datetime import datetime, timezone
+from typing import Mapping, Optional
+from urllib.parse import quote
+
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+EMPTY_SHA256 = hashlib.sha256(b"").hexdigest()
+ALGORITHM = "AWS4-HMAC-SHA256"
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def uri_encode(value: str, safe: str = "-_.~") -> str:
+    return quote(value, safe=safe)
+
+
+def canonical_query(params: Optional[Mapping[str, str]]) -> str:
+    if not params:
+        return ""
+    return "&".join(
+        f"{uri_encode(str(key))}={uri_encode(str(value))}"
+        for key, value in sorted(params.items())
+    )
+
+
+class SigV4Signer:
+    """
+    Подпись запросов к S3 по AWS Signature Version 4
+    """
+
+    def __init__(
+        self,
+        access_key: str,
+        secret_key: str,
+        region: str,
+        service: str = "s3",
+    ):
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.service = service
+        self._signing_keys: dict[str, bytes] = {}
+
+    def _signing_key(self, date_stamp: str) -> bytes:
+        if date_stamp not in self._signing_keys:
+            key = f"AWS4{self.secret_key}".encode("utf-8")
+            for part in (date_stamp, self.region, self.service, "aws4_request"):
+                key = hmac.new(key, part.encode("utf-8"), hashlib.sha256).digest()
+            self._signing_keys = {date_stamp: key}
+        return self._signing_keys[date_stamp]
+
+    def _scope(self, date_stamp: str) -> str:
+        return f"{date_stamp}/{self.region}/{self.service}/aws4_request"
+
+    def _signature(self, canonical_request: str, amz_date: str) -> str:
+        date_stamp = amz_date[:8]
+        string_to_sign = "\n".join(
+            (
+                ALGORITHM,
+                amz_date,
+                self._scope(date_stamp),
+                sha256_hex(canonical_request.encode("utf-8")),
+            )
+        )
+        return hmac.new(
+            self._signing_key(date_stamp),
+            string_to_sign.encode("utf-8"),
+            hashlib.sha256,
+        ).hexdigest()
+
+    def sign_headers(
+        self,
+        method: str,
+        host: str,
+        path: str,
+        query: Optional[Mapping[str, str]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        payload_hash: str = UNSIGNED_PAYLOAD,
+        now: Optional[datetime] = None,
+    ) -> dict[str, str]:
+        amz_date = (now or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+        signed = {
+            key.lower(): str(value).strip() for key, value in (headers or {}).items()
+        }
+        signed.update(
+            {
+                "host": host,
+                "x-amz-date": amz_date,
+                "x-amz-content-sha256": payload_hash,
+            }
+        )
+        signed_names = ";".join(sorted(signed))
+        canonical_request = "\n".join(
+            (
+                method,
+                uri_encode(path, safe="/-_.~"),
+                canonical_query(query),
+                "".join(f"{key}:{signed[key]}\n" for key in sorted(signed)),
+                signed_names,
+                payload_hash,
+            )
+        )
+        signature = self._signature(canonical_request, amz_date)
+        signed["authorization"] = (
+            f"{ALGORITHM} Credential={self.access_key}/{self._scope(amz_date[:8])}, "
+            f"SignedHeaders={signed_names}, Signature={signature}"
+        )
+        return signed
+
+    def presign(
+        self,
+        method: str,
+        host: str,
+        path: str,
+        expires: int,
+        query: Optional[Mapping[str, str]] = None,
+        now: Optional[datetime] = None,
+    ) -> dict[str, str]:
+        """
+        Параметры строки запроса presigned URL (подписан только заголовок host)
+        """
+        amz_date = (now or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+        params = {
+            **(query or {}),
+            "X-Amz-Algorithm": ALGORITHM,
+            "X-Amz-Credential": f"{self.access_key}/{self._scope(amz_date[:8])}",
+            "X-Amz-Date": amz_date,
+            "X-Amz-Expires": str(expires),
+            "X-Amz-SignedHeaders": "host",
+        }
+        canonical_request = "\n".join(
+            (
+                method,
+                uri_encode(path, safe="/-_.~"),
+                canonical_query(params),
+                f"host:{host}\n",
+                "host",
+                UNSIGNED_PAYLOAD,
+            )
+        )
+        params["X-Amz-Signature"] = self._signature(canonical_request, amz_date)
+        return params
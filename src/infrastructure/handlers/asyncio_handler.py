@@ -1,8 +1,10 @@
-from asyncio import AbstractEventLoop, get_event_loop
+from asyncio import AbstractEventLoop, get_running_loop
 from concurrent.futures import Executor
 from functools import partial
 from typing import Any, Optional
 
+from infrastructure.handlers.metrics import EXECUTOR_IN_FLIGHT, ExecutorCall
+
 
 async def run_in_executor(
     func: callable,
@@ -11,5 +13,11 @@ async def run_in_executor(
     *args,
     **kwargs
 ) -> Any:
-    loop = loop or get_event_loop()
-    return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
+    loop = loop or get_running_loop()
+    call = ExecutorCall(partial(func, *args, **kwargs))
+    EXECUTOR_IN_FLIGHT.inc()
+    try:
+        return await loop.run_in_executor(executor, call)
+    finally:
+        EXECUTOR_IN_FLIGHT.dec()
+        call.cancel()
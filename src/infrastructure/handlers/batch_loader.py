@@ -0,0 +1,77 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+BatchLoad = Callable[[list], Awaitable[dict]]
+
+
+class BatchLoader:
+    """
+    Загрузчик в стиле DataLoader: ключи, запрошенные конкурентно в течение
+    window секунд (или до max_batch_size ключей), загружаются одним вызовом
+    batch_load(keys) -> {key: value}; одинаковые ключи объединяются
+    """
+
+    def __init__(
+        self,
+        batch_load: BatchLoad,
+        window: float = 0.002,
+        max_batch_size: int = 1000,
+        default: Any = None,
+        logger: logging.Logger = logging,
+    ):
+        self.batch_load = batch_load
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.default = default
+        self.logger = logger
+        self.counters = {"loads": 0, "batches": 0, "keys": 0}
+        self._pending: dict[Hashable, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, key: Hashable) -> Any:
+        self.counters["loads"] += 1
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[key] = loop.create_future()
+            if len(self._pending) >= self.max_batch_size:
+                self._dispatch()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.window, self._dispatch)
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict[Hashable, asyncio.Future]) -> None:
+        self.counters["batches"] += 1
+        self.counters["keys"] += len(batch)
+        try:
+            results = await self.batch_load(list(batch))
+        except Exception as error:
+            self.logger.error(
+                "Ошибка пакетной загрузки %s ключей: %s", len(batch), error
+            )
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(error)
+            return
+        except BaseException:
+            # отмена (остановка приложения): ожидающие не должны зависнуть
+            for future in batch.values():
+                future.cancel()
+            raise
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(results.get(key, self.default))
+
+    def stats(self) -> dict:
+        return {**self.counters, "pending": len(self._pending)}
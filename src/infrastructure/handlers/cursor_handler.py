@@ -0,0 +1,21 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from typing import Any
+
+from orjson import JSONDecodeError, dumps, loads
+
+from infrastructure.exceptions.minio_exceptions import InvalidCursor
+
+
+def encode_cursor(values: list[Any]) -> str:
+    return urlsafe_b64encode(dumps(values, default=str)).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(token: str) -> list[Any]:
+    try:
+        values = loads(urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (BinasciiError, JSONDecodeError, ValueError):
+        raise InvalidCursor
+    if not isinstance(values, list):
+        raise InvalidCursor
+    return values
@@ -0,0 +1,147 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from asyncio import AbstractEventLoop
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Optional
+
+from infrastructure.exceptions.minio_exceptions import StorageOverloaded
+from infrastructure.handlers.metrics import (
+    ADMISSION_QUEUED,
+    ADMISSION_REJECTED,
+    ADMISSION_WAIT_SECONDS,
+    EXECUTOR_IN_FLIGHT,
+    ExecutorCall,
+)
+
+METADATA = 0
+BULK = 1
+PRIORITY_NAMES = {METADATA: "metadata", BULK: "bulk"}
+
+
+class IOExecutor:
+    """
+    Отдельный пул потоков для блокирующего I/O (клиент MinIO) с контролем
+    допуска: одновременно выполняется не больше max_workers вызовов,
+    остальные ждут в очереди по приоритету (METADATA раньше BULK).
+    Очередь ограничена max_queue, ожидание - wait_budget секундами:
+    сверх них вызов сразу отклоняется StorageOverloaded (503).
+    Вызовы с shed=False (продолжение уже начатой передачи) не отклоняются
+    """
+
+    def __init__(
+        self,
+        name: str = "io",
+        max_workers: int = 30,
+        max_queue: int = 1000,
+        wait_budget: float = 5,
+        logger: logging.Logger = logging,
+    ):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.wait_budget = wait_budget
+        self.logger = logger
+        self.pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"{name}-executor"
+        )
+        self.active = 0
+        self.counters = {"admitted": 0, "queued": 0, "rejected": 0}
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._next = itertools.count()
+
+    def _rejected(self, reason: str) -> None:
+        self.counters["rejected"] += 1
+        ADMISSION_REJECTED.labels(self.name, reason).inc()
+        self.logger.warning("Очередь %s переполнена: %s", self.name, reason)
+
+    async def _admit(self, priority: int, shed: bool) -> None:
+        if self.active < self.max_workers and not self._waiters:
+            self.active += 1
+            return
+        if shed and len(self._waiters) >= self.max_queue:
+            self._rejected("queue_full")
+            raise StorageOverloaded
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._next), future)
+        heapq.heappush(self._waiters, entry)
+        self.counters["queued"] += 1
+        ADMISSION_QUEUED.labels(self.name).inc()
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(future, self.wait_budget if shed else None)
+        except BaseException as error:
+            if future.done() and not future.cancelled():
+                self._release()
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            if isinstance(error, asyncio.TimeoutError):
+                self._rejected("wait_budget")
+                raise StorageOverloaded
+            raise
+        finally:
+            ADMISSION_QUEUED.labels(self.name).dec()
+            ADMISSION_WAIT_SECONDS.labels(
+                self.name, PRIORITY_NAMES.get(priority, str(priority))
+            ).observe(time.perf_counter() - started)
+
+    def _release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    async def run(
+        self,
+        func: callable,
+        loop: Optional[AbstractEventLoop] = None,
+        priority: int = METADATA,
+        shed: bool = True,
+        **kwargs,
+    ) -> Any:
+        loop = loop or asyncio.get_running_loop()
+        await self._admit(priority, shed)
+        self.counters["admitted"] += 1
+        call = ExecutorCall(partial(func, **kwargs))
+        EXECUTOR_IN_FLIGHT.inc()
+        try:
+            future = self.pool.submit(call)
+        except BaseException:
+            EXECUTOR_IN_FLIGHT.dec()
+            call.cancel()
+            self._release()
+            raise
+
+        def done(_future: Future) -> None:
+            # место освобождается, когда поток завершил вызов, а не когда
+            # вызывающий перестал ждать (при отмене поток продолжает работу)
+            EXECUTOR_IN_FLIGHT.dec()
+            call.cancel()
+            try:
+                loop.call_soon_threadsafe(self._release)
+            except RuntimeError:
+                pass
+
+        future.add_done_callback(done)
+        return await asyncio.wrap_future(future, loop=loop)
+
+    def shutdown(self) -> None:
+        for _, _, future in self._waiters:
+            if not future.done():
+                future.cancel()
+        self._waiters.clear()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "active": self.active,
+            "waiting": len(self._waiters),
+            "max_workers": self.max_workers,
+        }
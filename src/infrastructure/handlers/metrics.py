@@ -0,0 +1,230 @@
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Any, Callable, Iterator, Optional
+
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+from prometheus_client.core import GaugeMetricFamily
+
+from application.config import settings
+
+try:
+    from opentelemetry import trace
+except ImportError:
+    trace = None
+
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+)
+
+STAGE_SECONDS = Histogram(
+    "media_stage_duration_seconds",
+    "Длительность этапов обработки (S3, запросы реестров, прием тела запроса)",
+    ["component", "operation"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_ERRORS = Counter(
+    "media_stage_errors_total",
+    "Этапы, завершившиеся исключением",
+    ["component", "operation"],
+)
+HTTP_SECONDS = Histogram(
+    "media_http_request_duration_seconds",
+    "Длительность обработки HTTP-запросов",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+EXECUTOR_IN_FLIGHT = Gauge(
+    "media_executor_in_flight",
+    "Вызовы run_in_executor: отправлены и еще не завершены",
+)
+EXECUTOR_QUEUED = Gauge(
+    "media_executor_queued",
+    "Вызовы run_in_executor, ожидающие свободного потока",
+)
+EXECUTOR_WAIT_SECONDS = Histogram(
+    "media_executor_wait_seconds",
+    "Ожидание свободного потока executor",
+    buckets=LATENCY_BUCKETS,
+)
+ADMISSION_QUEUED = Gauge(
+    "media_admission_queued",
+    "Вызовы, ожидающие допуска в пул I/O",
+    ["executor"],
+)
+ADMISSION_REJECTED = Counter(
+    "media_admission_rejected_total",
+    "Вызовы, отклоненные контролем допуска (503)",
+    ["executor", "reason"],
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "media_admission_wait_seconds",
+    "Ожидание допуска в пул I/O",
+    ["executor", "priority"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_WAIT_SECONDS = Histogram(
+    "media_db_pool_checkout_seconds",
+    "Ожидание соединения из пула SQLAlchemy (включая открытие нового)",
+    ["pool"],
+    buckets=LATENCY_BUCKETS,
+)
+TRANSFER_BYTES = Counter(
+    "media_transfer_bytes_total",
+    "Переданные байты содержимого: in - загрузки, out - выдача",
+    ["direction"],
+)
+
+tracer = trace.get_tracer("media_service") if trace else None
+tracing = bool(tracer and settings.METRICS.tracing)
+
+
+@contextmanager
+def stage(component: str, operation: str) -> Iterator[None]:
+    """
+    Замер этапа в гистограмме STAGE_SECONDS; при METRICS.tracing и
+    установленном opentelemetry этап оборачивается в span
+    """
+    span = (
+        tracer.start_as_current_span(f"{component}.{operation}")
+        if tracing
+        else nullcontext()
+    )
+    with span:
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            STAGE_ERRORS.labels(component, operation).inc()
+            raise
+        finally:
+            STAGE_SECONDS.labels(component, operation).observe(
+                time.perf_counter() - started
+            )
+
+
+def observed(component: str, operation: Optional[str] = None) -> Callable:
+    """
+    Декоратор корутины: каждый вызов замеряется как этап component.operation
+    (по умолчанию operation - имя функции без ведущего "_")
+    """
+
+    def decorator(func: Callable) -> Callable:
+        name = operation or func.__name__.lstrip("_")
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs) -> Any:
+            with stage(component, name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class ExecutorCall:
+    """
+    Вызов для executor с учетом очереди: пока поток не взял вызов,
+    он учитывается в EXECUTOR_QUEUED; cancel() снимает с учета вызов,
+    который так и не начал выполняться
+    """
+
+    __slots__ = ("func", "submitted", "state", "lock")
+
+    def __init__(self, func: Callable):
+        self.func = func
+        self.submitted = time.perf_counter()
+        self.state = "queued"
+        self.lock = threading.Lock()
+        EXECUTOR_QUEUED.inc()
+
+    def _leave_queue(self, state: str) -> bool:
+        with self.lock:
+            if self.state != "queued":
+                return False
+            self.state = state
+        EXECUTOR_QUEUED.dec()
+        return True
+
+    def __call__(self) -> Any:
+        if not self._leave_queue("running"):
+            return None
+        EXECUTOR_WAIT_SECONDS.observe(time.perf_counter() - self.submitted)
+        return self.func()
+
+    def cancel(self) -> None:
+        self._leave_queue("cancelled")
+
+
+class PoolCollector:
+    """
+    Заполненность пулов соединений на момент сбора метрик:
+    пулы SQLAlchemy (QueuePool) и пулы urllib3 клиента MinIO
+    """
+
+    def __init__(self):
+        self.db_pools: dict[str, tuple[Any, int]] = {}
+        self.http_pools: dict[str, Any] = {}
+
+    def track_db_pool(self, name: str, engine: Any, capacity: int) -> None:
+        self.db_pools[name] = (engine, capacity)
+
+    def track_http_pool(self, name: str, manager: Any) -> None:
+        self.http_pools[name] = manager
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        checked_out = GaugeMetricFamily(
+            "media_db_pool_checked_out", "Выданные соединения пула БД", labels=["pool"]
+        )
+        idle = GaugeMetricFamily(
+            "media_db_pool_idle", "Свободные соединения пула БД", labels=["pool"]
+        )
+        saturation = GaugeMetricFamily(
+            "media_db_pool_saturation",
+            "Доля выданных соединений от pool_size + max_overflow",
+            labels=["pool"],
+        )
+        for name, (engine, capacity) in list(self.db_pools.items()):
+            used = engine.pool.checkedout()
+            checked_out.add_metric([name], used)
+            idle.add_metric([name], engine.pool.checkedin())
+            saturation.add_metric([name], used / capacity if capacity else 0)
+        http_in_use = GaugeMetricFamily(
+            "media_http_pool_in_use",
+            "Занятые соединения пулов urllib3",
+            labels=["pool", "host"],
+        )
+        http_max = GaugeMetricFamily(
+            "media_http_pool_max",
+            "Размер пулов urllib3",
+            labels=["pool", "host"],
+        )
+        for name, manager in list(self.http_pools.items()):
+            for key in list(manager.pools.keys()):
+                connection_pool = manager.pools.get(key)
+                if connection_pool is None or connection_pool.pool is None:
+                    continue
+                queue = connection_pool.pool
+                labels = [name, f"{connection_pool.host}:{connection_pool.port}"]
+                http_in_use.add_metric(labels, queue.maxsize - queue.qsize())
+                http_max.add_metric(labels, queue.maxsize)
+        yield from (checked_out, idle, saturation, http_in_use, http_max)
+
+
+pools = PoolCollector()
+REGISTRY.register(pools)
@@ -0,0 +1,66 @@
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from infrastructure.exceptions.minio_exceptions import RangeNotSatisfiable
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """
+    Разбор заголовка Range (RFC 9110, один диапазон).
+    Возвращает включительные границы (start, end) или None,
+    если заголовок нужно проигнорировать и отдать файл целиком
+    """
+    if not header:
+        return None
+    unit, _, ranges = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+    first, sep, last = ranges.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if not first:
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable(size=size)
+            start, end = max(size - suffix, 0), size - 1
+        else:
+            start = int(first)
+            end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(size=size)
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+def check_if_range(
+    header: Optional[str],
+    etag: Optional[str],
+    last_modified: Optional[datetime],
+) -> bool:
+    """
+    Проверка условия If-Range: True, если диапазон можно применить
+    """
+    if not header:
+        return True
+    header = header.strip()
+    if header.startswith('"') or header.startswith("W/"):
+        return bool(etag) and not header.startswith("W/") and header == quote_etag(etag)
+    if last_modified is None:
+        return False
+    try:
+        return parsedate_to_datetime(header) == last_modified.replace(microsecond=0)
+    except (TypeError, ValueError):
+        return False
+
+
+def quote_etag(etag: str) -> str:
+    return etag if etag.startswith('"') else f'"{etag}"'
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value, usegmt=True)
@@ -0,0 +1,49 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Объединение одинаковых конкурентных вызовов: пока выполняется вызов
+    по ключу, остальные ожидают его результат (или исключение).
+    Отмена одного ожидающего не отменяет вызов для остальных,
+    вызов отменяется, когда ожидающих не осталось
+    """
+
+    def __init__(self):
+        self.counters = {"calls": 0, "executions": 0, "coalesced": 0, "errors": 0}
+        self._calls: dict[Hashable, _Call] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        self.counters["calls"] += 1
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = _Call(asyncio.create_task(func()))
+            call.task.add_done_callback(lambda task: self._forget(key, call))
+            self.counters["executions"] += 1
+        else:
+            self.counters["coalesced"] += 1
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if not call.waiters and not call.task.done():
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.task.cancelled() and call.task.exception() is not None:
+            self.counters["errors"] += 1
+
+    def stats(self) -> dict:
+        return {**self.counters, "in_flight": len(self._calls)}
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from infrastructure.handlers.metrics import TRANSFER_BYTES
+
+
+class TransferTracker:
+    """
+    Учет выполняющихся передач данных (загрузки и выдачи содержимого):
+    при остановке сервиса пулы соединений закрываются только после того,
+    как передачи завершатся или истечет время ожидания
+    """
+
+    def __init__(self, logger: logging.Logger = logging):
+        self.logger = logger
+        self.active = 0
+        self.counters = {
+            "started": 0,
+            "completed": 0,
+            "failed": 0,
+            "bytes_in": 0,
+            "bytes_out": 0,
+        }
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @asynccontextmanager
+    async def track(self) -> AsyncIterator[None]:
+        self.active += 1
+        self.counters["started"] += 1
+        self._idle.clear()
+        try:
+            yield
+        except BaseException:
+            self.counters["failed"] += 1
+            raise
+        else:
+            self.counters["completed"] += 1
+        finally:
+            self.active -= 1
+            if not self.active:
+                self._idle.set()
+
+    async def stream(self, stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        async with self.track():
+            async for chunk in stream:
+                self.counters["bytes_out"] += len(chunk)
+                TRANSFER_BYTES.labels("out").inc(len(chunk))
+                yield chunk
+
+    def received(self, size: Optional[int]) -> None:
+        if size:
+            self.counters["bytes_in"] += size
+            TRANSFER_BYTES.labels("in").inc(size)
+
+    async def drain(self, timeout: float) -> bool:
+        if not self.active:
+            return True
+        self.logger.warning("Ожидание завершения передач: %s", self.active)
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            self.logger.error(
+                "Передачи не завершились за %s с: %s", timeout, self.active
+            )
+            return False
+        return True
+
+    def stats(self) -> dict:
+        return {**self.counters, "active": self.active}
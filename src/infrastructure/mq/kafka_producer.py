@@ -0,0 +1,63 @@
+import logging
+from typing import Optional
+
+from aiokafka import AIOKafkaProducer
+
+from infrastructure.base_entities.base_mq import BaseMQ, Message
+
+
+class KafkaProducer(BaseMQ):
+    """
+    Публикация сообщений в Kafka пачками: сообщения пачки ставятся
+    в очередь продюсера без ожидания, продюсер собирает их в сжатые
+    batch по партициям, подтверждение ожидается один раз на пачку
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        compression_type: Optional[str] = "gzip",
+        linger_ms: int = 10,
+        max_batch_size: int = 1024 * 1024,
+        logger: logging.Logger = logging,
+    ):
+        self.bootstrap_servers = f"{host}:{port}"
+        self.compression_type = compression_type
+        self.linger_ms = linger_ms
+        self.max_batch_size = max_batch_size
+        self.logger = logger
+        self._producer: Optional[AIOKafkaProducer] = None
+
+    async def start(self) -> None:
+        if self._producer is not None:
+            return
+        producer = AIOKafkaProducer(
+            bootstrap_servers=self.bootstrap_servers,
+            compression_type=self.compression_type,
+            linger_ms=self.linger_ms,
+            max_batch_size=self.max_batch_size,
+            acks="all",
+            enable_idempotence=True,
+        )
+        try:
+            await producer.start()
+        except Exception:
+            await producer.stop()
+            raise
+        self._producer = producer
+        self.logger.warning("Подключение к Kafka %s", self.bootstrap_servers)
+
+    async def send_batch(self, messages: list[Message]) -> None:
+        await self.start()
+        futures = [
+            await self._producer.send(topic, value=value, key=key)
+            for topic, key, value in messages
+        ]
+        for future in futures:
+            await future
+
+    async def stop(self) -> None:
+        if self._producer is not None:
+            producer, self._producer = self._producer, None
+            await producer.stop()
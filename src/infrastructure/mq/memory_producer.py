@@ -0,0 +1,33 @@
+import logging
+from typing import Optional
+
+from infrastructure.base_entities.base_mq import BaseMQ, Message
+
+
+class MemoryProducer(BaseMQ):
+    """
+    Брокер в памяти процесса вместо Kafka (локальный запуск, проверки):
+    сообщения сохраняются по топикам, пачки отправки учитываются
+    """
+
+    def __init__(self, logger: logging.Logger = logging):
+        self.logger = logger
+        self.topics: dict[str, list[tuple[Optional[bytes], bytes]]] = {}
+        self.batches = 0
+
+    async def start(self) -> None:
+        pass
+
+    async def send_batch(self, messages: list[Message]) -> None:
+        self.batches += 1
+        for topic, key, value in messages:
+            self.topics.setdefault(topic, []).append((key, value))
+
+    def messages(self, topic: str) -> list:
+        return [
+            (key, self.deserialize_message(value))
+            for key, value in self.topics.get(topic, [])
+        ]
+
+    async def stop(self) -> None:
+        pass
@@ -0,0 +1,256 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Optional
+
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import RedisError, ResponseError
+
+from infrastructure.base_entities.base_mq import BaseMQ
+from infrastructure.base_entities.base_rpc import BaseRPC
+from infrastructure.exceptions.mq_exceptions import RPCError, RPCTimeout
+
+Handler = Callable[..., Awaitable[Any]]
+
+
+class RedisStreamRPC(BaseRPC, BaseMQ):
+    """
+    RPC поверх Redis Streams. Запрос - запись в поток очереди
+    ({prefix}:{queue}), ответ - запись в поток ответов клиента.
+    Вызовы, сделанные за одну итерацию цикла событий, отправляются одним
+    pipeline; обработчики читают очередь через consumer group (запросы
+    распределяются между воркерами), ответы пачки и XACK - один pipeline.
+    Просроченные запросы не обрабатываются, опоздавшие ответы отбрасываются,
+    зависшие у упавших воркеров запросы забираются через XAUTOCLAIM
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        prefix: str = "media_service:rpc",
+        group: str = "media_service",
+        timeout: float = 5,
+        batch_size: int = 100,
+        block: int = 1000,
+        maxlen: int = 100000,
+        claim_idle: int = 30000,
+        reply_ttl: int = 60,
+        logger: logging.Logger = logging,
+    ):
+        self.redis = redis
+        self.prefix = prefix
+        self.group = group
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.block = block
+        self.maxlen = maxlen
+        self.claim_idle = claim_idle
+        self.reply_ttl = reply_ttl
+        self.logger = logger
+        client_id = uuid.uuid4().hex
+        self.reply_stream = f"{prefix}:reply:{client_id}"
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}-{client_id[:8]}"
+        self.counters = {
+            "calls": 0,
+            "flushes": 0,
+            "timeouts": 0,
+            "stale": 0,
+            "handled": 0,
+            "expired": 0,
+            "claimed": 0,
+        }
+        self._futures: dict[str, asyncio.Future] = {}
+        self._outgoing: list[tuple[str, dict]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._handlers: dict[str, Handler] = {}
+        self._consumer_task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    def _stream(self, queue_name: str) -> str:
+        return f"{self.prefix}:{queue_name}"
+
+    async def call(self, queue_name: str, timeout: Optional[float] = None, **kwargs):
+        timeout = timeout or self.timeout
+        self.counters["calls"] += 1
+        correlation_id = uuid.uuid4().hex
+        future = self._futures[correlation_id] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._outgoing.append(
+            (
+                self._stream(queue_name),
+                {
+                    "id": correlation_id,
+                    "reply": self.reply_stream,
+                    "deadline": time.time() + timeout,
+                    "body": self.serialize_message(kwargs),
+                },
+            )
+        )
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush())
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            raise RPCTimeout(data=queue_name)
+        finally:
+            self._futures.pop(correlation_id, None)
+
+    async def _flush(self) -> None:
+        batch, self._outgoing, self._flush_task = self._outgoing, [], None
+        self.counters["flushes"] += 1
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for stream, fields in batch:
+                    pipe.xadd(stream, fields, maxlen=self.maxlen, approximate=True)
+                await pipe.execute()
+        except RedisError as error:
+            self.logger.error("Ошибка отправки RPC запросов: %s", error)
+            for _, fields in batch:
+                future = self._futures.get(fields["id"])
+                if future is not None and not future.done():
+                    future.set_exception(
+                        RPCError(data=fields["id"], message=str(error))
+                    )
+
+    async def _listen(self) -> None:
+        last_id = "0-0"
+        while not self._closing:
+            try:
+                response = await self.redis.xread(
+                    {self.reply_stream: last_id},
+                    count=self.batch_size,
+                    block=self.block,
+                )
+            except RedisError as error:
+                self.logger.error("Ошибка чтения RPC ответов: %s", error)
+                await asyncio.sleep(1)
+                continue
+            for _, messages in response or []:
+                for message_id, fields in messages:
+                    last_id = message_id
+                    await self.on_response(fields)
+
+    async def on_response(self, message: dict) -> None:
+        future = self._futures.get(message["id"])
+        if future is None or future.done():
+            self.counters["stale"] += 1
+            return
+        if "error" in message:
+            future.set_exception(RPCError(data=message["id"], message=message["error"]))
+        else:
+            future.set_result(self.deserialize_message(message["body"])["result"])
+
+    async def consume_queue(self, func: Handler, queue_name: str) -> None:
+        stream = self._stream(queue_name)
+        try:
+            await self.redis.xgroup_create(stream, self.group, id="$", mkstream=True)
+        except ResponseError as error:
+            if "BUSYGROUP" not in str(error):
+                raise
+        self._handlers[stream] = func
+        if self._consumer_task is None:
+            self._consumer_task = asyncio.create_task(self._consume())
+
+    async def _claim(self) -> None:
+        for stream in list(self._handlers):
+            _, messages, *_ = await self.redis.xautoclaim(
+                stream,
+                self.group,
+                self.consumer,
+                min_idle_time=self.claim_idle,
+                count=self.batch_size,
+            )
+            if messages:
+                self.counters["claimed"] += len(messages)
+                await self._process(stream, messages)
+
+    async def _consume(self) -> None:
+        claimed_at = 0.0
+        while not self._closing:
+            try:
+                if time.monotonic() - claimed_at > self.claim_idle / 1000:
+                    claimed_at = time.monotonic()
+                    await self._claim()
+                response = await self.redis.xreadgroup(
+                    self.group,
+                    self.consumer,
+                    {stream: ">" for stream in self._handlers},
+                    count=self.batch_size,
+                    block=self.block,
+                )
+                for stream, messages in response or []:
+                    await self._process(stream, messages)
+            except RedisError as error:
+                self.logger.error("Ошибка чтения RPC запросов: %s", error)
+                await asyncio.sleep(1)
+
+    async def _process(self, stream: str, messages: list) -> None:
+        func = self._handlers[stream]
+        async with self.redis.pipeline(transaction=False) as pipe:
+            await asyncio.gather(
+                *(
+                    self.on_call_message(pipe, func, fields)
+                    for _, fields in messages
+                    if fields
+                )
+            )
+            pipe.xack(stream, self.group, *(message_id for message_id, _ in messages))
+            await pipe.execute()
+
+    async def on_call_message(
+        self, exchange: Pipeline, func: Handler, message: dict
+    ) -> None:
+        if float(message["deadline"]) < time.time():
+            self.counters["expired"] += 1
+            return
+        reply = {"id": message["id"]}
+        try:
+            result = await func(**self.deserialize_message(message["body"]))
+            reply["body"] = self.serialize_message({"result": result})
+        except Exception as error:
+            reply["error"] = str(getattr(error, "detail", None) or error)
+        self.counters["handled"] += 1
+        exchange.xadd(message["reply"], reply, maxlen=self.maxlen, approximate=True)
+        exchange.expire(message["reply"], self.reply_ttl)
+
+    async def close(self) -> None:
+        """
+        Чтение новых запросов и ответов прекращается после текущего
+        блокирующего чтения, обрабатываемая пачка дорабатывает
+        (не дольше block + timeout), затем оставшиеся задачи отменяются
+        """
+        self._closing = True
+        tasks = [
+            task
+            for task in (self._listener, self._consumer_task, self._flush_task)
+            if task is not None
+        ]
+        if tasks:
+            _, pending = await asyncio.wait(
+                tasks, timeout=self.block / 1000 + self.timeout
+            )
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending, timeout=1)
+        self._listener = self._consumer_task = self._flush_task = None
+        self._closing = False
+        for future in self._futures.values():
+            if not future.done():
+                future.cancel()
+        try:
+            await self.redis.delete(self.reply_stream)
+        except RedisError as error:
+            self.logger.warning("Ошибка удаления потока ответов: %s", error)
+
+    def stats(self) -> dict:
+        return {**self.counters, "pending": len(self._futures)}
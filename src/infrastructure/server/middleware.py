@@ -0,0 +1,54 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from infrastructure.handlers.metrics import HTTP_SECONDS, STAGE_SECONDS
+
+
+class MetricsMiddleware:
+    """
+    Длительность HTTP-запросов по шаблону маршрута и время приема тела
+    запроса (чтение и буферизация загрузок Starlette до вызова обработчика)
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+        body_started = None
+        body_size = 0
+
+        async def timed_receive() -> Message:
+            nonlocal body_started, body_size
+            if body_started is None:
+                body_started = time.perf_counter()
+            message = await receive()
+            if message["type"] != "http.request":
+                return message
+            body_size += len(message.get("body", b""))
+            if body_size and not message.get("more_body"):
+                STAGE_SECONDS.labels("http", "receive_body").observe(
+                    time.perf_counter() - body_started
+                )
+            return message
+
+        async def timed_send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, timed_receive, timed_send)
+        finally:
+            route = scope.get("route")
+            HTTP_SECONDS.labels(
+                scope["method"],
+                route.path if route else "unmatched",
+                status,
+            ).observe(time.perf_counter() - started)
@@ -0,0 +1,16 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from orjson import dumps
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON-ответ через orjson: содержимое (словари строк БД) сериализуется
+    один раз, без jsonable_encoder и повторной валидации response_model.
+    Схема OpenAPI по-прежнему берется из response_model маршрута.
+    Типы, которые orjson не знает (UUID asyncpg, Decimal), пишутся строкой
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content, default=str)
@@ -1,5 +1,8 @@
+import inspect
 import logging
-from typing import NoReturn
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, NoReturn
 
 from fastapi import APIRouter, FastAPI
 
@@ -13,27 +16,52 @@ class Server(Singleton):
         routers: list[APIRouter] = None,
         start_callbacks: list[callable] = None,
         stop_callbacks: list[callable] = None,
+        middlewares: list[type] = None,
     ) -> NoReturn:
         self.name = name
-        self.app = FastAPI(title=name)
+        self.app = FastAPI(title=name, lifespan=self._lifespan)
         self.routers = routers or []
         self._init_routers()
+        self.middlewares = middlewares or []
+        self._init_middlewares()
         self.start_callbacks = start_callbacks or []
         self.stop_callbacks = stop_callbacks or []
-        self._init_start_callbacks()
-        self._init_stop_callbacks()
 
     def _init_routers(self):
         for router in self.routers:
             self.app.include_router(router)
         logging.info("Инициализация routers прошла успешно")
 
-    def _init_start_callbacks(self):
-        for callback in self.start_callbacks:
-            self.app.on_event("startup")(callback)
-        logging.info("Инициализация startup callbacks прошла успешно")
+    def _init_middlewares(self):
+        for middleware in self.middlewares:
+            self.app.add_middleware(middleware)
+
+    @staticmethod
+    async def _run_callback(callback: callable) -> None:
+        result = callback()
+        if inspect.isawaitable(result):
+            await result
 
-    def _init_stop_callbacks(self):
-        for callback in self.stop_callbacks:
-            self.app.on_event("shutdown")(callback)
-        logging.info("Инициализация shutdown callbacks прошла успешно")
+    @asynccontextmanager
+    async def _lifespan(self, app: FastAPI) -> AsyncIterator[None]:
+        started = time.perf_counter()
+        for callback in self.start_callbacks:
+            await self._run_callback(callback)
+        app.state.startup_seconds = time.perf_counter() - started
+        logging.warning(
+            "Запуск %s завершен за %.3f с", self.name, app.state.startup_seconds
+        )
+        try:
+            yield
+        finally:
+            started = time.perf_counter()
+            for callback in self.stop_callbacks:
+                try:
+                    await self._run_callback(callback)
+                except Exception as error:
+                    logging.error("Ошибка shutdown callback: %s", error)
+            logging.warning(
+                "Остановка %s завершена за %.3f с",
+                self.name,
+                time.perf_counter() - started,
+            )
@@ -0,0 +1,61 @@
+"""
+Заполнение size/etag для файлов, загруженных до появления колонок.
+Запуск из src: python -m jobs.backfill_file_stats --concurrency 32
+"""
+
+import argparse
+import asyncio
+import logging
+
+from application.container import Container
+from infrastructure.base_entities.base_file_manager import BaseFileManager
+
+
+async def backfill(batch_size: int = 1000, concurrency: int = 32) -> int:
+    read_repo = Container.file_read_registry()
+    write_repo = Container.file_write_registry()
+    file_manager: BaseFileManager = Container.file_hosting_client()
+    semaphore = asyncio.Semaphore(concurrency)
+    updated, after = 0, None
+
+    async def stat(file):
+        async with semaphore:
+            try:
+                result = await file_manager.stat_file(
+                    bucket_name=file.bucket, object_name=file.path
+                )
+            except Exception as error:
+                logging.error("Ошибка получения данных файла %s: %s", file.uuid, error)
+                return None
+            if result is None:
+                logging.warning("Объект файла %s не найден", file.uuid)
+            return result
+
+    try:
+        while files := await read_repo.get_without_stats(after=after, limit=batch_size):
+            after = files[-1].uuid
+            stats = await asyncio.gather(*(stat(file) for file in files))
+            updated += await write_repo.update_stats(
+                [
+                    (file.uuid, result.size, result.etag)
+                    for file, result in zip(files, stats)
+                    if result is not None
+                ]
+            )
+            logging.warning("Обновлено файлов: %s", updated)
+        await Container.blob_registry().fill_etags()
+    finally:
+        await Container.shutdown()
+    return updated
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(backfill(batch_size=args.batch_size, concurrency=args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
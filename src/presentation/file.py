@@ -1,10 +1,34 @@
-from typing import List
+from typing import Annotated, Literal, Optional
+from urllib.parse import quote
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, UploadFile
-from pydantic import BaseModel
+from fastapi import APIRouter, Body, Depends, Header, Query, Request, UploadFile, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
 
-from domain.file.schema import CreateFile, FileReturnData, GetFileByUUID
+from domain.file.schema import (
+    MAX_PRESIGN_EXPIRES,
+    BatchFileResult,
+    CompleteUpload,
+    CreateFile,
+    DownloadFile,
+    ExportFiles,
+    FileFilter,
+    FilePage,
+    FileReturnData,
+    FileStats,
+    GetFileByUUID,
+    GetFilesByReference,
+    GetFilesByUUID,
+    ListFiles,
+    PresignedUrl,
+    PresignFile,
+    PresignFiles,
+    UploadFileContent,
+)
+from infrastructure.handlers.range_handler import http_date, quote_etag
+from infrastructure.server.responses import ORJSONResponse
 from service.file import FileService
 
 
@@ -23,12 +47,112 @@ class FileRouter:
         return await service.get(cmd=GetFileByUUID(uuid=file_uuid))
 
     @staticmethod
-    @api_router.get("/all", response_model=List[output_model])
+    @api_router.get("/by-reference", response_model=list[output_model])
+    async def get_by_reference(
+        cmd: Annotated[GetFilesByReference, Query()],
+        service=service_client,
+    ) -> list[output_model]:
+        return await service.get_by_reference(cmd=cmd)
+
+    @staticmethod
+    @api_router.post("/get-many", response_model=list[output_model])
+    async def get_many(
+        cmd: GetFilesByUUID,
+        service=service_client,
+    ) -> ORJSONResponse:
+        return ORJSONResponse(await service.get_many(cmd=cmd))
+
+    @staticmethod
+    @api_router.get("/all", response_model=FilePage)
     async def get_list(
-        parameter: str = "created_at",
+        cmd: Annotated[ListFiles, Query()],
         service=service_client,
-    ) -> List[output_model]:
-        return await service.get_list(parameter=parameter)
+    ) -> ORJSONResponse:
+        return ORJSONResponse(await service.get_list(cmd=cmd))
+
+    @staticmethod
+    @api_router.get("/stats", response_model=FileStats)
+    async def get_stats(
+        cmd: Annotated[FileFilter, Query()],
+        service=service_client,
+    ) -> FileStats:
+        return await service.get_stats(cmd=cmd)
+
+    @staticmethod
+    @api_router.get("/export", response_class=StreamingResponse)
+    async def export(
+        cmd: Annotated[ExportFiles, Query()],
+        service=service_client,
+    ) -> StreamingResponse:
+        return StreamingResponse(
+            service.export(cmd=cmd), media_type="application/x-ndjson"
+        )
+
+    @staticmethod
+    @api_router.get("/{file_uuid}/content", response_class=StreamingResponse)
+    async def download(
+        file_uuid: UUID,
+        range_header: Optional[str] = Header(None, alias="Range"),
+        if_range: Optional[str] = Header(None, alias="If-Range"),
+        service=service_client,
+    ) -> StreamingResponse:
+        content = await service.download(
+            cmd=DownloadFile(uuid=file_uuid, range=range_header, if_range=if_range)
+        )
+        headers = {
+            "Accept-Ranges": "bytes",
+            "Content-Length": str(content.content_length),
+            "Content-Disposition": f"inline; filename*=UTF-8''{quote(content.name)}",
+        }
+        if content.etag:
+            headers["ETag"] = quote_etag(content.etag)
+        if content.last_modified:
+            headers["Last-Modified"] = http_date(content.last_modified)
+        if content.partial:
+            headers["Content-Range"] = (
+                f"bytes {content.start}-{content.end}/{content.size}"
+            )
+        return StreamingResponse(
+            content.stream,
+            status_code=(
+                status.HTTP_206_PARTIAL_CONTENT
+                if content.partial
+                else status.HTTP_200_OK
+            ),
+            media_type=content.mimetype,
+            headers=headers,
+        )
+
+    @staticmethod
+    @api_router.get("/{file_uuid}/url", response_model=PresignedUrl)
+    async def presign(
+        file_uuid: UUID,
+        method: Literal["GET", "PUT"] = "GET",
+        expires: Optional[int] = Query(None, ge=1, le=MAX_PRESIGN_EXPIRES),
+        service=service_client,
+    ) -> PresignedUrl:
+        return await service.presign(
+            cmd=PresignFile(uuid=file_uuid, method=method, expires=expires)
+        )
+
+    @staticmethod
+    @api_router.post("/{file_uuid}/url/complete", response_model=output_model)
+    async def complete_upload(
+        file_uuid: UUID,
+        path: str = Body(..., embed=True),
+        service=service_client,
+    ) -> output_model:
+        return await service.complete_upload(
+            cmd=CompleteUpload(uuid=file_uuid, path=path)
+        )
+
+    @staticmethod
+    @api_router.post("/urls", response_model=list[PresignedUrl])
+    async def presign_many(
+        cmd: PresignFiles,
+        service=service_client,
+    ) -> list[PresignedUrl]:
+        return await service.presign_many(cmd=cmd)
 
     @staticmethod
     @api_router.post("/create", response_model=output_model)
@@ -39,6 +163,44 @@ class FileRouter:
     ) -> output_model:
         return await service.create(file=incoming_data, file_data=data.file)
 
+    @staticmethod
+    @api_router.post("/batch", response_model=list[BatchFileResult])
+    async def create_batch(
+        incoming_data: list[input_model],
+        data: list[UploadFile],
+        service=service_client,
+    ) -> list[BatchFileResult]:
+        return await service.create_batch(
+            files=incoming_data, files_data=[file.file for file in data]
+        )
+
+    @staticmethod
+    @api_router.put(
+        "/{file_uuid}/content",
+        response_model=output_model,
+        openapi_extra={
+            "requestBody": {
+                "required": True,
+                "content": {
+                    "application/octet-stream": {
+                        "schema": {"type": "string", "format": "binary"}
+                    }
+                },
+            }
+        },
+    )
+    async def upload_content(
+        file_uuid: UUID,
+        request: Request,
+        metadata: str = Header(..., alias="X-File-Metadata"),
+        service=service_client,
+    ) -> output_model:
+        try:
+            cmd = UploadFileContent(uuid=file_uuid, file=metadata)
+        except ValidationError as error:
+            raise RequestValidationError(error.errors())
+        return await service.upload_content(cmd=cmd, stream=request.stream())
+
     @staticmethod
     @api_router.patch("/update{user_uuid}", response_model=output_model)
     async def update(
@@ -57,3 +219,11 @@ class FileRouter:
         service=service_client,
     ) -> output_model:
         return await service.delete(file_uuid=GetFileByUUID(uuid=file_uuid))
+
+    @staticmethod
+    @api_router.post("/delete-many", response_model=list[output_model])
+    async def delete_many(
+        cmd: GetFilesByUUID,
+        service=service_client,
+    ) -> list[output_model]:
+        return await service.delete_many(cmd=cmd)
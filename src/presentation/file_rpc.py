@@ -0,0 +1,86 @@
+import base64
+import io
+import logging
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from application.config import settings
+from application.container import Container
+from domain.file.schema import (
+    CreateFile,
+    FileReturnData,
+    GetFileByUUID,
+    GetFilesByUUID,
+)
+from service.file import FileService
+
+
+class FileRPC:
+    """
+    Обработчики RPC (Redis Streams) для внутренних сервисов:
+    операции FileService без HTTP и разрешения зависимостей FastAPI
+    """
+
+    @staticmethod
+    def service() -> FileService:
+        return FileService(
+            file_read=Container.file_read_registry(),
+            file_write=Container.file_write_registry(),
+            minio=Container.file_hosting_client(),
+            cache=Container.file_cache(),
+            blob=Container.blob_registry(),
+            reference_loader=Container.reference_loader(),
+            singleflight=Container.singleflight(),
+            presigned_cache=Container.presigned_cache(),
+            transfers=Container.transfers(),
+        )
+
+    @staticmethod
+    async def get(uuid: str) -> Optional[dict]:
+        file = await FileRPC.service().get(cmd=GetFileByUUID(uuid=uuid))
+        return file and file.model_dump(mode="json")
+
+    @staticmethod
+    async def get_many(uuids: list[str]) -> list[dict]:
+        files = await FileRPC.service().get_many(cmd=GetFilesByUUID(uuids=uuids))
+        return [
+            FileReturnData.model_validate(file).model_dump(mode="json")
+            for file in files
+        ]
+
+    @staticmethod
+    async def create(file: dict, content: str) -> Optional[dict]:
+        """
+        content - содержимое файла в base64
+        """
+        created = await FileRPC.service().create(
+            file=CreateFile.model_validate(file),
+            file_data=io.BytesIO(base64.b64decode(content)),
+        )
+        return created and FileReturnData.model_validate(created.as_dict()).model_dump(
+            mode="json"
+        )
+
+    @staticmethod
+    async def delete(uuid: str) -> Optional[dict]:
+        file = await FileRPC.service().delete(file_uuid=GetFileByUUID(uuid=uuid))
+        return file and FileReturnData.model_validate(file.as_dict()).model_dump(
+            mode="json"
+        )
+
+    @classmethod
+    async def start(cls) -> None:
+        if not settings.RPC.enabled:
+            return
+        rpc = Container.rpc()
+        try:
+            for queue_name, func in (
+                ("file.get", cls.get),
+                ("file.get_many", cls.get_many),
+                ("file.create", cls.create),
+                ("file.delete", cls.delete),
+            ):
+                await rpc.consume_queue(func, queue_name)
+        except RedisError as error:
+            logging.error("Не удалось запустить обработчики RPC: %s", error)
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends
+
+from domain.file.schema import InternalStats
+from service.file import FileService
+
+
+class InternalRouter:
+    api_router = APIRouter(
+        prefix="/internal", tags=["Internal"], include_in_schema=False
+    )
+    service_client: FileService = Depends(FileService)
+
+    @staticmethod
+    @api_router.get("/stats", response_model=InternalStats)
+    async def stats(
+        service=service_client,
+    ) -> InternalStats:
+        return await service.internal_stats()
@@ -1,11 +1,54 @@
-from typing import List, Optional
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Optional
 
 from fastapi import Depends
+from orjson import OPT_APPEND_NEWLINE, dumps
 
+from application.config import settings
 from application.container import Container
-from domain.file.registry import FileReadRegistry, FileWriteRegistry
-from domain.file.schema import CreateFile, FileReturnData, GetFileByUUID
-from infrastructure.file_manager.minio_client import MinioClient
+from domain.file.registry import BlobRegistry, FileReadRegistry, FileWriteRegistry
+from domain.file.schema import (
+    BatchFileResult,
+    CompleteUpload,
+    CreateFile,
+    DownloadFile,
+    ExportFiles,
+    FileContent,
+    FileFilter,
+    FileReturnData,
+    FileStats,
+    GetFileByUUID,
+    GetFilesByReference,
+    GetFilesByUUID,
+    InternalStats,
+    ListFiles,
+    PresignedUrl,
+    PresignFile,
+    PresignFiles,
+    StoredFile,
+    UploadFileContent,
+)
+from infrastructure.base_entities.base_file_manager import BaseFileManager
+from infrastructure.cache.presigned_cache import PresignedUrlCache
+from infrastructure.cache.two_tier_cache import TwoTierCache
+from infrastructure.exceptions.minio_exceptions import (
+    BatchMismatch,
+    FileAlreadyExist,
+    FileNotFound,
+    UploadConflict,
+    UploadNotFound,
+)
+from infrastructure.file_manager.hashing import HashingStream, content_key, hash_file
+from infrastructure.file_manager.schema import ObjectStat, UploadedObject
+from infrastructure.handlers.asyncio_handler import run_in_executor
+from infrastructure.handlers.batch_loader import BatchLoader
+from infrastructure.handlers.metrics import stage
+from infrastructure.handlers.range_handler import check_if_range, parse_range
+from infrastructure.handlers.singleflight import SingleFlight
+from infrastructure.handlers.transfers import TransferTracker
 
 
 class FileService:
@@ -13,28 +56,361 @@ class FileService:
         self,
         file_read: FileReadRegistry = Depends(Container.file_read_registry),
         file_write: FileWriteRegistry = Depends(Container.file_write_registry),
-        minio: MinioClient = Depends(Container.file_hosting_client),
+        minio: BaseFileManager = Depends(Container.file_hosting_client),
+        cache: TwoTierCache = Depends(Container.file_cache),
+        blob: BlobRegistry = Depends(Container.blob_registry),
+        reference_loader: BatchLoader = Depends(Container.reference_loader),
+        singleflight: SingleFlight = Depends(Container.singleflight),
+        presigned_cache: PresignedUrlCache = Depends(Container.presigned_cache),
+        transfers: TransferTracker = Depends(Container.transfers),
     ) -> None:
         self.read_repo = file_read
         self.write_repo = file_write
+        self.blob_repo = blob
+        self.reference_loader = reference_loader
+        self.singleflight = singleflight
+        self.presigned_cache = presigned_cache
+        self.transfers = transfers
         self.file_manager = minio
+        self.cache = cache
 
     async def get(self, cmd: GetFileByUUID) -> Optional[FileReturnData]:
-        return await self.read_repo.get(file_uuid=cmd.uuid)
+        return await self.singleflight.do(
+            ("get", cmd.uuid), lambda: self.read_repo.get(file_uuid=cmd.uuid)
+        )
 
-    async def get_list(self, parameter: str) -> Optional[List[FileReturnData]]:
-        return await self.read_repo.get_list(parameter=parameter)
+    async def get_many(self, cmd: GetFilesByUUID) -> list[dict]:
+        rows = await self.read_repo.get_many(uuids=cmd.uuids)
+        return [dict(row._mapping) for row in rows]
 
-    async def create(self, file: CreateFile, file_data) -> Optional[FileReturnData]:
-        await self.file_manager.upload_file(
+    async def get_by_reference(self, cmd: GetFilesByReference) -> list[FileReturnData]:
+        files = await self.reference_loader.load(cmd.reference_uuid)
+        if cmd.references is not None:
+            files = [file for file in files if file.references == cmd.references]
+        return files
+
+    async def internal_stats(self) -> InternalStats:
+        return InternalStats(
+            cache=self.cache.stats(),
+            reference_loader=self.reference_loader.stats(),
+            singleflight=self.singleflight.stats(),
+            presigned_cache=self.presigned_cache.stats(),
+            transfers=self.transfers.stats(),
+            replicas=self.read_repo.replicas and self.read_repo.replicas.stats(),
+        )
+
+    async def get_stats(self, cmd: FileFilter) -> FileStats:
+        return await self.read_repo.get_stats(cmd=cmd)
+
+    async def get_list(self, cmd: ListFiles) -> dict:
+        return await self.read_repo.get_list(cmd=cmd)
+
+    async def export(self, cmd: ExportFiles) -> AsyncIterator[bytes]:
+        async for batch in self.read_repo.export(cmd=cmd):
+            yield b"".join(
+                dumps(dict(row), default=str, option=OPT_APPEND_NEWLINE)
+                for row in batch
+            )
+
+    async def download(self, cmd: DownloadFile) -> FileContent:
+        file = await self.get(cmd=cmd)
+        if not file:
+            raise FileNotFound
+        stat = await self._stat(file)
+        if not stat:
+            raise FileNotFound
+        byte_range = None
+        if check_if_range(cmd.if_range, stat.etag, stat.last_modified):
+            byte_range = parse_range(cmd.range, stat.size)
+        start, end = byte_range or (0, stat.size - 1)
+        return FileContent(
+            name=file.name,
+            mimetype=file.mimetype,
+            size=stat.size,
+            start=start,
+            end=end,
+            partial=byte_range is not None,
+            etag=stat.etag,
+            last_modified=stat.last_modified,
+            stream=self.transfers.stream(
+                self.file_manager.download_file_chunk(
+                    bucket_name=file.bucket,
+                    object_name=file.path,
+                    offset=start,
+                    length=end - start + 1,
+                )
+            ),
+        )
+
+    async def _stat(self, file: FileReturnData) -> Optional[ObjectStat]:
+        """
+        Размер и etag берутся из записи файла, S3 опрашивается только
+        для записей, у которых они еще не заполнены
+        """
+        if file.size is not None and file.etag is not None:
+            return ObjectStat(
+                bucket_name=file.bucket,
+                object_name=file.path,
+                size=file.size,
+                etag=file.etag,
+                last_modified=file.updated_at.astimezone(timezone.utc).replace(
+                    microsecond=0
+                ),
+                content_type=file.mimetype,
+            )
+        return await self.singleflight.do(
+            ("stat", file.bucket, file.path),
+            lambda: self.file_manager.stat_file(
+                bucket_name=file.bucket, object_name=file.path
+            ),
+        )
+
+    async def _sign(self, file, method: str, expires: int) -> PresignedUrl:
+        url = await self.file_manager.presigned_url(
+            method=method,
             bucket_name=file.bucket,
             object_name=file.path,
-            mimetype=file.mimetype,
-            data=file_data,
-            tags=file.tags,
-            content_type=file.mimetype,
+            expires=expires,
+        )
+        return PresignedUrl(
+            uuid=file.uuid,
+            method=method,
+            url=url,
+            expires_at=datetime.now(timezone.utc) + timedelta(seconds=expires),
+        )
+
+    async def _sign_cached(self, files: list, expires: int) -> list[PresignedUrl]:
+        keys = [
+            self.presigned_cache.key("GET", file.bucket, file.path, expires)
+            for file in files
+        ]
+        cached = await self.presigned_cache.get_many(keys)
+        urls = [
+            value and PresignedUrl(uuid=file.uuid, method="GET", **value)
+            for file, value in zip(files, cached)
+        ]
+        missing = [index for index, url in enumerate(urls) if url is None]
+        signed = await asyncio.gather(
+            *(self._sign(files[index], "GET", expires) for index in missing)
+        )
+        for index, url in zip(missing, signed):
+            urls[index] = url
+        await self.presigned_cache.set_many(
+            {
+                keys[index]: url.model_dump(include={"url", "expires_at"})
+                for index, url in zip(missing, signed)
+            },
+            expires=expires,
+        )
+        return urls
+
+    async def presign(self, cmd: PresignFile) -> PresignedUrl:
+        """
+        Подписанная ссылка на объект файла. GET-ссылки кэшируются в Redis.
+        PUT-ссылка выдается на новый ключ (uploads/<uuid>-<n>, возвращается
+        в path), запись не меняется: файл переводится на загруженный объект
+        только вызовом complete_upload. Объекты sha256/ адресуются
+        содержимым и не перезаписываются
+        """
+        file = await self.get(cmd=cmd)
+        if not file:
+            raise FileNotFound
+        expires = cmd.expires or settings.PRESIGN.expires
+        if cmd.method == "GET":
+            return (await self._sign_cached([file], expires))[0]
+        path = self.file_manager.format_masks(
+            f"{self._upload_prefix(file.uuid)}{uuid.uuid4().hex[:8]}", file.mimetype
+        )
+        signed = await self._sign(
+            file.model_copy(update={"path": path}), "PUT", expires
         )
-        return await self.write_repo.create(cmd=file)
+        return signed.model_copy(update={"path": path})
+
+    @staticmethod
+    def _upload_prefix(file_uuid) -> str:
+        return f"uploads/{file_uuid}-"
+
+    async def complete_upload(self, cmd: CompleteUpload) -> FileReturnData:
+        """
+        Подтверждение загрузки по PUT-ссылке: размер и ETag берутся
+        из хранилища, запись переводится на новый объект, после чего
+        снимается ссылка на прежний
+        """
+        file = await self.get(cmd=cmd)
+        if not file:
+            raise FileNotFound
+        if cmd.path == file.path:
+            return file
+        if not cmd.path.startswith(self._upload_prefix(file.uuid)):
+            raise UploadNotFound
+        stat = await self.file_manager.stat_file(
+            bucket_name=file.bucket, object_name=cmd.path
+        )
+        if not stat:
+            raise UploadNotFound
+        row = await self.write_repo.replace_content(
+            file_uuid=file.uuid,
+            expected_path=file.path,
+            path=cmd.path,
+            size=stat.size,
+            etag=stat.etag,
+        )
+        if row is None:
+            raise UploadConflict
+        await self._release([file])
+        return FileReturnData.model_validate(row.as_dict())
+
+    async def presign_many(self, cmd: PresignFiles) -> list[PresignedUrl]:
+        files = await self.read_repo.get_many(uuids=cmd.uuids)
+        return await self._sign_cached(files, cmd.expires or settings.PRESIGN.expires)
+
+    async def _store(self, file: CreateFile, file_data) -> StoredFile:
+        """
+        Загрузка с дедупликацией: содержимое хешируется до отправки,
+        объект хранится под ключом от SHA-256, повторное содержимое
+        в хранилище не отправляется
+        """
+        with stage("service", "hash"):
+            sha256, size = await run_in_executor(func=hash_file, data=file_data)
+        blob = await self.blob_repo.acquire(bucket=file.bucket, sha256=sha256)
+        if blob is None:
+            async with self.transfers.track():
+                uploaded = await self.file_manager.upload_file(
+                    bucket_name=file.bucket,
+                    object_name=content_key(sha256),
+                    mimetype=file.mimetype,
+                    data=file_data,
+                    length=size,
+                    tags=file.tags,
+                    content_type=file.mimetype,
+                )
+            self.transfers.received(uploaded.size or size)
+            blob = await self._register(file.bucket, sha256, uploaded)
+        return StoredFile(
+            **file.model_dump(exclude={"path"}),
+            path=blob.path,
+            size=blob.size,
+            etag=blob.etag,
+            checksum=sha256,
+        )
+
+    async def _register(self, bucket: str, sha256: str, uploaded: UploadedObject):
+        blob = await self.blob_repo.register(
+            bucket=bucket,
+            sha256=sha256,
+            path=uploaded.object_name,
+            size=uploaded.size,
+            etag=uploaded.etag,
+        )
+        if blob.path != uploaded.object_name:
+            await self.file_manager.delete_object(
+                bucket_name=bucket, object_name=uploaded.object_name
+            )
+        return blob
+
+    async def _release(self, files: list) -> None:
+        """
+        Снятие ссылок на объекты, неиспользуемые объекты удаляются пачками
+        в транзакции BlobRegistry.release
+        """
+        buckets: dict[str, list[str]] = {}
+        for file in files:
+            buckets.setdefault(file.bucket, []).append(file.path)
+        for bucket, paths in buckets.items():
+            await self.blob_repo.release(
+                bucket=bucket,
+                paths=paths,
+                purge=lambda unused: self.file_manager.delete_objects(
+                    bucket_name=bucket, object_names=unused
+                ),
+            )
+
+    async def create(self, file: CreateFile, file_data) -> Optional[FileReturnData]:
+        file = await self._store(file, file_data)
+        try:
+            return await self.write_repo.create(cmd=file)
+        except Exception:
+            await self._release([file])
+            raise
+
+    async def create_batch(
+        self, files: list[CreateFile], files_data: list
+    ) -> list[BatchFileResult]:
+        """
+        Пакетное создание: файлы загружаются конкурентно
+        (не более S3.batch_concurrency одновременно), записи
+        успешно загруженных файлов вставляются одним запросом
+        """
+        if len(files) != len(files_data):
+            raise BatchMismatch
+        semaphore = asyncio.Semaphore(settings.S3.batch_concurrency)
+
+        async def upload(file: CreateFile, file_data) -> StoredFile:
+            async with semaphore:
+                return await self._store(file, file_data)
+
+        uploaded = await asyncio.gather(
+            *(upload(file, data) for file, data in zip(files, files_data)),
+            return_exceptions=True,
+        )
+        results = [None] * len(files)
+        created = []
+        for index, item in enumerate(uploaded):
+            if isinstance(item, BaseException):
+                logging.error("Ошибка загрузки файла %s: %s", files[index].path, item)
+                results[index] = BatchFileResult(
+                    index=index, status="failed", error=str(item)
+                )
+            else:
+                created.append((index, item))
+        try:
+            rows = await self.write_repo.create_many(cmds=[file for _, file in created])
+        except Exception:
+            await self._release([file for _, file in created])
+            raise
+        for (index, _), row in zip(created, rows):
+            results[index] = BatchFileResult(
+                index=index,
+                status="created",
+                file=FileReturnData.model_validate(row.as_dict()),
+            )
+        return results
+
+    async def upload_content(
+        self, cmd: UploadFileContent, stream: AsyncIterator[bytes]
+    ) -> Optional[FileReturnData]:
+        if await self.read_repo.get(file_uuid=cmd.uuid):
+            raise FileAlreadyExist
+        file = cmd.file
+        stream = HashingStream(stream)
+        async with self.transfers.track():
+            uploaded = await self.file_manager.upload_stream(
+                bucket_name=file.bucket,
+                object_name=self.file_manager.format_masks(
+                    f"uploads/{cmd.uuid}", file.mimetype
+                ),
+                mimetype=file.mimetype,
+                stream=stream,
+                tags=file.tags,
+                content_type=file.mimetype,
+            )
+        sha256 = stream.hexdigest()
+        self.transfers.received(stream.size)
+        blob = await self._register(
+            file.bucket, sha256, uploaded.model_copy(update={"size": stream.size})
+        )
+        file = StoredFile(
+            **file.model_dump(exclude={"path"}),
+            path=blob.path,
+            size=blob.size,
+            etag=blob.etag,
+            checksum=sha256,
+        )
+        try:
+            return await self.write_repo.create(cmd=file, file_uuid=cmd.uuid)
+        except Exception:
+            await self._release([file])
+            raise
 
     async def update(
         self, data: CreateFile, file_uuid: GetFileByUUID
@@ -42,4 +418,12 @@ class FileService:
         return await self.write_repo.update(cmd=data, file_uuid=file_uuid.uuid)
 
     async def delete(self, file_uuid: GetFileByUUID) -> Optional[FileReturnData]:
-        return await self.write_repo.delete(file_uuid=file_uuid.uuid)
+        file = await self.write_repo.delete(file_uuid=file_uuid.uuid)
+        if file:
+            await self._release([file])
+        return file
+
+    async def delete_many(self, cmd: GetFilesByUUID) -> list[FileReturnData]:
+        rows = await self.write_repo.delete_many(uuids=cmd.uuids)
+        await self._release(rows)
+        return [FileReturnData.model_validate(row.as_dict()) for row in rows]
@@ -0,0 +1,13 @@
+"""
+Тесты запускаются из корня репозитория (settings.yml читается из текущего
+каталога). Адреса сервисов переопределяются переменными окружения Dynaconf:
+    POSTGRES__host=127.0.0.1 POSTGRES__port=5433 python -m pytest tests
+Тесты, которым нужен недоступный сервис, пропускаются
+"""
+
+import os
+import sys
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
@@ -0,0 +1,143 @@
+import asyncio
+import io
+import os
+
+import aiohttp
+import pytest
+
+from infrastructure.file_manager.aio_s3_client import AioS3Client
+
+server = pytest.importorskip("moto.server")
+
+BUCKET = "aio-s3-test"
+
+
+@pytest.fixture(scope="module")
+def endpoint():
+    moto = server.ThreadedMotoServer(ip_address="127.0.0.1", port=0, verbose=False)
+    moto.start()
+    yield moto.get_host_and_port()
+    moto.stop()
+
+
+def client(endpoint: tuple) -> AioS3Client:
+    host, port = endpoint
+    return AioS3Client(
+        protocol="http",
+        host=host,
+        port=port,
+        access_key="test",
+        secret_key="test",
+        region="us-east-1",
+        chunk_size=1024,
+    )
+
+
+def run(endpoint: tuple, scenario) -> object:
+    async def main():
+        s3 = client(endpoint)
+        try:
+            return await scenario(s3)
+        finally:
+            await s3.close()
+
+    return asyncio.run(main())
+
+
+async def upload(s3: AioS3Client, name: str, body: bytes) -> str:
+    uploaded = await s3.upload_file(
+        bucket_name=BUCKET,
+        object_name=name,
+        mimetype="application/octet-stream",
+        data=io.BytesIO(body),
+        length=len(body),
+    )
+    return uploaded.object_name
+
+
+def test_put_get(endpoint):
+    body = os.urandom(10 * 1024 + 7)
+
+    async def scenario(s3: AioS3Client):
+        name = await upload(s3, "put-get", body)
+        stat = await s3.stat_file(BUCKET, name)
+        return await s3.download_file(BUCKET, name), stat
+
+    data, stat = run(endpoint, scenario)
+    assert data == body
+    assert stat.size == len(body) and stat.etag
+
+
+def test_upload_stream(endpoint):
+    body = os.urandom(64 * 1024)
+
+    async def scenario(s3: AioS3Client):
+        async def stream():
+            for start in range(0, len(body), 4096):
+                yield body[start : start + 4096]
+
+        uploaded = await s3.upload_stream(
+            bucket_name=BUCKET,
+            object_name="stream",
+            mimetype="application/octet-stream",
+            stream=stream(),
+        )
+        return await s3.download_file(BUCKET, uploaded.object_name)
+
+    assert run(endpoint, scenario) == body
+
+
+def test_range(endpoint):
+    body = os.urandom(8 * 1024)
+
+    async def scenario(s3: AioS3Client):
+        name = await upload(s3, "range", body)
+        chunks = [
+            chunk
+            async for chunk in s3.download_file_chunk(
+                BUCKET, name, offset=1000, length=3000
+            )
+        ]
+        tail = [
+            chunk async for chunk in s3.download_file_chunk(BUCKET, name, offset=8000)
+        ]
+        return b"".join(chunks), b"".join(tail)
+
+    middle, tail = run(endpoint, scenario)
+    assert middle == body[1000:4000]
+    assert tail == body[8000:]
+
+
+def test_delete(endpoint):
+    async def scenario(s3: AioS3Client):
+        first = await upload(s3, "delete-one", b"one")
+        second = await upload(s3, "delete-many-1", b"two")
+        third = await upload(s3, "delete-many-2", b"three")
+        await s3.delete_object(BUCKET, first)
+        failed = await s3.delete_objects(BUCKET, [second, third])
+        exist = [
+            await s3.check_file_exist(BUCKET, name) for name in (first, second, third)
+        ]
+        return failed, exist
+
+    failed, exist = run(endpoint, scenario)
+    assert failed == []
+    assert exist == [False, False, False]
+
+
+def test_presign(endpoint):
+    body = b"presigned content"
+
+    async def scenario(s3: AioS3Client):
+        name = await upload(s3, "presign", b"old")
+        put_url = await s3.presigned_url("PUT", BUCKET, name, expires=600)
+        get_url = await s3.presigned_url("GET", BUCKET, name, expires=600)
+        async with aiohttp.ClientSession() as session:
+            async with session.put(put_url, data=body) as response:
+                put_status = response.status
+            async with session.get(get_url) as response:
+                return put_status, response.status, await response.read()
+
+    put_status, get_status, data = run(endpoint, scenario)
+    assert put_status == 200
+    assert get_status == 200 and data == body
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from infrastructure.handlers.batch_loader import BatchLoader
+
+
+def test_concurrent_keys_load_in_one_batch():
+    async def main():
+        batches = []
+
+        async def batch_load(keys: list) -> dict:
+            batches.append(sorted(keys))
+            return {key: key * 10 for key in keys if key != 3}
+
+        loader = BatchLoader(batch_load, window=0.01, default="missing")
+        results = await asyncio.gather(*(loader.load(key) for key in (1, 2, 2, 3)))
+        return results, batches, loader.stats()
+
+    results, batches, stats = asyncio.run(main())
+    assert results == [10, 20, 20, "missing"]
+    assert batches == [[1, 2, 3]]
+    assert stats == {"loads": 4, "batches": 1, "keys": 3, "pending": 0}
+
+
+def test_max_batch_size_dispatches_without_waiting_for_window():
+    async def main():
+        batches = []
+
+        async def batch_load(keys: list) -> dict:
+            batches.append(sorted(keys))
+            return {key: key for key in keys}
+
+        loader = BatchLoader(batch_load, window=60, max_batch_size=2)
+        results = await asyncio.wait_for(
+            asyncio.gather(loader.load(1), loader.load(2)), 1
+        )
+        return results, batches
+
+    results, batches = asyncio.run(main())
+    assert results == [1, 2]
+    assert batches == [[1, 2]]
+
+
+def test_error_reaches_every_key_in_batch():
+    async def main():
+        async def batch_load(keys: list) -> dict:
+            raise ValueError("boom")
+
+        loader = BatchLoader(batch_load, window=0.001)
+        return await asyncio.gather(
+            loader.load(1), loader.load(2), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_cancelled_batch_does_not_leave_waiters_hanging():
+    async def main():
+        started = asyncio.Event()
+
+        async def batch_load(keys: list) -> dict:
+            started.set()
+            await asyncio.Event().wait()
+
+        loader = BatchLoader(batch_load, window=0.001)
+        waiters = [asyncio.create_task(loader.load(key)) for key in (1, 2)]
+        await started.wait()
+        for task in list(loader._tasks):
+            task.cancel()
+        return await asyncio.wait_for(
+            asyncio.gather(*waiters, return_exceptions=True), 1
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+
+
+def test_cancelled_waiter_does_not_cancel_key_for_others():
+    async def main():
+        release = asyncio.Event()
+
+        async def batch_load(keys: list) -> dict:
+            await release.wait()
+            return {key: key for key in keys}
+
+        loader = BatchLoader(batch_load, window=0.001)
+        first = asyncio.create_task(loader.load(1))
+        second = asyncio.create_task(loader.load(1))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == 1
@@ -0,0 +1,47 @@
+import uuid
+from datetime import datetime
+
+import pytest
+
+from infrastructure.exceptions.minio_exceptions import InvalidCursor
+from infrastructure.handlers.cursor_handler import decode_cursor, encode_cursor
+
+
+def test_round_trip():
+    file_uuid = uuid.uuid4()
+    created_at = datetime(2024, 10, 1, 12, 30, 15, 123456)
+    token = encode_cursor(["created_at", "desc", created_at, file_uuid])
+    assert "=" not in token
+    assert decode_cursor(token) == [
+        "created_at",
+        "desc",
+        created_at.isoformat(),
+        str(file_uuid),
+    ]
+    assert datetime.fromisoformat(decode_cursor(token)[2]) == created_at
+
+
+def test_round_trip_without_padding():
+    for name in ("a", "ab", "abc", "abcd"):
+        assert decode_cursor(encode_cursor(["name", "asc", name, 1])) == [
+            "name",
+            "asc",
+            name,
+            1,
+        ]
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "",
+        "not base64!",
+        encode_cursor({"sort": "name"}),
+        encode_cursor("name"),
+        "e30",
+        "bm90IGpzb24",
+    ],
+)
+def test_invalid_cursor(token):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token)
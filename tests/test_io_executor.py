@@ -0,0 +1,156 @@
+import asyncio
+import threading
+
+import pytest
+
+from infrastructure.exceptions.minio_exceptions import StorageOverloaded
+from infrastructure.handlers.io_executor import BULK, METADATA, IOExecutor
+
+
+def blocking(event: threading.Event, value=None):
+    event.wait(5)
+    return value
+
+
+def run(executor: IOExecutor, scenario) -> object:
+    async def main():
+        try:
+            return await scenario(executor)
+        finally:
+            executor.shutdown()
+
+    return asyncio.run(main())
+
+
+async def wait_until(predicate, timeout: float = 1) -> None:
+    async def poll():
+        while not predicate():
+            await asyncio.sleep(0.001)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+def test_calls_over_max_workers_wait_for_a_slot():
+    async def scenario(executor: IOExecutor):
+        event = threading.Event()
+        first = asyncio.create_task(executor.run(blocking, event=event, value=1))
+        second = asyncio.create_task(executor.run(blocking, event=event, value=2))
+        await wait_until(lambda: executor.stats()["waiting"] == 1)
+        busy = executor.stats()
+        event.set()
+        results = await asyncio.gather(first, second)
+        await wait_until(lambda: executor.active == 0)
+        return busy, results, executor.stats()
+
+    busy, results, stats = run(IOExecutor(name="test", max_workers=1), scenario)
+    assert busy["active"] == 1
+    assert results == [1, 2]
+    assert stats == {
+        "admitted": 2,
+        "queued": 1,
+        "rejected": 0,
+        "active": 0,
+        "waiting": 0,
+        "max_workers": 1,
+    }
+
+
+def test_metadata_is_admitted_before_bulk():
+    async def scenario(executor: IOExecutor):
+        event = threading.Event()
+        order = []
+
+        def record(name: str):
+            order.append(name)
+
+        first = asyncio.create_task(executor.run(blocking, event=event))
+        await wait_until(lambda: executor.active == 1)
+        bulk = asyncio.create_task(executor.run(record, priority=BULK, name="bulk"))
+        await wait_until(lambda: executor.stats()["waiting"] == 1)
+        metadata = asyncio.create_task(
+            executor.run(record, priority=METADATA, name="metadata")
+        )
+        await wait_until(lambda: executor.stats()["waiting"] == 2)
+        event.set()
+        await asyncio.gather(first, bulk, metadata)
+        return order
+
+    assert run(IOExecutor(name="test", max_workers=1), scenario) == [
+        "metadata",
+        "bulk",
+    ]
+
+
+def test_full_queue_rejects_immediately():
+    async def scenario(executor: IOExecutor):
+        event = threading.Event()
+        first = asyncio.create_task(executor.run(blocking, event=event))
+        await wait_until(lambda: executor.active == 1)
+        with pytest.raises(StorageOverloaded):
+            await executor.run(blocking, event=event)
+        unshed = asyncio.create_task(executor.run(blocking, event=event, shed=False))
+        await wait_until(lambda: executor.stats()["waiting"] == 1)
+        event.set()
+        await asyncio.gather(first, unshed)
+        return executor.stats()
+
+    stats = run(IOExecutor(name="test", max_workers=1, max_queue=0), scenario)
+    assert stats["rejected"] == 1
+    assert stats["admitted"] == 2
+
+
+def test_wait_budget_rejects_and_leaves_the_queue():
+    async def scenario(executor: IOExecutor):
+        event = threading.Event()
+        first = asyncio.create_task(executor.run(blocking, event=event))
+        await wait_until(lambda: executor.active == 1)
+        with pytest.raises(StorageOverloaded):
+            await executor.run(blocking, event=event)
+        waiting = executor.stats()["waiting"]
+        event.set()
+        await first
+        await wait_until(lambda: executor.active == 0)
+        return waiting, executor.stats()
+
+    waiting, stats = run(
+        IOExecutor(name="test", max_workers=1, wait_budget=0.05), scenario
+    )
+    assert waiting == 0
+    assert stats["rejected"] == 1
+
+
+def test_cancelled_caller_keeps_slot_until_thread_finishes():
+    async def scenario(executor: IOExecutor):
+        event = threading.Event()
+        caller = asyncio.create_task(executor.run(blocking, event=event))
+        await wait_until(lambda: executor.active == 1)
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        after_cancel = executor.active
+        event.set()
+        await wait_until(lambda: executor.active == 0)
+        return after_cancel
+
+    assert run(IOExecutor(name="test", max_workers=1), scenario) == 1
+
+
+def test_cancelled_waiter_hands_slot_to_the_next_one():
+    async def scenario(executor: IOExecutor):
+        event = threading.Event()
+        first = asyncio.create_task(executor.run(blocking, event=event, value=1))
+        await wait_until(lambda: executor.active == 1)
+        cancelled = asyncio.create_task(executor.run(blocking, event=event))
+        last = asyncio.create_task(executor.run(blocking, event=event, value=3))
+        await wait_until(lambda: executor.stats()["waiting"] == 2)
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+        event.set()
+        results = await asyncio.gather(first, last)
+        await wait_until(lambda: executor.active == 0)
+        return results, executor.stats()
+
+    results, stats = run(IOExecutor(name="test", max_workers=1), scenario)
+    assert results == [1, 3]
+    assert stats["waiting"] == 0
@@ -0,0 +1,142 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import delete, insert, select, text
+
+from application.config import settings
+from infrastructure.base_entities.base_mq import BaseMQ
+from infrastructure.database.alchemy_gateway import SessionManager
+from infrastructure.database.models import OutboxEvent
+from infrastructure.database.outbox_relay import OutboxRelay
+from infrastructure.mq.memory_producer import MemoryProducer
+
+
+class BlockingProducer(MemoryProducer):
+    """
+    Брокер в памяти, отправка пачки ждет разрешения теста
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.sending = asyncio.Event()
+        self.proceed = asyncio.Event()
+
+    async def send_batch(self, messages: list) -> None:
+        self.sending.set()
+        await self.proceed.wait()
+        await super().send_batch(messages)
+
+
+def session_manager() -> SessionManager:
+    return SessionManager(
+        host=settings.POSTGRES.host,
+        port=settings.POSTGRES.port,
+        dialect=settings.POSTGRES.dialect,
+        login=settings.POSTGRES.login,
+        password=settings.POSTGRES.password,
+        database=settings.POSTGRES.database,
+        echo=False,
+    )
+
+
+async def prepare(manager: SessionManager, topic: str, events: list) -> None:
+    try:
+        async with manager.engine.connect() as connection:
+            await asyncio.wait_for(connection.execute(text("SELECT 1")), 5)
+    except Exception as error:
+        pytest.skip(f"Postgres недоступен: {error!r}")
+    async with manager.transactional_session() as session:
+        await session.execute(
+            insert(OutboxEvent),
+            [
+                {
+                    "topic": topic,
+                    "key": key,
+                    "event": event,
+                    "payload": BaseMQ.serialize_message({"event": event, "n": n}),
+                }
+                for n, (key, event) in enumerate(events)
+            ],
+        )
+        await session.commit()
+
+
+async def cleanup(manager: SessionManager, topic: str) -> list:
+    async with manager.transactional_session() as session:
+        delivered = (
+            await session.scalars(
+                select(OutboxEvent.delivered_at).where(OutboxEvent.topic == topic)
+            )
+        ).all()
+        await session.execute(delete(OutboxEvent).where(OutboxEvent.topic == topic))
+        await session.commit()
+    await manager.engine.dispose()
+    return delivered
+
+
+async def drain(relay: OutboxRelay) -> None:
+    while await relay.relay():
+        pass
+
+
+def test_relay_publishes_in_seq_order():
+    topic = f"test-{uuid.uuid4()}"
+    events = [(key, f"file.{n}") for n in range(5) for key in ("a", "b")]
+
+    async def main() -> tuple[list, list]:
+        manager = session_manager()
+        await prepare(manager, topic, events)
+        producer = MemoryProducer()
+        try:
+            await drain(OutboxRelay(manager, producer, batch_size=3))
+        finally:
+            delivered = await cleanup(manager, topic)
+        return producer.messages(topic), delivered
+
+    messages, delivered = asyncio.run(main())
+    assert [(key.decode(), value["event"]) for key, value in messages] == events
+    assert len(delivered) == len(events) and all(delivered)
+
+
+def test_single_active_relay():
+    topic = f"test-{uuid.uuid4()}"
+    events = [("a", "file.created"), ("a", "file.updated"), ("a", "file.deleted")]
+
+    async def main() -> tuple[int, list, list]:
+        manager = session_manager()
+        await prepare(manager, topic, events)
+        first, second = BlockingProducer(), MemoryProducer()
+        try:
+            active = asyncio.create_task(
+                drain(OutboxRelay(manager, first, batch_size=1))
+            )
+            await first.sending.wait()
+            skipped = await OutboxRelay(manager, second, batch_size=1).relay()
+            first.proceed.set()
+            await active
+        finally:
+            await cleanup(manager, topic)
+        return skipped, first.messages(topic), second.messages(topic)
+
+    skipped, published, concurrent = asyncio.run(main())
+    assert skipped == 0 and concurrent == []
+    assert [value["event"] for _, value in published] == [e for _, e in events]
+
+
+def test_send_timeout_keeps_events_pending():
+    topic = f"test-{uuid.uuid4()}"
+
+    async def main() -> list:
+        manager = session_manager()
+        await prepare(manager, topic, [("a", "file.created")])
+        producer = BlockingProducer()
+        relay = OutboxRelay(manager, producer, send_timeout=0.1)
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await relay.relay()
+        finally:
+            delivered = await cleanup(manager, topic)
+        return delivered
+
+    assert asyncio.run(main()) == [None]
@@ -0,0 +1,79 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from infrastructure.exceptions.minio_exceptions import RangeNotSatisfiable
+from infrastructure.handlers.range_handler import (
+    check_if_range,
+    http_date,
+    parse_range,
+    quote_etag,
+)
+
+MODIFIED = datetime(2024, 10, 1, 12, 30, 15, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("bytes=0-99", (0, 99)),
+        ("bytes=10-", (10, 999)),
+        ("bytes=-100", (900, 999)),
+        ("bytes=-5000", (0, 999)),
+        ("bytes=990-5000", (990, 999)),
+        ("bytes=999-999", (999, 999)),
+        (" BYTES = 5-6", (5, 6)),
+    ],
+)
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize(
+    "header",
+    [None, "", "items=0-1", "bytes=0-1,5-6", "bytes=5", "bytes=a-b", "bytes=10-5"],
+)
+def test_parse_range_ignored(header):
+    assert parse_range(header, 1000) is None
+
+
+@pytest.mark.parametrize(
+    "header, size",
+    [("bytes=1000-", 1000), ("bytes=1000-1001", 1000), ("bytes=-0", 1000)],
+)
+def test_parse_range_not_satisfiable(header, size):
+    with pytest.raises(RangeNotSatisfiable) as error:
+        parse_range(header, size)
+    assert error.value.headers == {"Content-Range": f"bytes */{size}"}
+
+
+def test_parse_range_empty_file():
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range("bytes=0-", 0)
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, True),
+        ('"abc"', True),
+        ("abc", False),
+        ('"other"', False),
+        ('W/"abc"', False),
+        (http_date(MODIFIED), True),
+        (http_date(MODIFIED.replace(second=16)), False),
+        ("not a date", False),
+    ],
+)
+def test_check_if_range(header, expected):
+    assert check_if_range(header, "abc", MODIFIED.replace(microsecond=1)) is expected
+
+
+def test_check_if_range_without_validators():
+    assert check_if_range('"abc"', None, None) is False
+    assert check_if_range(http_date(MODIFIED), "abc", None) is False
+
+
+def test_quote_etag():
+    assert quote_etag("abc") == '"abc"'
+    assert quote_etag('"abc"') == '"abc"'
@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from infrastructure.handlers.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    async def main():
+        flight = SingleFlight()
+        release = asyncio.Event()
+        executions = []
+
+        async def fetch():
+            executions.append(1)
+            await release.wait()
+            return "value"
+
+        waiters = [asyncio.create_task(flight.do("key", fetch)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*waiters), executions, flight.stats()
+
+    results, executions, stats = asyncio.run(main())
+    assert results == ["value"] * 5
+    assert executions == [1]
+    assert stats == {
+        "calls": 5,
+        "executions": 1,
+        "coalesced": 4,
+        "errors": 0,
+        "in_flight": 0,
+    }
+
+
+def test_error_reaches_every_waiter_and_is_not_cached():
+    async def main():
+        flight = SingleFlight()
+        release = asyncio.Event()
+        attempts = []
+
+        async def fetch():
+            attempts.append(1)
+            await release.wait()
+            if len(attempts) == 1:
+                raise ValueError("boom")
+            return "value"
+
+        waiters = [asyncio.create_task(flight.do("key", fetch)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        retry = await flight.do("key", fetch)
+        return results, retry, flight.stats()
+
+    results, retry, stats = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert retry == "value"
+    assert stats["errors"] == 1
+    assert stats["executions"] == 2
+
+
+def test_cancelled_waiter_does_not_cancel_the_call():
+    async def main():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return "value"
+
+        first = asyncio.create_task(flight.do("key", fetch))
+        second = asyncio.create_task(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "value"
+
+
+def test_call_is_cancelled_when_no_waiters_left():
+    async def main():
+        flight = SingleFlight()
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def fetch():
+            started.set()
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiters = [asyncio.create_task(flight.do("key", fetch)) for _ in range(2)]
+        await started.wait()
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.wait_for(cancelled.wait(), 1)
+        await asyncio.sleep(0)
+        return flight.stats()
+
+    stats = asyncio.run(main())
+    assert stats["in_flight"] == 0
+    assert stats["errors"] == 0